@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Face Detection Tier Benchmark
+
+Reports per-frame detection latency and miss rate for each detector tier
+supported by FaceVerification.detect_faces.
+"""
+import sys
+import os
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+# Add server directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+import face_recognition
+from verification import FaceVerification
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+def load_images(folder, max_width):
+    """
+    Load every image in a folder as an RGB array
+
+    Args:
+        folder: Directory containing images
+        max_width: Downscale wider images to this width (webcam-like frames)
+
+    Returns:
+        list: RGB numpy arrays
+    """
+    images = []
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+
+        image = face_recognition.load_image_file(os.path.join(folder, name))
+        if image.shape[1] > max_width:
+            scale = max_width / float(image.shape[1])
+            image = cv2.resize(image, (0, 0), fx=scale, fy=scale)
+        images.append(image)
+
+    return images
+
+def run_tier(verifier, tier, images, repeat):
+    """
+    Time one detector tier over a set of images
+
+    Returns:
+        tuple: (per-frame latencies in ms, number of frames with a detection)
+    """
+    latencies = []
+    detected = 0
+
+    for image in images:
+        found = False
+        for _ in range(repeat):
+            start = time.perf_counter()
+            locations = verifier.detect_faces(image, detector=tier)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found = len(locations) > 0
+        if found:
+            detected += 1
+
+    return latencies, detected
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark face detection tiers'
+    )
+
+    parser.add_argument(
+        '--faces',
+        required=True,
+        help='Folder of images that each contain one face'
+    )
+
+    parser.add_argument(
+        '--negatives',
+        help='Folder of images without faces (for false positive rate)'
+    )
+
+    parser.add_argument(
+        '--tiers',
+        nargs='+',
+        default=list(FaceVerification.DETECTORS),
+        choices=FaceVerification.DETECTORS,
+        help='Detector tiers to compare (default: all)'
+    )
+
+    parser.add_argument(
+        '--max-width',
+        type=int,
+        default=640,
+        help='Downscale images to this width (default: 640)'
+    )
+
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Timed runs per image (default: 3)'
+    )
+
+    args = parser.parse_args()
+
+    faces = load_images(args.faces, args.max_width)
+    negatives = load_images(args.negatives, args.max_width) if args.negatives else []
+
+    if not faces:
+        print(f"Error: No images found in {args.faces}")
+        return
+
+    verifier = FaceVerification()
+
+    print("=" * 72)
+    print(f"Detection benchmark: {len(faces)} face images, {len(negatives)} negatives")
+    print("=" * 72)
+    print(f"{'tier':<14}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'miss rate':>12}{'false pos':>12}")
+    print("-" * 72)
+
+    for tier in args.tiers:
+        # Warm up (loads CNN weights, first-call allocations)
+        verifier.detect_faces(faces[0], detector=tier)
+
+        latencies, detected = run_tier(verifier, tier, faces, args.repeat)
+        miss_rate = 1 - detected / float(len(faces))
+
+        false_positive = '--'
+        if negatives:
+            neg_latencies, neg_detected = run_tier(verifier, tier, negatives, args.repeat)
+            latencies.extend(neg_latencies)
+            false_positive = f"{neg_detected / float(len(negatives)):.1%}"
+
+        latencies = np.array(latencies)
+        print(f"{tier:<14}{latencies.mean():>10.2f}{np.percentile(latencies, 50):>10.2f}"
+              f"{np.percentile(latencies, 95):>10.2f}{miss_rate:>12.1%}{false_positive:>12}")
+
+    print("=" * 72)
+
+if __name__ == '__main__':
+    main()
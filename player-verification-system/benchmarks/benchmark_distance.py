@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Distance Kernel Benchmark
+
+Compares distance_kernels against the generic numpy expression used by
+face_recognition.face_distance for 1:1, 1:N and N:M workloads on
+synthetic 128-d encodings.
+"""
+import sys
+import os
+import argparse
+import timeit
+
+import numpy as np
+
+# Add server directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from distance_kernels import pair_distance, one_to_many, many_to_many, squared_norms
+
+def baseline_face_distance(face_encodings, face_to_compare):
+    """Same computation as face_recognition.face_distance"""
+    return np.linalg.norm(face_encodings - face_to_compare, axis=1)
+
+def time_call(fn, number):
+    """Best-of-5 time per call in microseconds"""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+def report(label, baseline_us, kernel_us):
+    """Print one comparison row"""
+    print(f"{label:<34}{baseline_us:>12.2f}{kernel_us:>12.2f}{baseline_us / kernel_us:>9.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark face encoding distance kernels'
+    )
+
+    parser.add_argument(
+        '--gallery',
+        type=int,
+        nargs='+',
+        default=[10, 1000, 10000],
+        help='Gallery sizes for 1:N (default: 10 1000 10000)'
+    )
+
+    parser.add_argument(
+        '--queries',
+        type=int,
+        default=100,
+        help='Query count for N:M (default: 100)'
+    )
+
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    query64 = rng.normal(0, 0.1, 128)
+    query32 = query64.astype(np.float32)
+
+    print("=" * 67)
+    print(f"{'workload':<34}{'baseline us':>12}{'kernel us':>12}{'speedup':>9}")
+    print("-" * 67)
+
+    # 1:1 - old verify_face wrapped the pair in a list
+    other64 = rng.normal(0, 0.1, 128)
+    other32 = other64.astype(np.float32)
+    report(
+        "1:1 verify",
+        time_call(lambda: baseline_face_distance(np.array([other64]), query64)[0], 20000),
+        time_call(lambda: pair_distance(query32, other32), 20000)
+    )
+
+    # 1:N - verify against a template gallery / identify
+    for size in args.gallery:
+        gallery64 = rng.normal(0, 0.1, (size, 128))
+        gallery32 = gallery64.astype(np.float32)
+        out = np.empty(size, dtype=np.float32)
+        number = max(10, 200000 // size)
+
+        report(
+            f"1:{size} distances",
+            time_call(lambda: baseline_face_distance(gallery64, query64), number),
+            time_call(lambda: one_to_many(query32, gallery32, out=out), number)
+        )
+        report(
+            f"1:{size} squared (no sqrt)",
+            time_call(lambda: baseline_face_distance(gallery64, query64), number),
+            time_call(lambda: one_to_many(query32, gallery32, out=out, squared=True), number)
+        )
+
+    # N:M - dedupe / bulk identification
+    size = args.gallery[-1]
+    gallery64 = rng.normal(0, 0.1, (size, 128))
+    gallery32 = gallery64.astype(np.float32)
+    queries64 = rng.normal(0, 0.1, (args.queries, 128))
+    queries32 = queries64.astype(np.float32)
+    norms = squared_norms(gallery32)
+    out = np.empty((args.queries, size), dtype=np.float32)
+
+    report(
+        f"{args.queries}:{size} pairwise",
+        time_call(lambda: [baseline_face_distance(gallery64, q) for q in queries64], 3),
+        time_call(lambda: many_to_many(queries32, gallery32, out=out, gallery_norms=norms), 3)
+    )
+
+    # Kernel results must agree with the baseline
+    expected = np.array([baseline_face_distance(gallery64, q) for q in queries64])
+    error = np.abs(many_to_many(queries32, gallery32) - expected).max()
+
+    print("=" * 67)
+    print(f"Max abs error vs. float64 baseline: {error:.2e}")
+
+if __name__ == '__main__':
+    main()
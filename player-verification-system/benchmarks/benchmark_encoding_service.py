@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Encoding Service Throughput Benchmark
+
+Reports how server-side encoding throughput scales with the number of
+EncodingService worker processes, optionally through MicroBatchScheduler.
+"""
+import sys
+import os
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+
+# Add server directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from encoding_service import EncodingService, MicroBatchScheduler
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+def load_image_bytes(folder):
+    """Read every image in a folder as raw encoded bytes"""
+    images = []
+    for name in sorted(os.listdir(folder)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            with open(os.path.join(folder, name), 'rb') as f:
+                images.append(f.read())
+    return images
+
+def check_batch_encodings(images, tolerance=1e-6):
+    """
+    Compare detect_and_encode_batch with the unbatched face_encodings path
+
+    Every stored template comes from face_recognition.face_encodings, so a
+    batched encoding must be the same vector for the same face box.
+
+    Returns:
+        int: Images whose encodings differ
+    """
+    import face_recognition
+    from PIL import Image
+    from verification import FaceVerification
+
+    verifier = FaceVerification()
+    mismatches = 0
+    for image_bytes in images:
+        image = np.array(Image.open(BytesIO(image_bytes)).convert('RGB'))
+        locations = verifier.detect_faces(image)
+        if not locations:
+            continue
+
+        batched = verifier.detect_and_encode_batch([image])[0]
+        unbatched = face_recognition.face_encodings(image, known_face_locations=locations[:1])[0]
+        if batched is None or not np.allclose(batched, unbatched, atol=tolerance):
+            mismatches += 1
+
+    return mismatches
+
+def measure(workers, images, rounds, batched=False):
+    """
+    Encode every image `rounds` times with the given number of workers
+
+    Returns:
+        tuple: (images per second, number of images without a face)
+    """
+    jobs = images * rounds
+    service = EncodingService(max_workers=workers, max_pending=len(jobs), timeout=60.0)
+    encoder = service
+    if batched:
+        encoder = MicroBatchScheduler(service, max_pending=len(jobs), timeout=60.0)
+
+    try:
+        # Warm up every worker so model loading is not timed
+        with ThreadPoolExecutor(max_workers=workers) as warmup:
+            list(warmup.map(service.encode, images[:1] * workers))
+
+        # Batching only helps when many requests are in flight at once
+        concurrency = workers * 16 if batched else workers * 2
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            results = list(clients.map(encoder.encode, jobs))
+        elapsed = time.perf_counter() - start
+    finally:
+        service.shutdown()
+
+    no_face = sum(1 for result in results if result is None)
+    return len(jobs) / elapsed, no_face
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark EncodingService throughput across worker counts'
+    )
+
+    parser.add_argument(
+        '--images',
+        required=True,
+        help='Folder of JPEG/PNG face images'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        nargs='+',
+        help='Worker counts to test (default: 1, 2, 4, ... up to CPU count)'
+    )
+
+    parser.add_argument(
+        '--rounds',
+        type=int,
+        default=3,
+        help='Times each image is encoded per measurement (default: 3)'
+    )
+
+    parser.add_argument(
+        '--batched',
+        action='store_true',
+        help='Send requests through MicroBatchScheduler'
+    )
+
+    args = parser.parse_args()
+
+    images = load_image_bytes(args.images)
+    if not images:
+        print(f"Error: No images found in {args.images}")
+        return
+
+    worker_counts = args.workers
+    if not worker_counts:
+        cpus = os.cpu_count() or 1
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= cpus:
+            worker_counts.append(worker_counts[-1] * 2)
+        if worker_counts[-1] != cpus:
+            worker_counts.append(cpus)
+
+    if args.batched:
+        mismatches = check_batch_encodings(images)
+        if mismatches:
+            print(f"✗ {mismatches} batched encoding(s) differ from face_encodings")
+            sys.exit(1)
+        print("✓ Batched encodings match face_encodings")
+
+    print("=" * 60)
+    mode = "micro-batched" if args.batched else "unbatched"
+    print(f"Encoding service benchmark ({mode}): {len(images)} images x {args.rounds} rounds")
+    print("=" * 60)
+    print(f"{'workers':>8}{'images/s':>12}{'speedup':>10}{'efficiency':>12}{'no face':>10}")
+    print("-" * 60)
+
+    baseline = None
+    for workers in worker_counts:
+        throughput, no_face = measure(workers, images, args.rounds, args.batched)
+        if baseline is None:
+            baseline = throughput / workers
+        speedup = throughput / baseline
+        print(f"{workers:>8}{throughput:>12.2f}{speedup:>9.2f}x{speedup / workers:>12.0%}{no_face:>10}")
+
+    print("=" * 60)
+
+if __name__ == '__main__':
+    main()
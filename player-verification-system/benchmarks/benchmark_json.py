@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+JSON Response Benchmark
+
+Times the list endpoints' previous path (sqlite3.Row -> dict -> jsonify)
+against rows rendered straight from the cursor (select_json), for
+/api/logs/recent-sized results, through the real Flask views.
+"""
+import sys
+import os
+import argparse
+import json
+import shutil
+import statistics
+import tempfile
+import time
+
+# Run against a throwaway database and the in-process state backend
+WORK_DIR = tempfile.mkdtemp(prefix='pvs-json-bench-')
+os.environ['DATABASE_PATH'] = os.path.join(WORK_DIR, 'bench.db')
+os.environ.setdefault('PVS_SOCKETIO_ASYNC_MODE', 'threading')
+
+# Add server directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+import pickle
+
+import numpy as np
+from flask import jsonify
+
+import models
+import serialization
+
+STATUSES = ('VERIFIED', 'VERIFIED', 'VERIFIED', 'FAILED')
+
+def seed(players, logs):
+    """Fill the benchmark database with players and verification logs"""
+    models.init_db()
+    rng = np.random.default_rng(0)
+    encoding = pickle.dumps(np.zeros(128))
+
+    conn = models.get_db_connection()
+    conn.executemany('''
+        INSERT INTO players (player_id, name, student_id, facial_encoding, machine_guid)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(f'P{index:05d}', f'Player {index}', f'S{index:05d}', encoding, f'guid-{index}')
+          for index in range(players)])
+    conn.executemany('''
+        INSERT INTO verification_logs
+        (player_id, timestamp, verification_status, confidence_score, image_path, device_matched)
+        VALUES (?, datetime('now', ?), ?, ?, ?, ?)
+    ''', [(f'P{index % players:05d}', f'-{index} seconds', STATUSES[index % 4],
+           float(rng.random()), f'logs/images/P{index % players:05d}_{index}.jpg', index % 7 != 0)
+          for index in range(logs)])
+    conn.commit()
+    conn.close()
+
+def time_request(client, path, repeat):
+    """Median wall time (ms) and body size of GET path"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path)
+        body = response.get_data()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(body), body
+
+def same_rows(old, new):
+    """Same rows and values (floats may differ in the 16th digit)"""
+    if len(old) != len(new):
+        return False
+    for a, b in zip(old, new):
+        if a.keys() != b.keys():
+            return False
+        for key, value in a.items():
+            if isinstance(value, float):
+                if abs(value - b[key]) > 1e-12 * max(1.0, abs(value)):
+                    return False
+            elif value != b[key]:
+                return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON list responses')
+    parser.add_argument('--rows', type=int, default=10000, help='Rows per response')
+    parser.add_argument('--players', type=int, default=500, help='Players to seed')
+    parser.add_argument('--repeat', type=int, default=15, help='Requests per path')
+    args = parser.parse_args()
+
+    try:
+        seed(args.players, args.rows)
+
+        import app as server
+        client = server.app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = 1
+            session['role'] = 'super_admin'
+
+        # The previous handler, registered alongside the real one
+        @server.app.route('/bench/logs/recent')
+        def recent_logs_dicts():
+            return jsonify(models.VerificationLog.get_recent(args.rows))
+
+        print("=" * 60)
+        print(f"JSON response benchmark ({args.rows} log rows, median of {args.repeat})")
+        print(f"SQLite JSON functions: {'yes' if serialization.SQLITE_JSON else 'no'}, "
+              f"orjson: {'yes' if serialization.orjson else 'no'}")
+        print("=" * 60)
+
+        old_ms, old_size, old_body = time_request(client, '/bench/logs/recent', args.repeat)
+        new_ms, new_size, new_body = time_request(
+            client, f'/api/logs/recent?limit={args.rows}', args.repeat)
+
+        provider = type(server.app.json).__name__
+        print(f"{'dict + jsonify (' + provider + ')':<36}{old_ms:>9.1f} ms{old_size / 1024:>10.0f} KiB")
+        print(f"{'select_json (streamed)':<36}{new_ms:>9.1f} ms{new_size / 1024:>10.0f} KiB")
+        print(f"Speed-up: {old_ms / new_ms:.2f}x")
+
+        # Same rows either way; key order follows the column order now
+        if not same_rows(json.loads(old_body), json.loads(new_body)):
+            print("✗ Responses differ")
+            sys.exit(1)
+        print("✓ Responses match")
+
+        # The Python fallback used when SQLite lacks JSON1
+        serialization.SQLITE_JSON = False
+        fallback_ms, _, fallback_body = time_request(
+            client, f'/api/logs/recent?limit={args.rows}', args.repeat)
+        serialization.SQLITE_JSON = True
+        label = 'tuples + ' + ('orjson' if serialization.orjson else 'json')
+        print(f"{label:<36}{fallback_ms:>9.1f} ms  (fallback without JSON1)")
+        if not same_rows(json.loads(old_body), json.loads(fallback_body)):
+            print("✗ Fallback response differs")
+            sys.exit(1)
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Login Load vs. /api/verify Latency
+
+Runs a steady stream of /api/verify calls while attacker threads post
+wrong passwords to /admin/login at a fixed rate, and reports verify
+latency for:
+
+    baseline  - no login traffic
+    inline    - check_password_hash on the request thread, no throttle
+    pool      - PasswordHasher process pool, no throttle
+    throttled - PasswordHasher pool behind the default LoginThrottle
+
+Everything runs in-process through the Flask test client against a
+throw-away database, so the numbers isolate CPU contention from hashing.
+Under eventlet the inline case is worse still: the hash also blocks every
+other green thread, which threads in this benchmark do not show.
+"""
+import sys
+import os
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Run against a throw-away database with threads instead of eventlet
+WORK_DIR = tempfile.mkdtemp(prefix='pvs-login-bench-')
+os.environ['DATABASE_PATH'] = os.path.join(WORK_DIR, 'bench.db')
+os.environ.setdefault('PVS_SOCKETIO_ASYNC_MODE', 'threading')
+
+# Add server directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from werkzeug.security import check_password_hash
+
+import models
+from auth import LoginThrottle, PasswordHasher
+
+PLAYER_ID = 'PLAYER_BENCH01'
+MACHINE_GUID = 'bench-machine-guid'
+
+class InlineChecker:
+    """Previous behaviour: hash on the request thread"""
+    check = staticmethod(check_password_hash)
+
+def summarize(latencies):
+    """Format percentiles of a list of latencies in milliseconds"""
+    latencies = np.array(latencies)
+    return (f"p50 {np.percentile(latencies, 50):7.2f} ms   p95 {np.percentile(latencies, 95):7.2f} ms   "
+            f"p99 {np.percentile(latencies, 99):7.2f} ms   max {latencies.max():7.2f} ms")
+
+def attacker(server, stop, counts, index, rate):
+    """Post wrong passwords at `rate` attempts per second until stopped"""
+    client = server.app.test_client()
+    next_attempt = time.monotonic()
+    while not stop.is_set():
+        response = client.post('/admin/login', json={'username': 'admin', 'password': f'guess{index}'},
+                               environ_base={'REMOTE_ADDR': '203.0.113.7'})
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+        # Same offered load in every scenario; slow answers just lower it
+        next_attempt = max(next_attempt + 1.0 / rate, time.monotonic())
+        stop.wait(next_attempt - time.monotonic())
+
+def run_scenario(server, payload, attackers, rate, seconds):
+    """Verify latencies (ms) and login status counts for one scenario"""
+    stop = threading.Event()
+    counts = {}
+    threads = [threading.Thread(target=attacker, args=(server, stop, counts, index, rate),
+                                daemon=True)
+               for index in range(attackers)]
+    for thread in threads:
+        thread.start()
+
+    client = server.app.test_client()
+    latencies = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        response = client.post('/api/verify', json=payload)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"verify returned {response.status_code}")
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure /api/verify latency under login load')
+    parser.add_argument('--attackers', type=int, default=8, help='Concurrent login threads')
+    parser.add_argument('--rate', type=float, default=10.0,
+                        help='Login attempts per second per thread')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each scenario')
+    args = parser.parse_args()
+
+    try:
+        models.init_db()
+        models.AdminUser.create('admin', 'admin@example.com', 'correct horse', 'super_admin')
+
+        import app as server
+        server.settings.ENCODING_MODE = 'client'
+        server.settings.IMAGE_POLICY = 'none'
+
+        encoding = np.random.default_rng(0).normal(0, 0.1, 128)
+        models.Player.create(PLAYER_ID, 'Benchmark Player', 'BENCH01', encoding, MACHINE_GUID)
+        payload = {'player_id': PLAYER_ID, 'facial_encoding': encoding.tolist(),
+                   'machine_guid': MACHINE_GUID}
+
+        unthrottled = LoginThrottle(burst=10 ** 9, per_minute=10 ** 9)
+        pool = PasswordHasher(max_workers=server.settings.LOGIN_HASH_WORKERS,
+                              max_pending=server.settings.LOGIN_MAX_PENDING,
+                              timeout=server.settings.LOGIN_HASH_TIMEOUT)
+        scenarios = [
+            ('baseline', 0, InlineChecker, unthrottled),
+            ('inline', args.attackers, InlineChecker, unthrottled),
+            ('pool', args.attackers, pool, unthrottled),
+            ('throttled', args.attackers, pool, server.login_throttle),
+        ]
+
+        print("=" * 78)
+        print(f"/api/verify latency with {args.attackers} login threads x {args.rate:g}/s "
+              f"({args.seconds:g}s per scenario, {os.cpu_count()} CPU)")
+        print("=" * 78)
+
+        # Warm the pool and the verify path outside the timed runs
+        pool.check(models.AdminUser.get_by_username('admin')['password_hash'], 'warm-up')
+        run_scenario(server, payload, 0, args.rate, 0.5)
+
+        for name, attackers, hasher, throttle in scenarios:
+            server.password_hasher = hasher
+            server.login_throttle = throttle
+            latencies, counts = run_scenario(server, payload, attackers, args.rate, args.seconds)
+            logins = ', '.join(f"{status}: {count}" for status, count in sorted(counts.items()))
+            print(f"{name:<10} {len(latencies):6d} verifies   {summarize(latencies)}")
+            if logins:
+                print(f"{'':<10} logins {logins}")
+
+        pool.shutdown()
+        print("=" * 78)
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
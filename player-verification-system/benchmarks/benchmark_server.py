@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Server Throughput Benchmark - development server vs pre-fork launcher
+
+Starts each server on a throw-away database seeded with players, drives
+/api/verify over HTTP with client-side encodings from concurrent
+connections, and reports requests per second overall and per core used.
+"""
+import sys
+import os
+import argparse
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+
+import numpy as np
+import requests
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'server')
+
+# Add server directory to path
+sys.path.append(SERVER_DIR)
+
+MACHINE_GUID = 'bench-machine-guid'
+
+DEV_SERVER = (
+    "import app; app.init_db(); app.start_background_tasks(); "
+    "app.socketio.run(app.app, host='127.0.0.1', port={port}, debug=True, "
+    "use_reloader=False, log_output=False, allow_unsafe_werkzeug=True)"
+)
+
+def seed(players):
+    """Register players with random encodings; returns their (id, encoding) pairs"""
+    from models import Player, init_db
+
+    init_db()
+    rng = np.random.default_rng(0)
+    seeded = []
+    rows = []
+    for index in range(players):
+        encoding = rng.normal(0, 0.1, 128)
+        player_id = f'PLAYER_BENCH{index:05d}'
+        rows.append((player_id, f'Benchmark Player {index}', f'BENCH{index:05d}', encoding, MACHINE_GUID))
+        seeded.append((player_id, encoding.tolist()))
+    Player.create_many(rows)
+    return seeded
+
+def wait_ready(url, timeout=30.0):
+    """Poll until the server answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url + '/admin/login', timeout=1)
+            return True
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    return False
+
+def drive(url, players, connections, duration):
+    """
+    POST /api/verify from `connections` threads for `duration` seconds
+
+    Returns:
+        tuple: (completed requests, errors, latencies in seconds, elapsed seconds)
+    """
+    latencies = [[] for _ in range(connections)]
+    errors = [0] * connections
+    start_event = threading.Event()
+
+    def client(slot):
+        http = requests.Session()
+        rng = np.random.default_rng(slot)
+        start_event.wait()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            player_id, encoding = players[rng.integers(len(players))]
+            sent = time.perf_counter()
+            try:
+                response = http.post(url + '/api/verify', json={
+                    'player_id': player_id,
+                    'facial_encoding': encoding,
+                    'machine_guid': MACHINE_GUID
+                }, timeout=30)
+                if response.status_code != 200:
+                    errors[slot] += 1
+                    continue
+            except requests.RequestException:
+                errors[slot] += 1
+                continue
+            latencies[slot].append(time.perf_counter() - sent)
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(connections)]
+    for thread in threads:
+        thread.start()
+
+    start = time.perf_counter()
+    start_event.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    merged = [value for values in latencies for value in values]
+    return len(merged), sum(errors), merged, elapsed
+
+def run_server(label, command, env, url, players, args, cores):
+    """Start one server, load it, stop it and print a result row"""
+    process = subprocess.Popen(command, cwd=SERVER_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_ready(url):
+            print(f"✗ {label}: server did not start")
+            return
+
+        # Warm caches before timing
+        drive(url, players, args.connections, 1.0)
+        completed, errors, latencies, elapsed = drive(url, players, args.connections, args.duration)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    if not latencies:
+        print(f"{label:<28}{'-':>10}{'-':>12}{'-':>10}{'-':>10}{errors:>8}")
+        return
+
+    rate = completed / elapsed
+    values = np.array(latencies) * 1000
+    print(f"{label:<28}{rate:>10,.0f}{rate / cores:>12,.0f}"
+          f"{np.percentile(values, 50):>10.1f}{np.percentile(values, 95):>10.1f}{errors:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare /api/verify throughput of the dev server and serve.py'
+    )
+
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='serve.py worker processes (default: CPU count)')
+    parser.add_argument('--async-mode', default=None,
+                        help='serve.py async mode (default: eventlet if installed, else threading)')
+    parser.add_argument('--players', type=int, default=1000,
+                        help='Seeded players (default: 1000)')
+    parser.add_argument('--connections', type=int, default=16,
+                        help='Concurrent client connections (default: 16)')
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='Seconds of load per server (default: 10)')
+    parser.add_argument('--port', type=int, default=5099,
+                        help='Port used by the servers under test (default: 5099)')
+
+    args = parser.parse_args()
+
+    if args.async_mode is None:
+        try:
+            import eventlet  # noqa: F401
+            args.async_mode = 'eventlet'
+        except ImportError:
+            args.async_mode = 'threading'
+
+    url = f'http://127.0.0.1:{args.port}'
+    cpu_count = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ,
+                   DATABASE_PATH=os.path.join(tmp_dir, 'bench.db'),
+                   STATE_BACKEND_PATH=os.path.join(tmp_dir, 'state.db'))
+        os.environ['DATABASE_PATH'] = env['DATABASE_PATH']
+        players = seed(args.players)
+
+        print("=" * 70)
+        print(f"/api/verify over HTTP: {args.players} players, {args.connections} connections, "
+              f"{args.duration:.0f}s per server, {cpu_count} CPUs")
+        print("=" * 70)
+        print(f"{'server':<28}{'req/s':>10}{'req/s/core':>12}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+        print("-" * 70)
+
+        run_server('dev server (1 process)',
+                   [sys.executable, '-c', DEV_SERVER.format(port=args.port)],
+                   dict(env, PVS_SOCKETIO_ASYNC_MODE='threading'), url, players, args, 1)
+
+        run_server(f'serve.py ({args.workers} x {args.async_mode})',
+                   [sys.executable, 'serve.py', '--env', 'production', '--workers', str(args.workers),
+                    '--async-mode', args.async_mode, '--host', '127.0.0.1', '--port', str(args.port)],
+                   env, url, players, args, min(args.workers, cpu_count))
+        print("=" * 70)
+
+if __name__ == '__main__':
+    main()
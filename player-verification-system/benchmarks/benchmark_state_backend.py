@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Multi-process throughput benchmark for the shared state backends
+
+Publisher processes push messages through the backend while subscriber
+processes (standing in for server workers) receive them; reports publish
+throughput and end-to-end delivery latency.
+"""
+import sys
+import os
+import argparse
+import multiprocessing
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+# Add server directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from state_backend import create_backend
+
+def publisher(path, messages, payload_size, ready_queue, start_event):
+    """Publish `messages` timestamped messages"""
+    backend = create_backend('sqlite', path=path)
+    padding = 'x' * payload_size
+    ready_queue.put(True)
+    start_event.wait()
+
+    for index in range(messages):
+        backend.publish('bench', {'sent': time.time(), 'index': index, 'padding': padding})
+
+    backend.close()
+
+def subscriber(path, expected, poll_interval, ready_queue, result_queue, timeout):
+    """Receive messages until `expected` arrive; report latencies"""
+    latencies = []
+    backend = create_backend('sqlite', path=path, poll_interval=poll_interval)
+    backend.subscribe('bench', lambda message: latencies.append(time.time() - message['sent']))
+    backend.start()
+    ready_queue.put(True)
+
+    deadline = time.time() + timeout
+    while len(latencies) < expected and time.time() < deadline:
+        time.sleep(0.01)
+
+    backend.close()
+    result_queue.put(latencies)
+
+def run_memory(messages, payload_size):
+    """Single-process baseline with the in-process backend"""
+    backend = create_backend('memory')
+    latencies = []
+    backend.subscribe('bench', lambda message: latencies.append(time.time() - message['sent']))
+    padding = 'x' * payload_size
+
+    start = time.perf_counter()
+    for index in range(messages):
+        backend.publish('bench', {'sent': time.time(), 'index': index, 'padding': padding})
+    elapsed = time.perf_counter() - start
+
+    return messages / elapsed, latencies
+
+def run_sqlite(args, work_dir):
+    """Publishers and subscribers in separate processes"""
+    path = os.path.join(work_dir, 'state.db')
+    create_backend('sqlite', path=path).close()
+
+    ctx = multiprocessing.get_context('spawn')
+    start_event = ctx.Event()
+    ready_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    expected = args.publishers * args.messages
+
+    subscribers = [
+        ctx.Process(target=subscriber,
+                    args=(path, expected, args.poll_interval, ready_queue, result_queue, args.timeout))
+        for _ in range(args.subscribers)
+    ]
+    for process in subscribers:
+        process.start()
+    for _ in subscribers:
+        ready_queue.get()
+
+    publishers = [
+        ctx.Process(target=publisher,
+                    args=(path, args.messages, args.payload_size, ready_queue, start_event))
+        for _ in range(args.publishers)
+    ]
+    for process in publishers:
+        process.start()
+    for _ in publishers:
+        ready_queue.get()
+
+    start = time.perf_counter()
+    start_event.set()
+    for process in publishers:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    results = [result_queue.get() for _ in subscribers]
+    for process in subscribers:
+        process.join()
+
+    return expected / elapsed, results
+
+def print_latency(label, latencies, expected):
+    """One result row"""
+    if not latencies:
+        print(f"{label:<22}{'0':>10}{'-':>10}{'-':>10}{'-':>10}")
+        return
+    values = np.array(latencies) * 1000
+    print(f"{label:<22}{len(values):>10}{np.percentile(values, 50):>10.2f}"
+          f"{np.percentile(values, 95):>10.2f}{np.percentile(values, 99):>10.2f}"
+          f"{'' if len(values) == expected else '  (incomplete)'}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the shared state backend across processes'
+    )
+
+    parser.add_argument('--publishers', type=int, default=4,
+                        help='Publishing processes (default: 4)')
+    parser.add_argument('--subscribers', type=int, default=4,
+                        help='Subscribing processes, i.e. simulated workers (default: 4)')
+    parser.add_argument('--messages', type=int, default=2000,
+                        help='Messages per publisher (default: 2000)')
+    parser.add_argument('--payload-size', type=int, default=200,
+                        help='Bytes of padding per message (default: 200)')
+    parser.add_argument('--poll-interval', type=float, default=0.02,
+                        help='Subscriber poll interval in seconds (default: 0.02)')
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help='Seconds subscribers wait for all messages (default: 60)')
+
+    args = parser.parse_args()
+
+    print("=" * 62)
+    print(f"State backend: {args.publishers} publishers x {args.messages} messages, "
+          f"{args.subscribers} subscribers")
+    print("=" * 62)
+
+    rate, latencies = run_memory(args.publishers * args.messages, args.payload_size)
+    print(f"memory: {rate:,.0f} publishes/s (single process)")
+
+    work_dir = tempfile.mkdtemp(prefix='pvs_state_')
+    try:
+        rate, results = run_sqlite(args, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"sqlite: {rate:,.0f} publishes/s across {args.publishers} processes")
+    print("-" * 62)
+    print(f"{'delivery latency':<22}{'received':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    print("-" * 62)
+    expected = args.publishers * args.messages
+    for index, subscriber_latencies in enumerate(results):
+        print_latency(f"sqlite subscriber {index}", subscriber_latencies, expected)
+    print("=" * 62)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+/api/verify Hot-path Micro-benchmark
+
+Calls the verify_player handler directly inside a request context, so the
+numbers cover JSON parsing, DB lookups, distance math and logging but not
+HTTP or socket I/O. Runs against a throw-away database with one seeded
+player; no image is sent and no Socket.IO clients are connected.
+"""
+import sys
+import os
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+# Add server directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+import models
+from models import Player, init_db
+
+PLAYER_ID = 'PLAYER_BENCH01'
+MACHINE_GUID = 'bench-machine-guid'
+
+def summarize(latencies):
+    """Format mean / percentiles of a list of latencies in microseconds"""
+    latencies = np.array(latencies)
+    return (f"mean {latencies.mean():8.1f} us   p50 {np.percentile(latencies, 50):8.1f} us   "
+            f"p95 {np.percentile(latencies, 95):8.1f} us   p99 {np.percentile(latencies, 99):8.1f} us")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Micro-benchmark the /api/verify request handler'
+    )
+
+    parser.add_argument(
+        '--iterations',
+        type=int,
+        default=2000,
+        help='Timed handler calls (default: 2000)'
+    )
+
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=200,
+        help='Untimed calls before measuring (default: 200)'
+    )
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Point the models at a throw-away database before the app loads
+        models.DATABASE_PATH = os.path.join(tmp_dir, 'bench.db')
+        init_db()
+
+        import app as server_app
+        server_app.settings.ENCODING_MODE = 'client'
+
+        rng = np.random.default_rng(0)
+        encoding = rng.normal(0, 0.1, 128)
+        Player.create(PLAYER_ID, 'Benchmark Player', 'BENCH01', encoding, MACHINE_GUID)
+
+        payload = {
+            'player_id': PLAYER_ID,
+            'facial_encoding': encoding.tolist(),
+            'machine_guid': MACHINE_GUID
+        }
+
+        flask_app = server_app.app
+        handler = server_app.verify_player
+
+        for _ in range(args.warmup):
+            with flask_app.test_request_context('/api/verify', method='POST', json=payload):
+                handler()
+
+        server_app.verify_metrics.reset()
+
+        latencies = []
+        for _ in range(args.iterations):
+            with flask_app.test_request_context('/api/verify', method='POST', json=payload):
+                start = time.perf_counter()
+                response = handler()
+                latencies.append((time.perf_counter() - start) * 1e6)
+
+        status = response.status_code if hasattr(response, 'status_code') else response[1]
+
+        print("=" * 72)
+        print(f"verify_player handler: {args.iterations} calls (last status {status})")
+        print("=" * 72)
+        print(summarize(latencies))
+        print("-" * 72)
+
+        # Stage breakdown from the handler's own instrumentation
+        for stage, stats in sorted(server_app.verify_metrics.summary().items()):
+            print(f"{stage:<20} p50 {stats['p50'] * 1e6:8.1f} us   "
+                  f"p95 {stats['p95'] * 1e6:8.1f} us   p99 {stats['p99'] * 1e6:8.1f} us")
+        print("=" * 72)
+
+if __name__ == '__main__':
+    main()
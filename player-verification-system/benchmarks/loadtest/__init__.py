@@ -0,0 +1,29 @@
+"""
+Load Generator for the Verification Server
+
+Simulates player clients (register + periodic verify) and admin dashboards
+(log polling + Socket.IO listeners) against a server started on a throw-away
+database, or a running test server (--server URL --allow-writes).
+
+Usage:
+    cd benchmarks
+    python -m loadtest --players 50 --admins 2 --duration 60
+"""
+from .synthetic import (
+    make_templates,
+    genuine_probe,
+    impostor_probe,
+    make_jpeg_payload,
+    fake_machine_guid
+)
+from .stats import LatencyRecorder, compare_results
+
+__all__ = [
+    'make_templates',
+    'genuine_probe',
+    'impostor_probe',
+    'make_jpeg_payload',
+    'fake_machine_guid',
+    'LatencyRecorder',
+    'compare_results'
+]
@@ -0,0 +1,238 @@
+"""
+Load test entry point: python -m loadtest (run from benchmarks/)
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import requests
+
+from .admins import AdminSimulator
+from .players import PlayerSimulator
+from .stats import LatencyRecorder, compare_results
+from .synthetic import make_jpeg_payload
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'server')
+
+# Local server on a throw-away database, with the dashboards' admin account
+LOCAL_SERVER = (
+    "import os, app; app.init_db(); "
+    "password = os.environ.get('LOADTEST_ADMIN_PASSWORD'); "
+    "password and app.AdminUser.create(os.environ['LOADTEST_ADMIN_USER'], "
+    "'loadtest@example.com', password, 'super_admin'); "
+    "app.start_background_tasks(); "
+    "app.socketio.run(app.app, host='127.0.0.1', port={port}, use_reloader=False, "
+    "log_output=False, allow_unsafe_werkzeug=True)"
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        prog='python -m loadtest',
+        description='Simulate players and admin dashboards against the verification server'
+    )
+
+    parser.add_argument('--server',
+                        help='URL of a running test server (default: start one on a '
+                             'throw-away database, deleted afterwards)')
+    parser.add_argument('--allow-writes', action='store_true',
+                        help='Confirm that --server may keep the LOADTEST_ players and '
+                             'verification logs this run writes')
+    parser.add_argument('--port', type=int, default=5098,
+                        help='Port of the local server (default: 5098)')
+    parser.add_argument('--players', type=int, default=20,
+                        help='Simulated player clients (default: 20)')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='Seconds between verifications per player (default: 1.0)')
+    parser.add_argument('--impostor-rate', type=float, default=0.05,
+                        help='Fraction of verifications with a stranger\'s face (default: 0.05)')
+    parser.add_argument('--image-size', default='640x480',
+                        help='JPEG payload size WxH, or "none" to send no image (default: 640x480)')
+    parser.add_argument('--jpeg-quality', type=int, default=80,
+                        help='JPEG payload quality (default: 80)')
+    parser.add_argument('--admins', type=int, default=1,
+                        help='Simulated admin dashboards (default: 1)')
+    parser.add_argument('--admin-user', default='admin',
+                        help='Admin username for dashboards (default: admin)')
+    parser.add_argument('--admin-password',
+                        help='Admin password (dashboards are skipped if not set)')
+    parser.add_argument('--poll-interval', type=float, default=5.0,
+                        help='Seconds between /api/logs/recent polls (default: 5.0)')
+    parser.add_argument('--no-socketio', action='store_true',
+                        help='Dashboards poll only, without a Socket.IO listener')
+    parser.add_argument('--duration', type=float, default=60.0,
+                        help='Measured run time in seconds (default: 60)')
+    parser.add_argument('--ramp-up', type=float, default=5.0,
+                        help='Seconds over which players are started (default: 5)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed (default: 0)')
+    parser.add_argument('--output', default='loadtest_results.json',
+                        help='Result file (default: loadtest_results.json)')
+    parser.add_argument('--compare',
+                        help='Earlier result file to compare against')
+
+    args = parser.parse_args()
+    if args.server and not args.allow_writes:
+        parser.error('--server needs --allow-writes: the run leaves LOADTEST_ players and logs '
+                     'in that database (omit --server to use a throw-away one)')
+    return args
+
+def start_local_server(args, work_dir):
+    """Start the server on a database in work_dir; returns the process"""
+    env = dict(os.environ,
+               DATABASE_PATH=os.path.join(work_dir, 'loadtest.db'),
+               STATE_BACKEND_PATH=os.path.join(work_dir, 'state.db'),
+               PVS_LOGS_DIR=os.path.join(work_dir, 'images'),
+               LOADTEST_ADMIN_USER=args.admin_user,
+               LOADTEST_ADMIN_PASSWORD=args.admin_password or '')
+    # Like the dev server in benchmark_server.py; override to load eventlet
+    env.setdefault('PVS_SOCKETIO_ASYNC_MODE', 'threading')
+    process = subprocess.Popen([sys.executable, '-c', LOCAL_SERVER.format(port=args.port)],
+                               cwd=SERVER_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            requests.get(f"{args.server}/admin/login", timeout=1)
+            return process
+        except requests.ConnectionError:
+            time.sleep(0.2)
+
+    stop_local_server(process)
+    raise SystemExit('Local server did not start')
+
+def stop_local_server(process):
+    """Stop the local server, finishing in-flight requests"""
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def build_payloads(args):
+    """Pre-render a few JPEG payloads so clients do not pay for encoding"""
+    if args.image_size.lower() == 'none':
+        return [None]
+
+    width, height = (int(value) for value in args.image_size.lower().split('x'))
+    rng = np.random.default_rng(args.seed)
+    return [make_jpeg_payload(rng, width, height, args.jpeg_quality) for _ in range(4)]
+
+def print_summary(summary):
+    """Print the per-operation table"""
+    print(f"{'operation':<18}{'count':>8}{'req/s':>9}{'errors':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    print("-" * 80)
+    for operation, stats in sorted(summary.items()):
+        latency = stats['latency_ms']
+        print(f"{operation:<18}{stats['count']:>8}{stats['throughput_per_s']:>9.1f}"
+              f"{stats['error_rate']:>9.1%}{latency['p50']:>9.1f}{latency['p95']:>9.1f}"
+              f"{latency['p99']:>9.1f}{latency['max']:>9.1f}")
+
+def main():
+    args = parse_args()
+
+    work_dir = server = None
+    try:
+        if not args.server:
+            args.server = f'http://127.0.0.1:{args.port}'
+            work_dir = tempfile.mkdtemp(prefix='pvs-loadtest-')
+            server = start_local_server(args, work_dir)
+            print(f"Started a local server on a throw-away database in {work_dir}")
+
+        run(args)
+    finally:
+        if server:
+            stop_local_server(server)
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def run(args):
+    """Run the load against args.server and report"""
+    payloads = build_payloads(args)
+    recorder = LatencyRecorder()
+    stop_event = threading.Event()
+
+    print("=" * 80)
+    print(f"Load test: {args.players} players every {args.interval}s, "
+          f"{args.admins if args.admin_password else 0} dashboards, {args.duration:.0f}s "
+          f"against {args.server}")
+    if payloads[0]:
+        print(f"Image payload: {args.image_size} q{args.jpeg_quality} "
+              f"(~{len(payloads[0]) / 1024:.0f} KB base64)")
+    print("=" * 80)
+
+    admins = []
+    if args.admin_password:
+        for index in range(args.admins):
+            admin = AdminSimulator(index, args.server, recorder, stop_event,
+                                   args.admin_user, args.admin_password,
+                                   poll_interval=args.poll_interval,
+                                   listen=not args.no_socketio)
+            admin.start()
+            admins.append(admin)
+
+    players = []
+    for index in range(args.players):
+        player = PlayerSimulator(index, args.server, recorder, stop_event, payloads,
+                                 interval=args.interval, impostor_rate=args.impostor_rate,
+                                 seed=args.seed)
+        player.start()
+        players.append(player)
+        if args.ramp_up > 0:
+            time.sleep(args.ramp_up / max(args.players, 1))
+
+    # Throughput counts from here, once every player is running
+    recorder.start(keep=('register', 'admin_login'))
+
+    try:
+        time.sleep(args.duration)
+    except KeyboardInterrupt:
+        print("Interrupted, stopping early")
+
+    stop_event.set()
+    for thread in players + admins:
+        thread.join(timeout=15)
+    recorder.stop()
+
+    extra = {}
+    if admins:
+        lags = [lag for admin in admins for lag in admin.event_lag]
+        extra['socketio'] = {
+            'events_received': sum(admin.events_received for admin in admins),
+            'lag_ms_p50': float(np.percentile(lags, 50) * 1000) if lags else None,
+            'lag_ms_p95': float(np.percentile(lags, 95) * 1000) if lags else None
+        }
+
+    config = {key: value for key, value in vars(args).items()
+              if key not in ('admin_password', 'compare', 'output', 'allow_writes', 'port')}
+    result = recorder.save_json(args.output, config, extra)
+
+    print_summary(result['operations'])
+    if 'socketio' in extra:
+        socket_stats = extra['socketio']
+        print("-" * 80)
+        print(f"Socket.IO events received: {socket_stats['events_received']}, "
+              f"lag p50 {socket_stats['lag_ms_p50']} ms, p95 {socket_stats['lag_ms_p95']} ms")
+    print("=" * 80)
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        print()
+        print(f"Compared with {args.compare}:")
+        for operation, metric, old, new, change in compare_results(baseline, result):
+            print(f"  {operation:<18}{metric:<18}{old:>10.2f} -> {new:>10.2f}  ({change:+.1%})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Simulated admin dashboards
+"""
+import threading
+import time
+from datetime import datetime
+
+import requests
+import socketio
+
+class AdminSimulator(threading.Thread):
+    """One dashboard: polls recent logs and listens for Socket.IO updates"""
+
+    def __init__(self, index, server_url, recorder, stop_event, username, password,
+                 poll_interval=5.0, poll_limit=100, listen=True, timeout=10):
+        """
+        Args:
+            index: Dashboard number
+            server_url: Base URL of the server
+            recorder: LatencyRecorder shared by all simulators
+            stop_event: threading.Event ending the run
+            username, password: Admin credentials
+            poll_interval: Seconds between /api/logs/recent polls
+            poll_limit: limit parameter sent with each poll
+            listen: Open a Socket.IO connection for live events
+            timeout: HTTP timeout in seconds
+        """
+        super().__init__(daemon=True)
+        self.index = index
+        self.server_url = server_url
+        self.recorder = recorder
+        self.stop_event = stop_event
+        self.username = username
+        self.password = password
+        self.poll_interval = poll_interval
+        self.poll_limit = poll_limit
+        self.listen = listen
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.events_received = 0
+        self.event_lag = []  # seconds between server timestamp and receipt
+
+    def login(self):
+        """Log in and keep the session cookie"""
+        start = time.perf_counter()
+        try:
+            response = self.session.post(
+                f"{self.server_url}/admin/login",
+                json={'username': self.username, 'password': self.password},
+                timeout=self.timeout
+            )
+            status = response.status_code
+        except requests.exceptions.RequestException:
+            status = 'connection_error'
+        self.recorder.record('admin_login', time.perf_counter() - start, status)
+        return status == 200
+
+    def _on_verification_update(self, data):
+        """Count live events and measure delivery lag"""
+        self.events_received += 1
+        try:
+            sent = datetime.fromisoformat(data['timestamp'])
+            self.event_lag.append((datetime.now() - sent).total_seconds())
+        except (KeyError, ValueError):
+            pass
+
+    def _connect_socket(self):
+        """Open a Socket.IO connection using the login cookie"""
+        client = socketio.Client(reconnection=False)
+        client.on('verification_update', self._on_verification_update)
+
+        cookie = '; '.join(f"{name}={value}" for name, value in self.session.cookies.items())
+
+        start = time.perf_counter()
+        try:
+            client.connect(self.server_url, headers={'Cookie': cookie}, wait_timeout=self.timeout)
+            status = 200
+        except socketio.exceptions.ConnectionError:
+            status = 'connection_error'
+            client = None
+        self.recorder.record('socketio_connect', time.perf_counter() - start, status)
+        return client
+
+    def run(self):
+        if not self.login():
+            return
+
+        client = self._connect_socket() if self.listen else None
+
+        try:
+            while not self.stop_event.is_set():
+                start = time.perf_counter()
+                try:
+                    response = self.session.get(
+                        f"{self.server_url}/api/logs/recent",
+                        params={'limit': self.poll_limit},
+                        timeout=self.timeout
+                    )
+                    status = response.status_code
+                except requests.exceptions.Timeout:
+                    status = 'timeout'
+                except requests.exceptions.RequestException:
+                    status = 'connection_error'
+                self.recorder.record('logs_recent', time.perf_counter() - start, status)
+
+                self.stop_event.wait(self.poll_interval)
+        finally:
+            if client is not None:
+                client.disconnect()
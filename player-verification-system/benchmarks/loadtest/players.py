@@ -0,0 +1,100 @@
+"""
+Simulated player clients
+"""
+import threading
+import time
+import uuid
+
+import numpy as np
+import requests
+
+from .synthetic import make_templates, genuine_probe, impostor_probe, fake_machine_guid
+
+class PlayerSimulator(threading.Thread):
+    """One player: registers once, then verifies at a fixed interval"""
+
+    def __init__(self, index, server_url, recorder, stop_event, payloads,
+                 interval=1.0, impostor_rate=0.05, seed=0, timeout=10):
+        """
+        Args:
+            index: Player number (used for IDs and the RNG seed)
+            server_url: Base URL of the server
+            recorder: LatencyRecorder shared by all simulators
+            stop_event: threading.Event ending the run
+            payloads: Pre-built JPEG data URLs (None entries = no image)
+            interval: Seconds between verifications
+            impostor_rate: Fraction of verifications sent with a stranger's face
+            seed: Base random seed
+            timeout: HTTP timeout in seconds
+        """
+        super().__init__(daemon=True)
+        self.server_url = server_url
+        self.recorder = recorder
+        self.stop_event = stop_event
+        self.payloads = payloads
+        self.interval = interval
+        self.impostor_rate = impostor_rate
+        self.timeout = timeout
+
+        self.rng = np.random.default_rng(seed + index)
+        self.player_id = f"LOADTEST_{uuid.uuid4().hex[:8].upper()}"
+        self.player_name = f"Load Test Player {index}"
+        self.student_id = self.player_id  # UNIQUE column, must differ between runs
+        self.machine_guid = fake_machine_guid()
+        self.templates = make_templates(self.rng)
+        self.session = requests.Session()
+
+    def _post(self, operation, path, payload):
+        """POST JSON and record latency / status"""
+        start = time.perf_counter()
+        try:
+            response = self.session.post(f"{self.server_url}{path}", json=payload, timeout=self.timeout)
+            status = response.status_code
+        except requests.exceptions.Timeout:
+            status = 'timeout'
+        except requests.exceptions.RequestException:
+            status = 'connection_error'
+        self.recorder.record(operation, time.perf_counter() - start, status)
+        return status
+
+    def register(self):
+        """Register this player with synthetic templates"""
+        status = self._post('register', '/api/register', {
+            'player_id': self.player_id,
+            'name': self.player_name,
+            'student_id': self.student_id,
+            'facial_encoding': self.templates.tolist(),
+            'machine_guid': self.machine_guid
+        })
+        return status == 200
+
+    def verify_once(self):
+        """Send one verification request"""
+        if self.rng.random() < self.impostor_rate:
+            probe = impostor_probe(self.rng)
+        else:
+            probe = genuine_probe(self.rng, self.templates)
+
+        payload = {
+            'player_id': self.player_id,
+            'facial_encoding': probe.tolist(),
+            'machine_guid': self.machine_guid
+        }
+
+        image_data = self.payloads[int(self.rng.integers(len(self.payloads)))]
+        if image_data:
+            payload['image_data'] = image_data
+
+        self._post('verify', '/api/verify', payload)
+
+    def run(self):
+        if not self.register():
+            return
+
+        # Spread players over the interval so requests do not arrive in lockstep
+        self.stop_event.wait(self.rng.random() * self.interval)
+
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            self.verify_once()
+            self.stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
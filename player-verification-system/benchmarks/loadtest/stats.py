@@ -0,0 +1,137 @@
+"""
+Latency / error bookkeeping and JSON result files for load tests
+"""
+import json
+import threading
+import time
+
+import numpy as np
+
+class LatencyRecorder:
+    """Thread-safe per-operation latency and outcome recorder"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._statuses = {}
+        self._errors = {}
+        self.started = time.time()
+        self.finished = None
+
+    def record(self, operation, seconds, status):
+        """
+        Record one completed operation
+
+        Args:
+            operation: Name such as 'verify' or 'logs_recent'
+            seconds: Latency
+            status: HTTP status code (int) or short error label (str)
+        """
+        with self._lock:
+            self._latencies.setdefault(operation, []).append(seconds)
+            statuses = self._statuses.setdefault(operation, {})
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+            if not (isinstance(status, int) and status < 400):
+                self._errors[operation] = self._errors.get(operation, 0) + 1
+
+    def start(self, keep=()):
+        """
+        Begin the measured window now (e.g. once every client is running)
+
+        Samples recorded so far are warm-up and are dropped, except for
+        the operations in keep.
+        """
+        with self._lock:
+            for records in (self._latencies, self._statuses, self._errors):
+                for operation in list(records):
+                    if operation not in keep:
+                        del records[operation]
+            self.started = time.time()
+
+    def stop(self):
+        """Mark the end of the measured window"""
+        self.finished = time.time()
+
+    def summary(self):
+        """
+        Summarize every operation
+
+        Returns:
+            dict: operation -> count, throughput, error rate and latency percentiles (ms)
+        """
+        elapsed = (self.finished or time.time()) - self.started
+        results = {}
+
+        with self._lock:
+            for operation, latencies in self._latencies.items():
+                values = np.array(latencies) * 1000
+                count = len(values)
+                errors = self._errors.get(operation, 0)
+                results[operation] = {
+                    'count': count,
+                    'throughput_per_s': count / elapsed if elapsed > 0 else 0.0,
+                    'error_rate': errors / count if count else 0.0,
+                    'statuses': dict(self._statuses.get(operation, {})),
+                    'latency_ms': {
+                        'mean': float(values.mean()),
+                        'p50': float(np.percentile(values, 50)),
+                        'p95': float(np.percentile(values, 95)),
+                        'p99': float(np.percentile(values, 99)),
+                        'max': float(values.max())
+                    }
+                }
+
+        return results
+
+    def save_json(self, path, config, extra=None):
+        """
+        Write configuration and summary to a JSON file
+
+        Args:
+            path: Output file
+            config: Load test parameters (dict)
+            extra: Additional sections (e.g. Socket.IO stats)
+        """
+        result = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'duration_s': (self.finished or time.time()) - self.started,
+            'config': config,
+            'operations': self.summary()
+        }
+        if extra:
+            result.update(extra)
+
+        with open(path, 'w') as f:
+            json.dump(result, f, indent=2)
+
+        return result
+
+def compare_results(baseline, current):
+    """
+    Compare two saved result files operation by operation
+
+    Args:
+        baseline, current: Parsed JSON results
+
+    Returns:
+        list: (operation, metric, baseline value, current value, relative change)
+    """
+    rows = []
+    for operation, stats in current['operations'].items():
+        before = baseline.get('operations', {}).get(operation)
+        if before is None:
+            continue
+
+        pairs = [
+            ('throughput_per_s', before['throughput_per_s'], stats['throughput_per_s']),
+            ('error_rate', before['error_rate'], stats['error_rate'])
+        ]
+        for key in ('p50', 'p95', 'p99'):
+            pairs.append((f'{key}_ms', before['latency_ms'][key], stats['latency_ms'][key]))
+
+        for metric, old, new in pairs:
+            change = (new - old) / old if old else 0.0
+            rows.append((operation, metric, old, new, change))
+
+    return rows
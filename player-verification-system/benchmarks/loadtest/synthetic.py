@@ -0,0 +1,59 @@
+"""
+Synthetic players: 128-d encodings, machine GUIDs and JPEG payloads
+"""
+import base64
+import uuid
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+ENCODING_SIZE = 128
+
+# Per-dimension noise so a genuine probe lands ~0.3 from its templates,
+# well inside the server's 0.6 tolerance
+GENUINE_NOISE = 0.3 / np.sqrt(ENCODING_SIZE)
+
+def make_templates(rng, count=5):
+    """
+    Create enrollment templates for one synthetic player
+
+    Returns:
+        numpy.ndarray of shape (count, 128)
+    """
+    identity = rng.normal(0, 0.1, ENCODING_SIZE)
+    return identity + rng.normal(0, GENUINE_NOISE / 2, (count, ENCODING_SIZE))
+
+def genuine_probe(rng, templates):
+    """Encoding of the registered player under new conditions"""
+    return templates.mean(axis=0) + rng.normal(0, GENUINE_NOISE, ENCODING_SIZE)
+
+def impostor_probe(rng):
+    """Encoding of somebody else (should FAIL)"""
+    return rng.normal(0, 0.1, ENCODING_SIZE)
+
+def fake_machine_guid():
+    """Random Windows-style MachineGuid"""
+    return str(uuid.uuid4())
+
+def make_jpeg_payload(rng, width=640, height=480, quality=80):
+    """
+    Build a data-URL JPEG like the player client sends
+
+    Args:
+        rng: numpy Generator
+        width, height: Image size in pixels
+        quality: JPEG quality (higher = larger payload)
+
+    Returns:
+        str: 'data:image/jpeg;base64,...'
+    """
+    # Smooth gradient plus noise compresses like a webcam frame
+    y, x = np.mgrid[0:height, 0:width]
+    base = ((x / max(width - 1, 1)) * 160 + (y / max(height - 1, 1)) * 60).astype(np.int16)
+    noise = rng.integers(-20, 20, (height, width, 3))
+    pixels = np.clip(base[..., None] + noise, 0, 255).astype(np.uint8)
+
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, format='JPEG', quality=quality)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode('utf-8')
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for models.py and FaceVerification primitives
+
+Runs each building block against a temporary database seeded with
+deterministic synthetic data, saves the timings as JSON and optionally
+flags regressions against an earlier run.
+"""
+import sys
+import os
+import argparse
+import base64
+import json
+import pickle
+import shutil
+import sqlite3
+import tempfile
+import time
+import timeit
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+# Add server directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+import models
+from models import Player, PlayerTemplate, VerificationLog, init_db
+from verification import FaceVerification
+
+SEED = 1234
+STATUSES = ('VERIFIED', 'FAILED')
+
+def seed_players(count, rng):
+    """Insert `count` synthetic players; returns their IDs"""
+    player_ids = []
+    for index in range(count):
+        player_id = f"BENCH_{index:06d}"
+        templates = rng.normal(0, 0.1, (5, 128))
+        Player.create(player_id, f"Bench Player {index}", f"B{index:06d}", templates, f"guid-{index}")
+        player_ids.append(player_id)
+    return player_ids
+
+def seed_logs(target_rows, player_ids, rng):
+    """Grow verification_logs to `target_rows` rows in one transaction"""
+    conn = models.get_db_connection()
+    current = conn.execute('SELECT COUNT(*) FROM verification_logs').fetchone()[0]
+    missing = target_rows - current
+
+    if missing > 0:
+        rows = [
+            (player_ids[int(rng.integers(len(player_ids)))],
+             STATUSES[int(rng.random() < 0.1)],
+             float(rng.uniform(0.3, 0.9)),
+             'no_image.jpg',
+             bool(rng.random() < 0.98))
+            for _ in range(missing)
+        ]
+        conn.executemany('''
+            INSERT INTO verification_logs
+            (player_id, verification_status, confidence_score, image_path, device_matched)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+    conn.close()
+
+def measure(fn, number, repeat):
+    """
+    Time a callable
+
+    Returns:
+        dict: median / best per-call time in microseconds
+    """
+    runs = timeit.repeat(fn, number=number, repeat=repeat)
+    per_call = np.array(runs) / number * 1e6
+    return {
+        'median_us': float(np.median(per_call)),
+        'best_us': float(per_call.min()),
+        'number': number,
+        'repeat': repeat
+    }
+
+def make_image_payload(rng, width=640, height=480):
+    """Base64 data URL of a deterministic JPEG"""
+    pixels = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, format='JPEG', quality=80)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+def run_benchmarks(args, work_dir):
+    """Run every benchmark case; returns name -> timing dict"""
+    rng = np.random.default_rng(SEED)
+    results = {}
+    scale = args.scale
+
+    def bench(name, fn, number):
+        number = max(1, int(number * scale))
+        results[name] = measure(fn, number, args.repeat)
+        print(f"{name:<40}{results[name]['median_us']:>12.1f} us")
+
+    models.DATABASE_PATH = os.path.join(work_dir, 'bench.db')
+    init_db()
+    player_ids = seed_players(args.players, rng)
+    probe_id = player_ids[len(player_ids) // 2]
+
+    print("=" * 52)
+    print(f"{'benchmark':<40}{'median':>12}")
+    print("-" * 52)
+
+    # Player lookups
+    bench('Player.get_by_id', lambda: Player.get_by_id(probe_id), 2000)
+
+    def gallery_cold():
+        PlayerTemplate.invalidate(probe_id)
+        return PlayerTemplate.get_gallery(probe_id)
+
+    bench('PlayerTemplate.get_gallery (cold)', gallery_cold, 2000)
+    bench('PlayerTemplate.get_gallery (cached)', lambda: PlayerTemplate.get_gallery(probe_id), 20000)
+
+    # Encoding serialization
+    encoding = rng.normal(0, 0.1, 128)
+    blob = pickle.dumps(encoding)
+    encoding32 = encoding.astype(np.float32)
+    raw = encoding32.tobytes()
+
+    bench('encoding pickle.dumps', lambda: pickle.dumps(encoding), 20000)
+    bench('encoding pickle.loads', lambda: pickle.loads(blob), 20000)
+    bench('encoding float32 tobytes', lambda: encoding32.tobytes(), 20000)
+    bench('encoding float32 frombuffer', lambda: np.frombuffer(raw, dtype=np.float32), 20000)
+
+    # Face verification math
+    verifier = FaceVerification()
+    gallery = PlayerTemplate.get_gallery(probe_id)
+    probe = gallery[0] + rng.normal(0, 0.02, 128)
+
+    bench('FaceVerification.verify_face (1 tmpl)', lambda: verifier.verify_face(probe, gallery[0]), 20000)
+    bench('FaceVerification.verify_face (5 tmpl)', lambda: verifier.verify_face(probe, gallery), 20000)
+
+    # Image decode path used by /api/verify
+    image_data = make_image_payload(rng)
+
+    def decode_image():
+        image_bytes = base64.b64decode(image_data.split(',')[1])
+        return np.array(Image.open(BytesIO(image_bytes)))
+
+    bench('base64 + PIL decode (640x480)', decode_image, 200)
+
+    image_array = decode_image()
+    images_dir = os.path.join(work_dir, 'images')
+    try:
+        bench('FaceVerification.save_verification_image',
+              lambda: verifier.save_verification_image(image_array, probe_id, logs_dir=images_dir), 100)
+    except ImportError as e:
+        print(f"{'FaceVerification.save_verification_image':<40}{'skipped':>12} ({e})")
+
+    # Log writes
+    bench('VerificationLog.create',
+          lambda: VerificationLog.create(probe_id, 'VERIFIED', 0.8, 'no_image.jpg', True), 500)
+
+    # Log reads at increasing table sizes
+    for size in args.log_sizes:
+        seed_logs(size, player_ids, rng)
+        bench(f'VerificationLog.get_recent(100) @ {size}', lambda: VerificationLog.get_recent(100), 100)
+        bench(f'VerificationLog.get_by_player @ {size}', lambda: VerificationLog.get_by_player(probe_id), 100)
+
+    print("=" * 52)
+    return results
+
+def check_regressions(baseline, results, threshold):
+    """
+    Compare medians with a baseline run
+
+    Returns:
+        list: (name, baseline us, current us, relative change) beyond threshold
+    """
+    regressions = []
+    for name, timing in results.items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            continue
+        change = (timing['median_us'] - before['median_us']) / before['median_us']
+        if change > threshold:
+            regressions.append((name, before['median_us'], timing['median_us'], change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Micro-benchmark models.py and FaceVerification primitives'
+    )
+
+    parser.add_argument('--players', type=int, default=200,
+                        help='Seeded players (default: 200)')
+    parser.add_argument('--log-sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='verification_logs sizes for read benchmarks')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Timing repeats per benchmark (default: 5)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Multiply iteration counts (e.g. 0.1 for a quick run)')
+    parser.add_argument('--output', default='microbench_results.json',
+                        help='Result file (default: microbench_results.json)')
+    parser.add_argument('--baseline',
+                        help='Earlier result file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown before flagging, as a fraction (default: 0.25)')
+
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='pvs_microbench_')
+    try:
+        results = run_benchmarks(args, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'sqlite': sqlite3.sqlite_version,
+        'config': {key: value for key, value in vars(args).items()
+                   if key not in ('output', 'baseline')},
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = check_regressions(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for name, before, after, change in regressions:
+                print(f"  {name:<40}{before:>10.1f} -> {after:>10.1f} us  ({change:+.0%})")
+            sys.exit(1)
+
+        print(f"\n✓ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == '__main__':
+    main()
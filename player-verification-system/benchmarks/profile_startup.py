@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Server Startup Import Profiler
+
+Imports server/app.py in a fresh interpreter with `-X importtime` and
+reports the slowest imports. Fails if a heavy vision module (cv2, dlib,
+face_recognition) is loaded at startup.
+"""
+import sys
+import os
+import argparse
+import subprocess
+import time
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'server')
+
+# Modules that must only load on first use
+HEAVY_MODULES = ('cv2', 'dlib', 'face_recognition', 'face_recognition_models')
+
+def profile_import(module):
+    """
+    Import a module in a subprocess with -X importtime
+
+    Returns:
+        tuple: (wall time in seconds, list of (cumulative_us, self_us, name))
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SERVER_DIR,
+        capture_output=True,
+        text=True
+    )
+    wall = time.perf_counter() - start
+
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(f"Error: importing {module} failed")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+    return wall, entries
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Profile server start-up imports'
+    )
+
+    parser.add_argument(
+        '--module',
+        default='app',
+        help='Module to import from server/ (default: app)'
+    )
+
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=20,
+        help='Number of slowest imports to list (default: 20)'
+    )
+
+    args = parser.parse_args()
+
+    wall, entries = profile_import(args.module)
+
+    print("=" * 60)
+    print(f"Startup profile: import {args.module}")
+    print("=" * 60)
+    print(f"Wall time (interpreter + imports): {wall * 1000:.0f} ms")
+    print(f"Modules imported: {len(entries)}")
+    print()
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    print("-" * 60)
+
+    for cumulative_us, self_us, name in sorted(entries, reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}{self_us / 1000:>10.1f}  {name}")
+
+    loaded = sorted({name.strip() for _, _, name in entries
+                     if name.strip().split('.')[0] in HEAVY_MODULES})
+
+    print("=" * 60)
+    if loaded:
+        print(f"✗ Heavy modules loaded at startup: {', '.join(loaded)}")
+        sys.exit(1)
+
+    print("✓ No heavy vision modules loaded at startup")
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,7 @@ import threading
 import time
 import sys
 import os
+from datetime import datetime
 
 # Add parent directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
@@ -32,6 +33,8 @@ class VerificationClient:
         
         self.is_running = False
         self.verification_interval = 30  # seconds
+        self.burst_size = 5  # frames grabbed per check, best one is sent
+        self.send_image_only = False  # let the server compute the encoding
         self.cap = None
         
         self.setup_ui()
@@ -235,21 +238,31 @@ class VerificationClient:
         if not self.cap or not self.cap.isOpened():
             return
         
-        # Capture frame
-        ret, frame = self.cap.read()
-        if not ret:
-            return
+        # Capture a short burst of frames
+        frames = []
+        for _ in range(self.burst_size):
+            ret, frame = self.cap.read()
+            if ret:
+                frames.append(frame)
         
-        # Convert to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if not frames:
+            return
         
-        # Get face encoding
-        encoding = self.face_verifier.detect_and_encode_from_array(rgb_frame)
+        # Quality-gate the burst and encode only the best frame
+        rgb_frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+        index, encoding, quality = self.face_verifier.encode_best_frame(rgb_frames)
         
         if encoding is None:
-            self.update_status("NO FACE", 'orange', None, None)
+            reason = quality['reasons'][0] if quality and quality['reasons'] else 'no_face'
+            status = "NO FACE" if reason in ('no_face', 'multiple_faces') else "ADJUST"
+            self.update_status(status, 'orange', None, None)
+            self.status_bar.config(
+                text=self.face_verifier.QUALITY_HINTS.get(reason, "Adjust your position")
+            )
             return
         
+        frame = frames[index]
+        
         # Convert frame to base64
         _, buffer = cv2.imencode('.jpg', frame)
         image_base64 = base64.b64encode(buffer).decode('utf-8')
@@ -258,11 +271,13 @@ class VerificationClient:
         # Send to server
         data = {
             'player_id': self.player_id,
-            'facial_encoding': encoding.tolist(),
             'machine_guid': self.machine_guid,
             'image_data': image_data
         }
         
+        if not self.send_image_only:
+            data['facial_encoding'] = encoding.tolist()
+        
         try:
             response = requests.post(
                 f"{self.server_url}/api/verify",
@@ -276,11 +291,17 @@ class VerificationClient:
                 status = result['verification_status']
                 confidence = result['confidence']
                 device_match = result['device_match']
-                
+
+                # The server sets the verification cadence
+                self.verification_interval = int(result.get('verification_interval',
+                                                            self.verification_interval))
+
                 self.update_status(status, 
                                  'green' if status == 'VERIFIED' else 'red',
                                  confidence,
                                  device_match)
+            elif response.status_code == 422:
+                self.update_status("NO FACE", 'orange', None, None)
             else:
                 self.update_status("ERROR", 'red', None, None)
         
@@ -307,7 +328,6 @@ class VerificationClient:
         else:
             self.device_match_label.config(text="Device Match: --", fg='black')
         
-        from datetime import datetime
         self.timestamp_label.config(
             text=f"Last Check: {datetime.now().strftime('%H:%M:%S')}"
         )
@@ -325,8 +345,7 @@ class VerificationClient:
                 rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 
                 # Detect faces and draw rectangles
-                import face_recognition
-                face_locations = face_recognition.face_locations(rgb_frame)
+                face_locations = self.face_verifier.detect_faces(rgb_frame)
                 
                 for (top, right, bottom, left) in face_locations:
                     cv2.rectangle(frame, (left, top), (right, bottom), (0, 255, 0), 2)
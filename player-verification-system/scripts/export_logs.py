@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Verification Log Export Script
+"""
+import sys
+import os
+import argparse
+
+# Add server directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from log_export import EXPORT_FORMATS, STREAMING_FORMATS, stream_logs, write_columnar
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Export verification logs as CSV, JSON Lines, NPZ or Parquet'
+    )
+
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv',
+                        help='Export format (default: csv)')
+    parser.add_argument('--output', '-o',
+                        help='Output file (default: stdout for csv/jsonl)')
+    parser.add_argument('--start', help='Earliest timestamp, e.g. 2024-05-01')
+    parser.add_argument('--end', help='Latest timestamp (exclusive), e.g. 2024-06-01')
+    parser.add_argument('--player-id', help='Only this player')
+    parser.add_argument('--status', choices=['VERIFIED', 'FAILED'], help='Only this status')
+    parser.add_argument('--chunk-size', type=int, default=5000,
+                        help='Rows read per database round trip (default: 5000)')
+
+    args = parser.parse_args()
+
+    filters = {
+        'start': args.start,
+        'end': args.end,
+        'player_id': args.player_id,
+        'status': args.status
+    }
+
+    if args.format in STREAMING_FORMATS:
+        output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+        try:
+            for block in stream_logs(args.format, chunk_size=args.chunk_size, **filters):
+                output.write(block)
+        finally:
+            if args.output:
+                output.close()
+        if args.output:
+            print(f"✓ Exported logs to {args.output}", file=sys.stderr)
+        return
+
+    if not args.output:
+        parser.error(f"--output is required for {args.format}")
+
+    try:
+        row_count = write_columnar(args.format, args.output, chunk_size=args.chunk_size, **filters)
+    except ImportError:
+        print(f"✗ Error: {args.format} export requires pyarrow (pip install pyarrow)", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"✓ Exported {row_count} logs to {args.output}")
+
+if __name__ == '__main__':
+    main()
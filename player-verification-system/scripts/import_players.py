@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Bulk Player Enrollment Importer
+"""
+import sys
+import os
+import argparse
+import csv
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Add server directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from models import Player, PlayerTemplate, init_db
+from verification import FaceVerification
+from distance_kernels import many_to_many, squared_tolerance
+from utils import lazy_module
+
+face_recognition = lazy_module('face_recognition')
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Per-process verifier, built once by the pool initializer
+_verifier = None
+
+def _init_worker(detector):
+    """Pool initializer: one FaceVerification per worker process"""
+    global _verifier
+    _verifier = FaceVerification(detector=detector)
+
+def _encode_photo(task):
+    """
+    Encode one photo in a worker process
+
+    Args:
+        task: (student_id, photo path, skip_quality)
+
+    Returns:
+        tuple: (student_id, photo path, encoding list or None, failure reason or None)
+    """
+    student_id, path, skip_quality = task
+
+    try:
+        if skip_quality:
+            encoding = _verifier.detect_and_encode_from_image(path)
+            if encoding is None:
+                return student_id, path, None, 'no_face'
+            return student_id, path, encoding.tolist(), None
+
+        image = face_recognition.load_image_file(path)
+        index, encoding, quality = _verifier.encode_best_frame([image])
+
+        if encoding is None:
+            reasons = quality['reasons'] if quality else ['no_face']
+            return student_id, path, None, ','.join(reasons or ['no_encoding'])
+
+        return student_id, path, encoding.tolist(), None
+
+    except (OSError, ValueError) as e:
+        return student_id, path, None, f'unreadable: {e}'
+
+def read_csv_source(csv_path):
+    """
+    Read students from a CSV with student_id, name, machine_guid and photo columns
+
+    Photo paths are relative to the CSV file. Several rows with the same
+    student_id add more photos for that student.
+
+    Returns:
+        OrderedDict: student_id -> {'name', 'machine_guid', 'photos'}
+    """
+    base_dir = os.path.dirname(os.path.abspath(csv_path))
+    students = OrderedDict()
+
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        missing = {'student_id', 'name', 'machine_guid', 'photo'} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+
+        for row in reader:
+            student_id = row['student_id'].strip()
+            if not student_id:
+                continue
+
+            student = students.setdefault(student_id, {
+                'name': row['name'].strip(),
+                'machine_guid': row['machine_guid'].strip(),
+                'photos': []
+            })
+            student['photos'].append(os.path.join(base_dir, row['photo'].strip()))
+
+    return students
+
+def read_folder_source(folder):
+    """
+    Read students from a folder with one sub-folder per student ID
+
+    Each sub-folder holds the student's photos and an info.txt with
+    "Name:" and "Machine GUID:" lines.
+
+    Returns:
+        OrderedDict: student_id -> {'name', 'machine_guid', 'photos'}
+    """
+    students = OrderedDict()
+
+    for student_id in sorted(os.listdir(folder)):
+        student_dir = os.path.join(folder, student_id)
+        if not os.path.isdir(student_dir):
+            continue
+
+        info = {}
+        info_path = os.path.join(student_dir, 'info.txt')
+        if os.path.exists(info_path):
+            with open(info_path, encoding='utf-8') as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    info[key.strip().lower()] = value.strip()
+
+        photos = [
+            os.path.join(student_dir, filename)
+            for filename in sorted(os.listdir(student_dir))
+            if filename.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+
+        students[student_id] = {
+            'name': info.get('name', ''),
+            'machine_guid': info.get('machine guid', ''),
+            'photos': photos
+        }
+
+    return students
+
+def validate_students(students, failures):
+    """Drop students without a name, machine GUID or photos"""
+    valid = OrderedDict()
+    guid_owners = {}
+
+    for student_id, student in students.items():
+        for field in ('name', 'machine_guid'):
+            if not student[field]:
+                failures.append((student_id, '', f'missing_{field}'))
+                break
+        else:
+            if not student['photos']:
+                failures.append((student_id, '', 'no_photos'))
+                continue
+
+            valid[student_id] = student
+            guid_owners.setdefault(student['machine_guid'], []).append(student_id)
+
+    # Shared lab machines are legitimate, but worth a look
+    for guid, owners in guid_owners.items():
+        if len(owners) > 1:
+            print(f"  ! Machine GUID {guid} is shared by {', '.join(owners)}")
+
+    return valid
+
+def import_chunk(chunk, students, pool, args, gallery, failures):
+    """
+    Encode, check and insert one chunk of students in a single transaction
+
+    Args:
+        chunk: Student IDs in this chunk
+        students: student_id -> student record
+        pool: ProcessPoolExecutor
+        args: Parsed command-line arguments
+        gallery: dict with 'labels' and 'matrix' of known encodings (updated in place)
+        failures: List collecting (student_id, photo, reason)
+
+    Returns:
+        list: (student_id, player_id) pairs inserted
+    """
+    tasks = [
+        (student_id, photo, args.skip_quality)
+        for student_id in chunk
+        for photo in students[student_id]['photos']
+    ]
+
+    encodings = {}
+    for student_id, photo, encoding, reason in pool.map(_encode_photo, tasks, chunksize=4):
+        if encoding is None:
+            failures.append((student_id, photo, reason))
+        else:
+            encodings.setdefault(student_id, []).append(encoding)
+
+    # Students with too few usable photos are left for a later run
+    for student_id in chunk:
+        usable = len(encodings.get(student_id, []))
+        if 0 < usable < args.min_photos:
+            failures.append((student_id, '', f'only_{usable}_usable_photos'))
+            del encodings[student_id]
+        elif usable == 0:
+            failures.append((student_id, '', 'no_usable_photos'))
+
+    if not encodings:
+        return []
+
+    student_ids = list(encodings)
+    templates = [np.asarray(encodings[student_id], dtype=np.float32) for student_id in student_ids]
+    means = np.array([t.mean(axis=0) for t in templates], dtype=np.float32)
+    threshold_sq = squared_tolerance(args.duplicate_threshold)
+
+    # Duplicate faces: against everyone already enrolled or imported, then within the chunk
+    keep = np.ones(len(student_ids), dtype=bool)
+    if not args.allow_duplicates:
+        if len(gallery['labels']):
+            distances = many_to_many(means, gallery['matrix'], squared=True)
+            closest = distances.argmin(axis=1)
+            for row, column in enumerate(closest):
+                if distances[row, column] < threshold_sq:
+                    keep[row] = False
+                    failures.append((student_ids[row], '',
+                                     f"duplicate_of:{gallery['labels'][column]}"))
+
+        within = many_to_many(means, means, squared=True)
+        for row in range(len(student_ids)):
+            for column in range(row):
+                if keep[row] and keep[column] and within[row, column] < threshold_sq:
+                    keep[row] = False
+                    failures.append((student_ids[row], '',
+                                     f'duplicate_of_student:{student_ids[column]}'))
+
+    records = []
+    imported = []
+    for index, student_id in enumerate(student_ids):
+        if not keep[index]:
+            continue
+        student = students[student_id]
+        player_id = f"PLAYER_{uuid.uuid4().hex[:8].upper()}"
+        records.append((player_id, student['name'], student_id, templates[index],
+                        student['machine_guid']))
+        imported.append((student_id, player_id))
+
+    if records and not args.dry_run:
+        Player.create_many(records)
+
+    kept = means[keep]
+    gallery['labels'].extend(player_id for _, player_id in imported)
+    gallery['matrix'] = np.vstack([gallery['matrix'], kept]) if len(kept) else gallery['matrix']
+
+    return imported
+
+def write_report(path, rows, header, mode='w'):
+    """Write (or append) rows to a CSV report"""
+    new_file = mode == 'w' or not os.path.exists(path)
+    with open(path, mode, newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(header)
+        writer.writerows(rows)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Bulk-enroll players from a CSV file or a folder of student photos'
+    )
+
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--csv', help='CSV with student_id, name, machine_guid, photo columns')
+    source.add_argument('--folder', help='Folder with one sub-folder (photos + info.txt) per student ID')
+
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Encoding processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=50,
+                        help='Students encoded and inserted per transaction (default: 50)')
+    parser.add_argument('--min-photos', type=int, default=1,
+                        help='Usable photos required per student (default: 1)')
+    parser.add_argument('--detector', default='hog', choices=FaceVerification.DETECTORS,
+                        help='Face detector (default: hog; photos are not time-critical)')
+    parser.add_argument('--skip-quality', action='store_true',
+                        help='Encode without the blur/exposure/pose quality gate')
+    parser.add_argument('--duplicate-threshold', type=float, default=0.45,
+                        help='Face distance below which two students are duplicates (default: 0.45)')
+    parser.add_argument('--allow-duplicates', action='store_true',
+                        help='Import students even if their face matches another player')
+    parser.add_argument('--failures', default='import_failures.csv',
+                        help='Per-image failure report (default: import_failures.csv)')
+    parser.add_argument('--output', default='imported_players.csv',
+                        help='student_id -> player_id list, appended per run (default: imported_players.csv)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Encode and check everything without writing to the database')
+
+    args = parser.parse_args()
+
+    init_db()
+
+    students = read_csv_source(args.csv) if args.csv else read_folder_source(args.folder)
+
+    print("\n" + "=" * 60)
+    print("Bulk Player Import")
+    print("=" * 60)
+    print(f"Source: {args.csv or args.folder}")
+    print(f"Students found: {len(students)}")
+
+    failures = []
+    students = validate_students(students, failures)
+
+    # Resume: anyone already in the database was imported by an earlier run
+    existing = Player.get_existing_student_ids(students)
+    pending = [student_id for student_id in students if student_id not in existing]
+
+    print(f"Already registered (skipped): {len(existing)}")
+    print(f"To import: {len(pending)} students, "
+          f"{sum(len(students[s]['photos']) for s in pending)} photos")
+    print("=" * 60)
+
+    labels, matrix = PlayerTemplate.load_all()
+    gallery = {'labels': labels, 'matrix': matrix}
+
+    imported_total = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                 initargs=(args.detector,)) as pool:
+            for start in range(0, len(pending), args.batch_size):
+                chunk = pending[start:start + args.batch_size]
+                imported = import_chunk(chunk, students, pool, args, gallery, failures)
+                imported_total += len(imported)
+
+                if imported and not args.dry_run:
+                    write_report(args.output, imported, ['student_id', 'player_id'], mode='a')
+
+                print(f"  {min(start + len(chunk), len(pending))}/{len(pending)} processed, "
+                      f"{imported_total} imported")
+    except KeyboardInterrupt:
+        print("\nInterrupted - committed batches are kept; run again to resume")
+    finally:
+        write_report(args.failures, failures, ['student_id', 'photo', 'reason'])
+
+    print("\n" + "=" * 60)
+    print(f"✓ Imported: {imported_total}{' (dry run)' if args.dry_run else ''}")
+    if failures:
+        print(f"✗ Failures: {len(failures)} (see {args.failures})")
+    print("=" * 60)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Verification Log Retention Script
+"""
+import sys
+import os
+import argparse
+
+# Add server directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from config import get_settings
+from retention import archive_expired, compress_closed_archives, prune_minute_rollups, vacuum
+
+def main():
+    settings = get_settings()
+    policies = settings.RETENTION_POLICIES
+
+    parser = argparse.ArgumentParser(
+        description='Archive expired verification logs, prune their images and compact the database'
+    )
+
+    parser.add_argument('--archive-dir', default=settings.RETENTION_ARCHIVE_DIR,
+                        help='Directory for monthly archive databases (default: RETENTION_ARCHIVE_DIR)')
+    parser.add_argument('--keep-failed', type=int, default=policies['FAILED'],
+                        help=f"Days to keep FAILED logs (default: {policies['FAILED']})")
+    parser.add_argument('--keep-verified', type=int, default=policies['VERIFIED'],
+                        help=f"Days to keep VERIFIED logs (default: {policies['VERIFIED']})")
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help='Rows moved per transaction (default: 500)')
+    parser.add_argument('--pause', type=float, default=0.05,
+                        help='Seconds between batches (default: 0.05)')
+    parser.add_argument('--vacuum-pages', type=int, default=1000,
+                        help='Pages released per incremental vacuum (default: 1000)')
+    parser.add_argument('--no-vacuum', action='store_true',
+                        help='Skip vacuuming')
+
+    args = parser.parse_args()
+
+    policies = {'FAILED': args.keep_failed, 'VERIFIED': args.keep_verified}
+
+    print("=" * 60)
+    print("Verification Log Retention")
+    print("=" * 60)
+
+    stats = archive_expired(args.archive_dir, policies, batch_size=args.batch_size, pause=args.pause)
+    for status, counts in stats.items():
+        print(f"{status:<10} kept {policies[status]:>4} days: "
+              f"{counts['archived']} rows archived, {counts['images_removed']} images removed")
+
+    compressed = compress_closed_archives(args.archive_dir, policies)
+    for path in compressed:
+        print(f"✓ Compressed {os.path.basename(path)}")
+
+    pruned = prune_minute_rollups()
+    print(f"✓ Pruned {pruned} minute rollups")
+
+    if not args.no_vacuum:
+        result = vacuum(args.vacuum_pages)
+        print(f"✓ Vacuum ({result['mode']}): free pages "
+              f"{result['free_pages_before']} -> {result['free_pages_after']}")
+
+    print("=" * 60)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+Streaming Anomaly Detection - flags likely piloting from the verification stream
+"""
+import threading
+import time
+
+import numpy as np
+
+from distance_kernels import as_float32, many_to_many, squared_norms
+
+class PlayerStreamState:
+    """Constant-size running statistics for one player"""
+
+    __slots__ = ('count', 'fast', 'slow', 'cusum', 'last_status', 'flip_rate', 'last_alert')
+
+    def __init__(self):
+        self.count = 0
+        self.fast = 0.0        # Short-horizon EWMA of confidence
+        self.slow = 0.0        # Long-horizon EWMA (the player's baseline)
+        self.cusum = 0.0       # One-sided CUSUM of drops below the baseline
+        self.last_status = None
+        self.flip_rate = 0.0   # EWMA of VERIFIED <-> FAILED switches
+        self.last_alert = {}   # kind -> time of last alert
+
+class CrossMatchIndex:
+    """In-memory copy of every player's templates for cross-player matching"""
+
+    def __init__(self, loader=None):
+        """
+        Args:
+            loader: Callable returning (labels, matrix), called on first use
+                    (e.g. PlayerTemplate.load_all)
+        """
+        self._lock = threading.Lock()
+        self._loader = loader
+        self._player_ids = []   # code -> player_id
+        self._codes_by_id = {}  # player_id -> code
+        self._set(np.empty(0, dtype=np.int32), np.empty((0, 128), dtype=np.float32))
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._codes)
+
+    def _set(self, codes, matrix):
+        """Swap in new arrays; readers take one consistent snapshot"""
+        self._snapshot = (codes, matrix, squared_norms(matrix))
+        self._codes = codes
+
+    def _code(self, player_id):
+        """Integer code for a player ID (lock held)"""
+        code = self._codes_by_id.get(player_id)
+        if code is None:
+            code = self._codes_by_id[player_id] = len(self._player_ids)
+            self._player_ids.append(player_id)
+        return code
+
+    def _ensure_loaded(self):
+        """Fill the index from the loader once; True if this call loaded it"""
+        if self._loader is None:
+            return False
+        with self._lock:
+            loader, self._loader = self._loader, None
+            if loader is None:
+                return False
+            self._load(*loader())
+            return True
+
+    def _load(self, labels, matrix):
+        """Replace the contents (lock held)"""
+        self._player_ids = []
+        self._codes_by_id = {}
+        codes = np.fromiter((self._code(label) for label in labels), dtype=np.int32, count=len(labels))
+        self._set(codes, as_float32(np.asarray(matrix).reshape(-1, 128)))
+
+    def load(self, labels, matrix):
+        """
+        Replace the index contents
+
+        Args:
+            labels: Player ID per row
+            matrix: (N, 128) encodings, e.g. from PlayerTemplate.load_all()
+        """
+        with self._lock:
+            self._loader = None
+            self._load(labels, matrix)
+
+    def add(self, player_id, encodings):
+        """Append a newly registered player's templates"""
+        if self._ensure_loaded() and player_id in self._codes_by_id:
+            return  # Already read from the database
+        encodings = as_float32(np.atleast_2d(encodings))
+        with self._lock:
+            codes, matrix, _ = self._snapshot
+            code = self._code(player_id)
+            self._set(np.concatenate([codes, np.full(len(encodings), code, dtype=np.int32)]),
+                      np.vstack([matrix, encodings]))
+
+    def nearest_other(self, player_id, encoding):
+        """
+        Closest template belonging to a different player
+
+        Returns:
+            tuple: (player_id, distance), or (None, None) if there is none
+        """
+        self._ensure_loaded()
+        codes, matrix, norms = self._snapshot
+        if len(codes) == 0:
+            return None, None
+
+        # Norm expansion with cached gallery norms: one matrix-vector product
+        distances_sq = many_to_many(np.atleast_2d(encoding), matrix, squared=True,
+                                    gallery_norms=norms)[0]
+
+        own_code = self._codes_by_id.get(player_id)
+        if own_code is not None:
+            distances_sq[codes == own_code] = np.inf
+
+        best = int(np.argmin(distances_sq))
+        if not np.isfinite(distances_sq[best]):
+            return None, None
+
+        return self._player_ids[codes[best]], float(np.sqrt(distances_sq[best]))
+
+class AnomalyDetector:
+    """
+    Online piloting detector fed with every verification result
+
+    Keeps O(1) state per player and never reads the log table. Raises:
+        confidence_drop  - short-term confidence well below the player's baseline
+        change_point     - CUSUM of sustained drops crosses its threshold
+        alternating      - VERIFIED and FAILED keep swapping
+        cross_match      - the captured face is closer to another registered
+                           player than the tolerance
+    """
+
+    def __init__(self, tolerance=0.6, fast_alpha=0.3, slow_alpha=0.05, warmup=5,
+                 drop_threshold=0.12, cusum_drift=0.02, cusum_threshold=0.25,
+                 flip_alpha=0.2, flip_threshold=0.5, cross_check_below=0.6,
+                 cooldown=60.0, clock=time.monotonic, gallery_loader=None):
+        """
+        Args:
+            tolerance: Face distance for a cross-player match
+            fast_alpha: Weight of the newest confidence in the short EWMA
+            slow_alpha: Weight of the newest confidence in the baseline EWMA
+            warmup: Verifications before per-player alerts can fire
+            drop_threshold: Baseline minus short EWMA that raises confidence_drop
+            cusum_drift: Drop per verification tolerated as noise by the CUSUM
+            cusum_threshold: CUSUM value that raises change_point
+            flip_alpha: Weight of the newest status switch in the flip rate
+            flip_threshold: Flip rate that raises alternating
+            cross_check_below: Only search other players when confidence is below this
+            cooldown: Seconds before the same alert fires again for a player
+            clock: Time source (monotonic seconds)
+            gallery_loader: Callable returning (labels, matrix) of every
+                            player's templates, loaded on first use
+        """
+        self.tolerance = tolerance
+        self.fast_alpha = fast_alpha
+        self.slow_alpha = slow_alpha
+        self.warmup = warmup
+        self.drop_threshold = drop_threshold
+        self.cusum_drift = cusum_drift
+        self.cusum_threshold = cusum_threshold
+        self.flip_alpha = flip_alpha
+        self.flip_threshold = flip_threshold
+        self.cross_check_below = cross_check_below
+        self.cooldown = cooldown
+        self.clock = clock
+
+        self.index = CrossMatchIndex(gallery_loader)
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def state(self, player_id):
+        """Running statistics for a player (created on first use)"""
+        state = self._states.get(player_id)
+        if state is None:
+            with self._lock:
+                state = self._states.setdefault(player_id, PlayerStreamState())
+        return state
+
+    def _alert(self, state, player_id, kind, score, details, now):
+        """Build an alert unless the same kind fired within the cooldown"""
+        last = state.last_alert.get(kind)
+        if last is not None and now - last < self.cooldown:
+            return None
+
+        state.last_alert[kind] = now
+        return {
+            'player_id': player_id,
+            'kind': kind,
+            'score': round(float(min(max(score, 0.0), 1.0)), 3),
+            'details': details
+        }
+
+    def observe(self, player_id, status, confidence, encoding=None):
+        """
+        Consume one verification result
+
+        Args:
+            player_id: Player being verified
+            status: 'VERIFIED' or 'FAILED'
+            confidence: Face confidence (1 - distance)
+            encoding: Captured face encoding, for the cross-player check
+
+        Returns:
+            list: Alert dicts (player_id, kind, score 0-1, details)
+        """
+        state = self.state(player_id)
+        now = self.clock()
+        alerts = []
+        confidence = float(confidence)
+
+        if state.count == 0:
+            state.fast = state.slow = confidence
+        else:
+            # Baseline and CUSUM compare against the state before this sample
+            drop = state.slow - confidence
+            state.cusum = max(0.0, state.cusum + drop - self.cusum_drift)
+            state.fast += self.fast_alpha * (confidence - state.fast)
+            # Only genuine-looking captures move the baseline, so a stand-in
+            # cannot slowly drag it down to their own level
+            if status == 'VERIFIED':
+                state.slow += self.slow_alpha * (confidence - state.slow)
+
+        if state.last_status is not None:
+            flipped = 1.0 if status != state.last_status else 0.0
+            state.flip_rate += self.flip_alpha * (flipped - state.flip_rate)
+        state.last_status = status
+        state.count += 1
+
+        if state.count > self.warmup:
+            gap = state.slow - state.fast
+            if gap > self.drop_threshold:
+                alerts.append(self._alert(state, player_id, 'confidence_drop',
+                                          gap / (2 * self.drop_threshold),
+                                          {'baseline': round(state.slow, 3),
+                                           'recent': round(state.fast, 3)}, now))
+
+            if state.cusum > self.cusum_threshold:
+                alerts.append(self._alert(state, player_id, 'change_point',
+                                          state.cusum / (2 * self.cusum_threshold),
+                                          {'cusum': round(state.cusum, 3),
+                                           'baseline': round(state.slow, 3)}, now))
+                state.cusum = 0.0
+
+            if state.flip_rate > self.flip_threshold:
+                alerts.append(self._alert(state, player_id, 'alternating', state.flip_rate,
+                                          {'flip_rate': round(state.flip_rate, 3)}, now))
+
+        if encoding is not None and confidence < self.cross_check_below and len(self.index):
+            other_id, distance = self.index.nearest_other(player_id, encoding)
+            if other_id is not None and distance <= self.tolerance:
+                alerts.append(self._alert(state, player_id, 'cross_match',
+                                          1 - distance / self.tolerance,
+                                          {'matched_player_id': other_id,
+                                           'distance': round(distance, 3),
+                                           'own_confidence': round(confidence, 3)}, now))
+
+        return [alert for alert in alerts if alert is not None]
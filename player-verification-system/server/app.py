@@ -1,28 +1,287 @@
 """
 Main Flask Application - Player Verification System
 """
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import (Flask, Response, render_template, request, jsonify, session, redirect, url_for,
+                   stream_with_context)
 from flask_socketio import SocketIO, emit
 from functools import wraps
 import os
-from datetime import datetime, timedelta
+import base64
+import socket
+import tempfile
+from io import BytesIO
+from datetime import datetime, timedelta, timezone
+import numpy as np
 
 # Import local modules
-from models import Player, AdminUser, VerificationLog, init_db
+from config import HOT_RELOADABLE, ConfigError, get_settings, load_config, reload_settings
+from models import (Player, PlayerTemplate, AdminUser, VerificationLog, VerificationRollup,
+                    DataVersion, Tournament, Match, ROLLUP_GRANULARITIES, init_db)
 from verification import FaceVerification
+from distance_kernels import one_to_many, squared_tolerance
+from metrics import MetricsRegistry
+from retention import run_maintenance
+from anomaly import AnomalyDetector
+from sessions import SessionRegistry
+from rosters import MatchRosters
+from state_backend import create_backend
+from http_cache import FastJSONProvider, conditional, compress_response, json_rows_response
+from serialization import orjson
+from log_export import (EXPORT_FORMATS, STREAMING_FORMATS, MIMETYPES, stream_logs, stream_npz,
+                        write_columnar)
+from auth import LoginThrottle, PasswordHasher, PasswordHasherBusy, PasswordHashTimeout
+from encoding_service import (EncodingService, MicroBatchScheduler,
+                              EncodingServiceBusy, EncodingTimeout)
 from utils.device_fingerprint import get_machine_guid, verify_device
+from utils.lazy_import import lazy_module
+
+Image = lazy_module('PIL.Image')
+
+# Validated settings from config.py (PVS_ENV, PVS_CONFIG_FILE, PVS_* overrides);
+# read through this name so a reload is seen everywhere
+settings = get_settings()
 
 app = Flask(__name__)
-app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=8)
+app.config['SECRET_KEY'] = settings.SECRET_KEY
+app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(seconds=settings.PERMANENT_SESSION_LIFETIME)
+app.config['SESSION_COOKIE_HTTPONLY'] = settings.SESSION_COOKIE_HTTPONLY
+app.config['SESSION_COOKIE_SECURE'] = settings.SESSION_COOKIE_SECURE
+if orjson is not None:
+    app.json = FastJSONProvider(app)
+
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=settings.SOCKETIO_ASYNC_MODE)
 
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Socket.IO's HTTP long-polling needs every request of a session on the
+# same worker, so with several workers the dashboard uses WebSocket only
+SOCKETIO_TRANSPORTS = ['websocket'] if settings.SERVER_WORKERS > 1 else ['polling', 'websocket']
 
 # Initialize face verification
-face_verifier = FaceVerification(tolerance=0.6)
+face_verifier = FaceVerification(
+    tolerance=settings.FACE_RECOGNITION_TOLERANCE,
+    detector=settings.FACE_DETECTOR,
+    cascade_width=settings.CASCADE_DETECT_WIDTH
+)
+
+# Where verification encodings come from (settings.ENCODING_MODE):
+#   'client' - trust the encoding sent by the client
+#   'hybrid' - encode the image on the server when no encoding is sent
+#   'server' - always encode the image on the server (blocks replayed encodings)
+
+# Worker processes are only started on the first server-side encode
+encoding_service = EncodingService(
+    max_workers=settings.ENCODING_WORKERS,
+    max_pending=settings.ENCODING_MAX_PENDING,
+    timeout=settings.ENCODING_TIMEOUT,
+    recycle_after=settings.ENCODING_RECYCLE_AFTER,
+    detector=settings.FACE_DETECTOR,
+    sleep=socketio.sleep
+)
+
+# Group bursts of server-side encodes (e.g. at match start) into micro-batches
+encoding_scheduler = MicroBatchScheduler(
+    encoding_service,
+    max_batch=settings.ENCODING_BATCH_MAX,
+    max_wait_ms=settings.ENCODING_BATCH_WAIT_MS,
+    latency_slo_ms=settings.ENCODING_LATENCY_SLO_MS,
+    max_pending=settings.ENCODING_BATCH_MAX_PENDING,
+    timeout=settings.ENCODING_TIMEOUT,
+    sleep=socketio.sleep
+)
+
+# Admin password checks run off the request worker; attempts are throttled
+# per username and per client address before any hashing happens
+password_hasher = PasswordHasher(
+    max_workers=settings.LOGIN_HASH_WORKERS,
+    max_pending=settings.LOGIN_MAX_PENDING,
+    timeout=settings.LOGIN_HASH_TIMEOUT,
+    sleep=socketio.sleep
+)
+login_throttle = LoginThrottle(
+    burst=settings.LOGIN_ATTEMPTS_BURST,
+    per_minute=settings.LOGIN_ATTEMPTS_PER_MINUTE,
+    max_keys=settings.LOGIN_THROTTLE_MAX_KEYS
+)
+
+# Per-stage latency of /api/verify (METRICS_ENABLED turns timing off)
+verify_metrics = MetricsRegistry(
+    'pvs_verify_stage_seconds',
+    'Latency of each /api/verify stage in seconds',
+    enabled=settings.METRICS_ENABLED
+)
+
+# Shared state between server processes (settings.STATE_BACKEND):
+#   'memory' - single process (default)
+#   'sqlite' - several workers behind a load balancer share STATE_BACKEND_PATH
+# Broadcasts, session changes and cache invalidations all go through it, so
+# every worker applies them and notifies its own Socket.IO clients.
+state_backend = create_backend(
+    settings.STATE_BACKEND,
+    path=settings.STATE_BACKEND_PATH,
+    poll_interval=settings.STATE_POLL_INTERVAL,
+    sleep=socketio.sleep,
+    start_task=socketio.start_background_task
+)
+
+def broadcast(event, data):
+    """Emit a Socket.IO event to dashboards connected to any worker"""
+    state_backend.publish('socketio', {'event': event, 'data': data})
+
+def apply_broadcast(message):
+    """Emit a broadcast to this worker's Socket.IO clients"""
+    if message['event'] == 'verification_update':
+        # A log was written, possibly by another worker: re-read the data
+        # versions before answering the dashboard's refetch with a 304
+        DataVersion.invalidate()
+    socketio.emit(message['event'], message['data'], namespace='/')
+
+state_backend.subscribe('socketio', apply_broadcast)
+
+# Piloting alerts from the verification stream (O(1) state per player)
+anomaly_detector = AnomalyDetector(
+    tolerance=settings.FACE_RECOGNITION_TOLERANCE,
+    cooldown=settings.ANOMALY_COOLDOWN,
+    gallery_loader=PlayerTemplate.load_all
+)
+
+def publish_observation(player_id, player_name, status, confidence, encoding, log_id):
+    """
+    Feed a verification result to every worker's anomaly detector
+    
+    Each worker keeps the full statistics of every player, in event order,
+    whichever worker served the request. Only the worker that published
+    the result broadcasts its alerts.
+    """
+    state_backend.publish('anomaly', {
+        'origin': f"{socket.gethostname()}:{os.getpid()}",
+        'player_id': player_id,
+        'player_name': player_name,
+        'status': status,
+        'confidence': float(confidence),
+        # Only low-confidence captures are checked against other players
+        'encoding': (encoding.tolist() if confidence < anomaly_detector.cross_check_below
+                     else None),
+        'log_id': log_id
+    })
+
+def apply_observation(message):
+    """Update this worker's anomaly statistics with one verification result"""
+    encoding = message['encoding']
+    alerts = anomaly_detector.observe(
+        message['player_id'],
+        message['status'],
+        message['confidence'],
+        np.array(encoding) if encoding is not None else None
+    )
+    
+    if message['origin'] != f"{socket.gethostname()}:{os.getpid()}":
+        return
+    
+    for alert in alerts:
+        alert.update({
+            'player_name': message['player_name'],
+            'log_id': message['log_id'],
+            'timestamp': datetime.now().isoformat()
+        })
+        broadcast('anomaly_alert', alert)
+
+state_backend.subscribe('anomaly', apply_observation)
+
+# Active sessions: each verification or player_heartbeat extends a session;
+# sessions without one for SESSION_TTL seconds expire
+active_sessions = SessionRegistry(ttl=settings.SESSION_TTL)
+
+def broadcast_session_change(event, session):
+    """Push session changes and the new live counts to dashboards"""
+    socketio.emit(f'session_{event}', {
+        'player_id': session['player_id'],
+        'tournament_id': session['tournament_id'],
+        'timestamp': datetime.now().isoformat()
+    }, namespace='/')
+    socketio.emit('active_count', active_sessions.counts(), namespace='/')
+
+active_sessions.subscribe(broadcast_session_change)
+
+def publish_session(op, player_id, **fields):
+    """Apply a session start/heartbeat/end on every worker's registry"""
+    state_backend.publish('sessions', dict(fields, op=op, player_id=player_id))
+
+def apply_session_op(message):
+    op = message['op']
+    player_id = message['player_id']
+    
+    if op == 'start':
+        active_sessions.start(player_id, message.get('tournament_id'), sid=message.get('sid'))
+    elif op == 'heartbeat':
+        active_sessions.heartbeat(player_id, message.get('tournament_id'))
+    elif op == 'end':
+        active_sessions.end(player_id)
+
+state_backend.subscribe('sessions', apply_session_op)
+
+def apply_player_change(message):
+    """Drop cached templates (and index new players) after another worker's write"""
+    player_id = message['player_id']
+    PlayerTemplate.invalidate(player_id)
+    DataVersion.invalidate()
+    match_rosters.refresh(player_id)
+    
+    if message.get('encoding') is not None:
+        anomaly_detector.index.add(player_id, np.array(message['encoding']))
+
+state_backend.subscribe('players', apply_player_change)
+
+# Rosters of live matches, pinned in memory on every worker when a match
+# starts; verifying a rostered player then needs no database reads
+match_rosters = MatchRosters(roster_loader=Match.get, gallery_loader=PlayerTemplate.get_gallery)
+
+def apply_match_change(message):
+    """Pin or unpin a match's roster after it starts or ends on any worker"""
+    if message['op'] == 'start':
+        match_rosters.pin(message['match_id'])
+    elif message['op'] == 'end':
+        match_rosters.unpin(message['match_id'])
+
+state_backend.subscribe('matches', apply_match_change)
+
+def apply_settings(new_settings):
+    """Push hot-reloadable settings into the live objects built from them"""
+    global settings
+    settings = new_settings
+    
+    face_verifier.tolerance = settings.FACE_RECOGNITION_TOLERANCE
+    anomaly_detector.tolerance = settings.FACE_RECOGNITION_TOLERANCE
+    anomaly_detector.cooldown = settings.ANOMALY_COOLDOWN
+    active_sessions.ttl = settings.SESSION_TTL
+    verify_metrics.enabled = settings.METRICS_ENABLED
+    
+    encoding_service.timeout = settings.ENCODING_TIMEOUT
+    encoding_service.recycle_after = settings.ENCODING_RECYCLE_AFTER
+    encoding_scheduler.timeout = settings.ENCODING_TIMEOUT
+    encoding_scheduler.max_batch = settings.ENCODING_BATCH_MAX
+    encoding_scheduler.batch_limit = min(encoding_scheduler.batch_limit, settings.ENCODING_BATCH_MAX)
+    encoding_scheduler.max_wait = settings.ENCODING_BATCH_WAIT_MS / 1000.0
+    encoding_scheduler.latency_slo = settings.ENCODING_LATENCY_SLO_MS / 1000.0
+    password_hasher.timeout = settings.LOGIN_HASH_TIMEOUT
+    login_throttle.burst = settings.LOGIN_ATTEMPTS_BURST
+    login_throttle.per_minute = settings.LOGIN_ATTEMPTS_PER_MINUTE
+    
+    PlayerTemplate.trim_cache()
+
+def reload_config(message=None):
+    """Re-read the configuration in this worker and apply hot-reloadable changes"""
+    try:
+        new_settings, applied, restart_required = reload_settings()
+    except ConfigError as e:
+        print(f"Config reload rejected: {e}")
+        return
+    
+    apply_settings(new_settings)
+    if applied:
+        print(f"Config reloaded: {', '.join(applied)}")
+    if restart_required:
+        print(f"Config changes waiting for a restart: {', '.join(restart_required)}")
 
-# Active sessions tracking
-active_sessions = {}
+state_backend.subscribe('config', reload_config)
 
 def login_required(f):
     """Decorator for routes that require login"""
@@ -39,7 +298,7 @@ def admin_required(f):
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session:
             return redirect(url_for('admin_login'))
-        if session.get('role') not in ['super_admin', 'tournament_admin']:
+        if session.get('role') not in settings.ADMIN_ROLES:
             return jsonify({'error': 'Unauthorized'}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -57,9 +316,27 @@ def admin_login():
         username = data.get('username')
         password = data.get('password')
         
-        user = AdminUser.verify_password(username, password)
+        # One attempt from the username's bucket and one from the address's
+        retry_after = login_throttle.acquire(('user', str(username).lower()),
+                                             ('addr', request.remote_addr))
+        if retry_after:
+            response = jsonify({
+                'success': False,
+                'message': 'Too many login attempts, try again later'
+            })
+            response.headers['Retry-After'] = str(int(retry_after) + 1)
+            return response, 429
+        
+        try:
+            user = AdminUser.verify_password(username, password, check=password_hasher.check)
+        except (PasswordHasherBusy, PasswordHashTimeout):
+            return jsonify({
+                'success': False,
+                'message': 'Login is busy, try again shortly'
+            }), 503
         
         if user:
+            login_throttle.reset(('user', str(username).lower()))
             session.permanent = True
             session['user_id'] = user['id']
             session['username'] = user['username']
@@ -91,29 +368,141 @@ def admin_dashboard():
     """Admin dashboard"""
     return render_template('admin_dashboard.html', 
                          username=session.get('username'),
-                         role=session.get('role'))
+                         role=session.get('role'),
+                         socket_transports=SOCKETIO_TRANSPORTS)
+
+@app.after_request
+def compress_json(response):
+    """Gzip large JSON responses"""
+    return compress_response(response, settings.COMPRESS_MIN_SIZE, settings.COMPRESS_LEVEL)
 
 @app.route('/api/players', methods=['GET'])
 @admin_required
+@conditional('players')
 def get_players():
     """Get all players"""
-    players = Player.get_all()
-    return jsonify(players)
+    return json_rows_response(Player.get_all_json(settings.JSON_CHUNK_ROWS))
 
 @app.route('/api/player/<player_id>/logs', methods=['GET'])
 @admin_required
+@conditional('logs')
 def get_player_logs(player_id):
     """Get verification logs for a player"""
-    logs = VerificationLog.get_by_player(player_id)
-    return jsonify(logs)
+    return json_rows_response(
+        VerificationLog.get_by_player_json(player_id, chunk_size=settings.JSON_CHUNK_ROWS)
+    )
 
 @app.route('/api/logs/recent', methods=['GET'])
 @admin_required
+@conditional('logs', 'players')
 def get_recent_logs():
     """Get recent verification logs"""
     limit = request.args.get('limit', 100, type=int)
-    logs = VerificationLog.get_recent(limit)
-    return jsonify(logs)
+    return json_rows_response(
+        VerificationLog.get_recent_json(limit, chunk_size=settings.JSON_CHUNK_ROWS)
+    )
+
+def parse_utc(value, default):
+    """Parse an ISO timestamp query parameter into naive UTC (log timestamps are UTC)"""
+    if not value:
+        return default
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+@app.route('/api/logs/export', methods=['GET'])
+@admin_required
+def export_logs():
+    """
+    Export the verification log history
+    
+    Query parameters: format (csv, jsonl, npz, parquet), start, end,
+    player_id, status. CSV, JSON Lines and NPZ are streamed as they are read.
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    filters = {key: request.args.get(key) for key in ('player_id', 'status')}
+    try:
+        for key in ('start', 'end'):
+            bound = parse_utc(request.args.get(key), None)
+            filters[key] = bound.strftime('%Y-%m-%d %H:%M:%S') if bound else None
+    except ValueError:
+        return jsonify({'error': 'start and end must be ISO timestamps'}), 400
+    
+    filename = f"verification_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    headers = {'Content-Disposition': f'attachment; filename={filename}'}
+    
+    if export_format in STREAMING_FORMATS:
+        return Response(
+            stream_with_context(stream_logs(export_format, **filters)),
+            mimetype=MIMETYPES[export_format],
+            headers=headers
+        )
+    
+    if export_format == 'npz':
+        # One archive member per column per chunk, compressed as it streams
+        return Response(
+            stream_with_context(stream_npz(**filters)),
+            mimetype=MIMETYPES[export_format],
+            headers=headers
+        )
+    
+    # Parquet needs a seekable target (one row group per chunk); spill to disk once it grows
+    spool = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+    try:
+        write_columnar(export_format, spool, **filters)
+    except ImportError:
+        spool.close()
+        return jsonify({'error': f'{export_format} export requires pyarrow'}), 501
+    spool.seek(0)
+    
+    def generate():
+        with spool:
+            while True:
+                block = spool.read(64 * 1024)
+                if not block:
+                    break
+                yield block
+    
+    return Response(generate(), mimetype=MIMETYPES[export_format], headers=headers)
+
+@app.route('/api/stats/rollups', methods=['GET'])
+@admin_required
+def get_rollup_stats():
+    """
+    Verification pass/fail rates, confidence and device mismatches over time
+    
+    Query parameters: start, end (ISO, default: last 24 hours), granularity
+    (minute, hour or day; default: finest with at most max_points buckets)
+    """
+    now = datetime.utcnow()
+    try:
+        end = parse_utc(request.args.get('end'), now)
+        start = parse_utc(request.args.get('start'), end - timedelta(hours=24))
+    except ValueError:
+        return jsonify({'error': 'start and end must be ISO timestamps'}), 400
+    
+    granularity = request.args.get('granularity')
+    if granularity and granularity not in ROLLUP_GRANULARITIES:
+        return jsonify({'error': f"granularity must be one of {', '.join(ROLLUP_GRANULARITIES)}"}), 400
+    
+    # Minute buckets past the retention horizon are gone; read whole hours
+    start, end, rounded = VerificationRollup.align(start, end)
+    
+    max_points = request.args.get('max_points', 500, type=int)
+    granularity, buckets = VerificationRollup.get_series(start, end, granularity, max_points)
+    
+    return jsonify({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'rounded_to_hour': rounded,
+        'granularity': granularity,
+        'buckets': buckets,
+        'totals': VerificationRollup.get_totals(start, end)
+    })
 
 @app.route('/api/register', methods=['POST'])
 def register_player():
@@ -131,10 +520,13 @@ def register_player():
     
     try:
         # Convert facial encoding to numpy array
-        import numpy as np
         facial_encoding = np.array(facial_encoding)
         
         Player.create(player_id, name, student_id, facial_encoding, machine_guid)
+        state_backend.publish('players', {
+            'player_id': player_id,
+            'encoding': facial_encoding.tolist()
+        })
         
         return jsonify({
             'success': True,
@@ -145,59 +537,139 @@ def register_player():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def template_candidate(encoding, gallery, confidence):
+    """Whether a VERIFIED capture is confident and novel enough to learn"""
+    return (confidence >= settings.TEMPLATE_UPDATE_CONFIDENCE
+            and one_to_many(encoding, gallery, squared=True).min()
+                >= squared_tolerance(settings.TEMPLATE_MIN_NOVELTY))
+
+def learn_template(player_id, encoding, gallery, confidence):
+    """Add a server-computed encoding to the player's gallery if it qualifies"""
+    if template_candidate(encoding, gallery, confidence):
+        PlayerTemplate.add_verified(player_id, encoding, float(confidence))
+        state_backend.publish('players', {'player_id': player_id})
+
+def learn_template_from_image(player_id, image_bytes, gallery):
+    """Encode a client-verified capture here and learn from that vector (background task)"""
+    try:
+        encoding = encoding_service.encode(image_bytes)
+    except Exception as e:
+        print(f"Template update skipped for {player_id}: {e}")
+        return
+    
+    if encoding is not None:
+        encoding = np.array(encoding)
+        _, confidence = face_verifier.verify_face(encoding, gallery)
+        learn_template(player_id, encoding, gallery, confidence)
+
 @app.route('/api/verify', methods=['POST'])
 def verify_player():
     """Verify a player"""
+    timer = verify_metrics.timer()
+    status = 500
+    try:
+        response = app.make_response(_verify_player(timer))
+        status = response.status_code
+        return response
+    finally:
+        # Every outcome is timed, labelled by its HTTP status
+        timer.finish(str(status))
+
+def _verify_player(timer):
+    """Handle /api/verify, lapping each stage on timer"""
     data = request.get_json()
+    timer.lap('parse_json')
     
     player_id = data.get('player_id')
     captured_encoding = data.get('facial_encoding')  # As list
     current_machine_guid = data.get('machine_guid')
     image_data = data.get('image_data')  # Base64 encoded image
     
-    if not all([player_id, captured_encoding, current_machine_guid]):
+    encode_on_server = (settings.ENCODING_MODE == 'server' or
+                        (settings.ENCODING_MODE == 'hybrid' and not captured_encoding))
+    
+    if not all([player_id, current_machine_guid]):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    if not (image_data if encode_on_server else captured_encoding):
         return jsonify({'error': 'Missing required fields'}), 400
     
     try:
-        import numpy as np
-        import base64
-        from io import BytesIO
-        from PIL import Image
-        
-        # Get registered player
-        player = Player.get_by_id(player_id)
+        # Players in a live match come from their pinned seat, not the database
+        seat = match_rosters.get(player_id)
+        player = seat or Player.get_by_id(player_id)
+        timer.lap('db_player')
         
         if not player:
             return jsonify({'error': 'Player not found'}), 404
         
+        tournament_id = data.get('tournament_id') or (seat and seat['tournament_id'])
+        publish_session('heartbeat', player_id, tournament_id=tournament_id)
+        
+        image_bytes = None
+        if image_data:
+            # Decode base64 image
+            image_bytes = base64.b64decode(image_data.split(',')[1])
+            timer.lap('decode_base64')
+        
+        if encode_on_server:
+            # Detection and encoding run in the worker pool
+            encoder = encoding_scheduler if settings.ENCODING_BATCHING else encoding_service
+            captured_encoding = encoder.encode(image_bytes)
+            timer.lap('encode')
+            
+            if captured_encoding is None:
+                return jsonify({'error': 'No face detected in image'}), 422
+        
         # Convert captured encoding to numpy array
         captured_encoding = np.array(captured_encoding)
         
-        # Verify face
+        # Verify face against every stored template
+        gallery = seat['gallery'] if seat else PlayerTemplate.get_gallery(player_id)
+        timer.lap('db_gallery')
+        
         is_face_match, confidence = face_verifier.verify_face(
             captured_encoding,
-            player['facial_encoding']
+            gallery
         )
         
         # Verify device
         is_device_match = verify_device(current_machine_guid, player['machine_guid'])
         
+        # A machine registered to another seat of the same match: players swapped
+        seat_conflict = match_rosters.seat_conflict(seat, current_machine_guid) if seat else None
+        
         # Determine overall verification status
         verification_status = 'VERIFIED' if (is_face_match and is_device_match) else 'FAILED'
+        timer.lap('distance')
         
-        # Save verification image if provided
+        # Save verification image if provided and IMAGE_POLICY keeps it
         image_path = 'no_image.jpg'
-        if image_data:
-            # Decode base64 image
-            image_bytes = base64.b64decode(image_data.split(',')[1])
+        if image_bytes and (settings.IMAGE_POLICY == 'all' or
+                            (settings.IMAGE_POLICY == 'failed' and verification_status == 'FAILED')):
             image = Image.open(BytesIO(image_bytes))
             image_array = np.array(image)
+            timer.lap('decode_image')
             
             # Save image
             image_path = face_verifier.save_verification_image(
                 image_array,
-                player_id
+                player_id,
+                logs_dir=settings.LOGS_DIR
             )
+            timer.lap('save_image')
+        
+        # Keep the gallery current with high-confidence captures. A
+        # submitted encoding is never stored as is: its image is encoded
+        # here, off the request path, and that vector is learned instead
+        if verification_status == 'VERIFIED':
+            if encode_on_server:
+                learn_template(player_id, captured_encoding, gallery, confidence)
+            elif (image_bytes and settings.ENCODING_MODE == 'hybrid'
+                    and template_candidate(captured_encoding, gallery, confidence)):
+                socketio.start_background_task(learn_template_from_image,
+                                               player_id, image_bytes, gallery)
+        timer.lap('template_update')
         
         # Log verification
         log_id = VerificationLog.create(
@@ -207,37 +679,204 @@ def verify_player():
             image_path,
             is_device_match
         )
+        timer.lap('log_insert')
         
         # Emit to admin dashboard via WebSocket
-        socketio.emit('verification_update', {
+        broadcast('verification_update', {
             'player_id': player_id,
             'player_name': player['name'],
             'status': verification_status,
             'confidence': float(confidence),
-            'device_matched': is_device_match,
+            'device_matched': bool(is_device_match),
             'timestamp': datetime.now().isoformat(),
-            'log_id': log_id
-        }, namespace='/')
+            'log_id': log_id,
+            'seat': seat and seat['seat']
+        })
+        timer.lap('socket_emit')
         
-        return jsonify({
+        # A seat swap is certain, not statistical: always alert
+        if seat_conflict:
+            broadcast('anomaly_alert', {
+                'player_id': player_id,
+                'player_name': player['name'],
+                'kind': 'seat_swap',
+                'score': 1.0,
+                'details': {
+                    'match_id': seat['match_id'],
+                    'seat': seat['seat'],
+                    'machine_seat': seat_conflict['seat'],
+                    'machine_player_id': seat_conflict['player_id']
+                },
+                'log_id': log_id,
+                'timestamp': datetime.now().isoformat()
+            })
+        
+        if settings.ANOMALY_DETECTION:
+            publish_observation(player_id, player['name'], verification_status,
+                                confidence, captured_encoding, log_id)
+            timer.lap('anomaly')
+        
+        response = jsonify({
             'success': True,
             'verification_status': verification_status,
             'face_match': is_face_match,
             'device_match': is_device_match,
             'confidence': float(confidence),
             'player_name': player['name'],
-            'log_id': log_id
+            'log_id': log_id,
+            'verification_interval': settings.VERIFICATION_INTERVAL,
+            'match_id': seat and seat['match_id'],
+            'seat': seat and seat['seat'],
+            'seat_conflict': seat_conflict and seat_conflict['seat']
         })
+        timer.lap('serialize_response')
+        
+        return response
+    
+    except EncodingServiceBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+    
+    except EncodingTimeout as e:
+        return jsonify({'error': str(e)}), 504
     
     except Exception as e:
         print(f"Verification error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/metrics', methods=['GET'])
+@admin_required
+def get_metrics():
+    """Per-stage /api/verify latency in Prometheus text format"""
+    return Response(
+        verify_metrics.prometheus_text(),
+        mimetype='text/plain; version=0.0.4'
+    )
+
+@app.route('/api/config', methods=['GET'])
+@admin_required
+def get_config_settings():
+    """Settings in effect in this worker (without the secret key)"""
+    return jsonify({
+        'env': settings.env,
+        'settings': settings.as_dict(),
+        'hot_reloadable': sorted(HOT_RELOADABLE)
+    })
+
+@app.route('/api/config/reload', methods=['POST'])
+@admin_required
+def reload_config_settings():
+    """Re-read the configuration in every worker"""
+    if session.get('role') != 'super_admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    # Validate here first so a bad file is reported instead of ignored
+    try:
+        fresh = load_config(settings.env)
+    except ConfigError as e:
+        return jsonify({'error': str(e)}), 400
+
+    changes = settings.changes(fresh)
+    state_backend.publish('config', {'action': 'reload'})
+
+    return jsonify({
+        'success': True,
+        'applied': sorted(name for name in changes if name in HOT_RELOADABLE),
+        'restart_required': sorted(name for name in changes if name not in HOT_RELOADABLE)
+    })
+
 @app.route('/api/active_sessions', methods=['GET'])
 @admin_required
 def get_active_sessions():
-    """Get currently active verification sessions"""
-    return jsonify(list(active_sessions.values()))
+    """Get currently active verification sessions (optionally ?tournament_id=)"""
+    return jsonify(active_sessions.list(request.args.get('tournament_id')))
+
+@app.route('/api/active_sessions/count', methods=['GET'])
+@admin_required
+def get_active_session_count():
+    """Get active session counts, overall and per tournament"""
+    return jsonify(active_sessions.counts())
+
+@app.route('/api/tournaments', methods=['GET', 'POST'])
+@admin_required
+def tournaments():
+    """List tournaments, or create one ({name})"""
+    if request.method == 'GET':
+        return jsonify(Tournament.get_all())
+    
+    data = request.get_json() or {}
+    if not data.get('name'):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    return jsonify({'success': True, 'tournament_id': Tournament.create(data['name'])}), 201
+
+@app.route('/api/tournaments/<int:tournament_id>/matches', methods=['GET', 'POST'])
+@admin_required
+def tournament_matches(tournament_id):
+    """List a tournament's matches, or create one ({name, roster: {seat: player_id}})"""
+    if request.method == 'GET':
+        return jsonify(Match.get_by_tournament(tournament_id))
+    
+    data = request.get_json() or {}
+    roster = data.get('roster')
+    if not data.get('name') or not isinstance(roster, dict) or not roster:
+        return jsonify({'error': 'Missing required fields'}), 400
+    roster = {str(seat): str(player_id) for seat, player_id in roster.items()}
+    
+    if Tournament.get(tournament_id) is None:
+        return jsonify({'error': 'Tournament not found'}), 404
+    
+    unknown = sorted(set(roster.values()) - Player.get_existing_ids(roster.values()))
+    if unknown:
+        return jsonify({'error': f"Unknown players: {', '.join(unknown)}"}), 400
+    
+    match_id = Match.create(tournament_id, data['name'], roster)
+    if match_id is None:
+        return jsonify({'error': 'A player can hold only one seat per match'}), 400
+    
+    return jsonify({'success': True, 'match_id': match_id}), 201
+
+@app.route('/api/matches/<int:match_id>', methods=['GET'])
+@admin_required
+def get_match(match_id):
+    """Get a match with its roster"""
+    match = Match.get(match_id)
+    if match is None:
+        return jsonify({'error': 'Match not found'}), 404
+    return jsonify(match)
+
+@app.route('/api/matches/<int:match_id>/start', methods=['POST'])
+@admin_required
+def start_match(match_id):
+    """Mark a match live and pin its roster on every worker"""
+    updated = Match.set_status(match_id, 'live')
+    if updated is None:
+        return jsonify({'error': 'Match not found'}), 404
+    if not updated:
+        return jsonify({'error': 'Only a scheduled match can start'}), 409
+    
+    state_backend.publish('matches', {'op': 'start', 'match_id': match_id})
+    broadcast('match_update', {'match_id': match_id, 'status': 'live'})
+    return jsonify({'success': True, 'match_id': match_id, 'status': 'live'})
+
+@app.route('/api/matches/<int:match_id>/end', methods=['POST'])
+@admin_required
+def end_match(match_id):
+    """Mark a match finished and unpin its roster on every worker"""
+    updated = Match.set_status(match_id, 'finished')
+    if updated is None:
+        return jsonify({'error': 'Match not found'}), 404
+    if not updated:
+        return jsonify({'error': 'Only a live match can end'}), 409
+    
+    state_backend.publish('matches', {'op': 'end', 'match_id': match_id})
+    broadcast('match_update', {'match_id': match_id, 'status': 'finished'})
+    return jsonify({'success': True, 'match_id': match_id, 'status': 'finished'})
+
+@app.route('/api/matches/live', methods=['GET'])
+@admin_required
+def get_live_matches():
+    """Matches pinned in this worker, with seat -> player_id"""
+    return jsonify(match_rosters.summary())
 
 @socketio.on('connect')
 def handle_connect():
@@ -249,37 +888,90 @@ def handle_connect():
 def handle_disconnect():
     """Handle WebSocket disconnection"""
     print('Client disconnected')
+    for player_id in active_sessions.players_for_sid(request.sid):
+        publish_session('end', player_id)
+
+def known_player(player_id):
+    """Whether a socket event names a registered player (active sessions skip the query)"""
+    if not player_id:
+        return False
+    return bool(active_sessions.get(player_id) or match_rosters.get(player_id)
+                or Player.get_by_id(player_id))
 
 @socketio.on('player_session_start')
 def handle_session_start(data):
     """Handle player verification session start"""
     player_id = data.get('player_id')
+    if not known_player(player_id):
+        emit('session_error', {'error': 'Unknown player', 'player_id': player_id})
+        return
     
-    active_sessions[player_id] = {
-        'player_id': player_id,
-        'start_time': datetime.now().isoformat(),
-        'status': 'ACTIVE'
-    }
+    # Admins are notified by broadcast_session_change
+    publish_session('start', player_id, tournament_id=data.get('tournament_id'), sid=request.sid)
+
+@socketio.on('player_heartbeat')
+def handle_heartbeat(data):
+    """Keep a player's session alive between verifications"""
+    player_id = data.get('player_id')
+    if not known_player(player_id):
+        emit('session_error', {'error': 'Unknown player', 'player_id': player_id})
+        return
     
-    # Notify all admins
-    emit('session_started', {
-        'player_id': player_id,
-        'timestamp': datetime.now().isoformat()
-    }, broadcast=True)
+    publish_session('heartbeat', player_id, tournament_id=data.get('tournament_id'))
 
 @socketio.on('player_session_end')
 def handle_session_end(data):
     """Handle player verification session end"""
-    player_id = data.get('player_id')
+    publish_session('end', data.get('player_id'))
+
+def session_sweep_loop():
+    """Expire sessions whose clients stopped sending heartbeats"""
+    while True:
+        socketio.sleep(settings.SESSION_SWEEP_INTERVAL)
+        active_sessions.sweep()
+
+def retention_loop():
+    """Run retention maintenance whenever no player session is active"""
+    while True:
+        socketio.sleep(settings.RETENTION_INTERVAL)
+        
+        if active_sessions:
+            continue
+        
+        try:
+            result = run_maintenance(
+                settings.RETENTION_ARCHIVE_DIR,
+                settings.RETENTION_POLICIES,
+                should_stop=lambda: bool(active_sessions),
+                sleep=socketio.sleep
+            )
+            print(f"Retention pass: {result}")
+        except Exception as e:
+            print(f"Retention error: {e}")
+
+def start_background_tasks(retention=None):
+    """
+    Start this process's background work
     
-    if player_id in active_sessions:
-        del active_sessions[player_id]
+    Call once in every serving process (each worker after a fork), since
+    tasks and threads do not survive fork().
     
-    # Notify all admins
-    emit('session_ended', {
-        'player_id': player_id,
-        'timestamp': datetime.now().isoformat()
-    }, broadcast=True)
+    Args:
+        retention: Also run retention maintenance (only one worker should;
+                   default: RETENTION_ENABLED)
+    """
+    if retention is None:
+        retention = settings.RETENTION_ENABLED
+    
+    state_backend.start()
+    
+    # Matches that were already live (e.g. before a restart)
+    for match_id in Match.get_live_ids():
+        match_rosters.pin(match_id)
+    
+    socketio.start_background_task(session_sweep_loop)
+    if retention:
+        socketio.start_background_task(retention_loop)
 
 if __name__ == '__main__':
     # Initialize database
@@ -291,8 +983,10 @@ if __name__ == '__main__':
     print("=" * 60)
     print("Player Verification System - Server Starting")
     print("=" * 60)
-    print("Server URL: http://localhost:5000")
-    print("Admin Dashboard: http://localhost:5000/admin/login")
+    print(f"Server URL: http://localhost:{settings.PORT}")
+    print(f"Admin Dashboard: http://localhost:{settings.PORT}/admin/login")
     print("=" * 60)
     
-    socketio.run(app, host='0.0.0.0', port=5000, debug=True)
+    start_background_tasks()
+    
+    socketio.run(app, host=settings.HOST, port=settings.PORT, debug=settings.DEBUG)
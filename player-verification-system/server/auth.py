@@ -0,0 +1,175 @@
+"""
+Admin Authentication - off-loop password hashing and login throttling
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash
+
+from utils.process_pool import TerminablePool
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password checks are queued"""
+
+class PasswordHashTimeout(Exception):
+    """Raised when a password check exceeds its deadline"""
+
+class PasswordHasher:
+    """
+    Bounded process pool for werkzeug password checks
+
+    PBKDF2/scrypt are deliberately slow; run inline they hold a request
+    worker (and, under eventlet, every green thread in the process) for the
+    whole hash. Here the web tier only polls a future cooperatively, and
+    max_workers caps how much CPU logins can take from verification.
+    """
+
+    def __init__(self, max_workers=1, max_pending=8, timeout=5.0, sleep=None):
+        """
+        Initialize password hasher (workers start on the first login)
+
+        Args:
+            max_workers: Worker processes hashing in parallel
+            max_pending: Maximum queued + running checks
+            timeout: Per-check deadline in seconds
+            sleep: Cooperative sleep used while waiting (e.g. socketio.sleep)
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.sleep = sleep or time.sleep
+
+        self._pool = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _get_pool(self):
+        """Return the current pool, starting it if needed"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = TerminablePool(max_workers=self.max_workers)
+            return self._pool
+
+    def _reset_pool(self, pool=None):
+        """Discard a broken or stuck pool (pool: the one to discard, default current)"""
+        with self._lock:
+            pool = pool or self._pool
+            if pool is None:
+                return
+            if self._pool is pool:
+                self._pool = None
+
+        # shutdown() alone leaves a stuck worker running forever
+        pool.terminate()
+
+    def _submit(self, password_hash, password):
+        """Submit a check, replacing the pool once if it has broken"""
+        pool = self._get_pool()
+        try:
+            return pool, pool.submit(check_password_hash, password_hash, password)
+        except (BrokenProcessPool, RuntimeError):
+            self._reset_pool(pool)
+            pool = self._get_pool()
+            return pool, pool.submit(check_password_hash, password_hash, password)
+
+    def check(self, password_hash, password):
+        """
+        Drop-in replacement for werkzeug's check_password_hash
+
+        Raises:
+            PasswordHasherBusy: Too many checks in flight, or the pool was
+                                reset twice under this check
+            PasswordHashTimeout: Worker did not answer in time
+        """
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Too many logins in progress")
+
+        try:
+            deadline = time.monotonic() + self.timeout
+
+            # A reset for another login's stuck check fails this one too;
+            # it is not at fault, so it gets one more try on fresh workers
+            for _ in range(2):
+                pool, future = self._submit(password_hash, password)
+
+                # Poll cooperatively so green threads keep running
+                while not future.done():
+                    if time.monotonic() >= deadline:
+                        if not future.cancel():
+                            self._reset_pool(pool)
+                        raise PasswordHashTimeout("Password check timed out")
+                    self.sleep(0.005)
+
+                try:
+                    return future.result()
+                except (BrokenProcessPool, CancelledError):
+                    self._reset_pool(pool)
+
+            raise PasswordHasherBusy("Login workers restarted, retry shortly")
+
+        finally:
+            self._slots.release()
+
+    def shutdown(self, wait=True):
+        """Stop all workers"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+
+class LoginThrottle:
+    """
+    In-memory token buckets limiting login attempts per key
+
+    Each key (a username, a client address) holds up to `burst` attempts
+    and regains `per_minute` of them every minute. Past max_keys the least
+    recently used bucket is forgotten; it has usually refilled by then.
+    """
+
+    def __init__(self, burst=5, per_minute=5, max_keys=10000):
+        self.burst = burst
+        self.per_minute = per_minute
+        self.max_keys = max_keys
+
+        self._buckets = OrderedDict()  # key -> (tokens, updated), least recently used first
+        self._lock = threading.Lock()
+
+    def _tokens(self, key, now):
+        """Tokens currently available for a key"""
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated) * self.per_minute / 60.0)
+
+    def acquire(self, *keys):
+        """
+        Spend one attempt from every key's bucket
+
+        Nothing is spent unless every bucket has an attempt left, so a
+        throttled address cannot drain a username's bucket (or vice versa).
+
+        Returns:
+            float: 0 if allowed, otherwise seconds until the next attempt
+        """
+        now = time.monotonic()
+        with self._lock:
+            available = {key: self._tokens(key, now) for key in keys}
+            short = [1 - tokens for tokens in available.values() if tokens < 1]
+            if short:
+                return max(short) * 60.0 / self.per_minute
+
+            for key, tokens in available.items():
+                self._buckets[key] = (tokens - 1, now)
+                self._buckets.move_to_end(key)
+            self._prune()
+            return 0.0
+
+    def reset(self, key):
+        """Forget a key (e.g. the username after a successful login)"""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def _prune(self):
+        """Keep at most max_keys buckets, forgetting the least recently used"""
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
@@ -1,7 +1,14 @@
 """
 Configuration File for Player Verification System
+
+Settings are read once at startup by get_settings(): the class selected by
+PVS_ENV, then a JSON overrides file (PVS_CONFIG_FILE), then environment
+variables named PVS_<SETTING>. reload_settings() re-reads them; values in
+HOT_RELOADABLE take effect in running workers, the rest need a restart.
 """
+import json
 import os
+import threading
 
 class Config:
     """Base configuration"""
@@ -10,7 +17,8 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     
     # Database settings
-    DATABASE_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'verification_system.db')
+    DATABASE_PATH = os.environ.get('DATABASE_PATH') or os.path.join(
+        os.path.dirname(__file__), '..', 'database', 'verification_system.db')
     
     # Session settings
     SESSION_COOKIE_HTTPONLY = True
@@ -20,17 +28,73 @@ class Config:
     # Face recognition settings
     FACE_RECOGNITION_TOLERANCE = 0.6  # Lower is more strict (0.0-1.0)
     FACE_CAPTURE_COUNT = 5  # Number of images to capture during registration
+    MAX_TEMPLATES_PER_PLAYER = 10  # Stored encodings per player (enrollment + verified)
+    TEMPLATE_UPDATE_CONFIDENCE = 0.55  # Minimum confidence to learn a new template (from a server-side encoding)
+    TEMPLATE_MIN_NOVELTY = 0.08  # Skip captures nearly identical to a stored template
+    GALLERY_CACHE_SIZE = 0  # Player galleries kept in memory (0 = all)
+    FACE_DETECTOR = 'cascade+hog'  # hog, cnn, cascade, cascade+hog or cascade+cnn
+    CASCADE_DETECT_WIDTH = 320  # Frame width used by the Haar cascade prefilter
     
     # Verification settings
     VERIFICATION_INTERVAL = 30  # Seconds between verification checks
+    SESSION_TTL = 150  # Seconds without a verification/heartbeat before a session expires
+    SESSION_SWEEP_INTERVAL = 5  # Seconds between expiry sweeps
+    
+    # Server-side encoding settings
+    ENCODING_MODE = 'hybrid'  # client, hybrid or server (see app.py)
+    ENCODING_WORKERS = None  # Worker processes (None = CPU count)
+    ENCODING_MAX_PENDING = 32  # Requests queued before answering 503
+    ENCODING_TIMEOUT = 10.0  # Seconds before answering 504
+    ENCODING_RECYCLE_AFTER = 500  # Replace worker processes after this many tasks
+    ENCODING_BATCHING = True  # Group concurrent encodes into micro-batches
+    ENCODING_BATCH_MAX = 16  # Upper bound on images per batch
+    ENCODING_BATCH_WAIT_MS = 20  # Longest wait for a batch to fill
+    ENCODING_LATENCY_SLO_MS = 1000  # Batch size shrinks when exceeded
+    ENCODING_BATCH_MAX_PENDING = 64  # Batched requests queued before answering 503
+    
+    # Admin login settings
+    LOGIN_HASH_WORKERS = 1  # Processes checking admin password hashes
+    LOGIN_MAX_PENDING = 8  # Password checks queued before answering 503
+    LOGIN_HASH_TIMEOUT = 5.0  # Seconds before a password check answers 503
+    LOGIN_ATTEMPTS_BURST = 5  # Login attempts allowed at once per username and per address
+    LOGIN_ATTEMPTS_PER_MINUTE = 5  # Attempts regained per minute
+    LOGIN_THROTTLE_MAX_KEYS = 10000  # Usernames + addresses tracked before the oldest are dropped
+    
+    # Anomaly detection settings
+    ANOMALY_DETECTION = True  # Raise anomaly_alert events over Socket.IO
+    ANOMALY_COOLDOWN = 60  # Seconds before the same alert repeats for a player
+    
+    # Shared state settings (several server processes)
+    STATE_BACKEND = os.environ.get('STATE_BACKEND', 'memory')  # memory or sqlite
+    STATE_BACKEND_PATH = os.environ.get('STATE_BACKEND_PATH') or os.path.join(
+        os.path.dirname(__file__), '..', 'database', 'state.db')
+    STATE_POLL_INTERVAL = 0.02  # Seconds between sqlite backend polls when idle
+    
+    # HTTP caching settings
+    DATA_VERSION_CHECK_INTERVAL = 1.0  # Seconds before ETag versions are re-read from SQLite
+    COMPRESS_MIN_SIZE = 1024  # Gzip JSON responses at least this large (bytes)
+    COMPRESS_LEVEL = 6  # gzip level, 1 (fast) to 9 (small)
+    JSON_CHUNK_ROWS = 1000  # Rows per fetch for list endpoints; larger results are streamed
+    
+    # Metrics settings
+    METRICS_ENABLED = True  # Per-stage /api/verify timing (GET /api/metrics)
     
     # File storage settings
     LOGS_DIR = os.path.join(os.path.dirname(__file__), '..', 'logs', 'images')
+    IMAGE_POLICY = 'all'  # Verification images to keep: all, failed or none
+    
+    # Log retention settings
+    RETENTION_ENABLED = True  # Archive expired logs while no session is active
+    RETENTION_POLICIES = {'FAILED': 365, 'VERIFIED': 7}  # Days kept per status
+    RETENTION_ARCHIVE_DIR = os.path.join(os.path.dirname(__file__), '..', 'database', 'archive')
+    RETENTION_INTERVAL = 3600  # Seconds between maintenance passes
     
     # Server settings
     HOST = '0.0.0.0'
     PORT = 5000
     DEBUG = True  # Set to False in production
+    SERVER_WORKERS = 1  # Processes forked by serve.py
+    GRACEFUL_TIMEOUT = 30  # Seconds a stopping worker may spend finishing requests
     
     # WebSocket settings
     SOCKETIO_ASYNC_MODE = 'eventlet'
@@ -46,6 +110,7 @@ class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     SESSION_COOKIE_SECURE = True  # Require HTTPS
+    SERVER_WORKERS = os.cpu_count() or 1
     
     # Override with environment variables
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'you-must-set-secret-key-in-production'
@@ -67,3 +132,242 @@ config = {
 def get_config(env='default'):
     """Get configuration by environment name"""
     return config.get(env, config['default'])
+
+class ConfigError(ValueError):
+    """Raised when settings fail validation"""
+
+# Settings a running worker picks up on reload_settings(); everything else
+# (paths, pool and queue sizes, ports, the secret key) needs a restart
+HOT_RELOADABLE = frozenset([
+    'FACE_RECOGNITION_TOLERANCE', 'MAX_TEMPLATES_PER_PLAYER', 'TEMPLATE_UPDATE_CONFIDENCE',
+    'TEMPLATE_MIN_NOVELTY', 'GALLERY_CACHE_SIZE', 'VERIFICATION_INTERVAL', 'SESSION_TTL',
+    'SESSION_SWEEP_INTERVAL', 'ENCODING_MODE', 'ENCODING_TIMEOUT', 'ENCODING_RECYCLE_AFTER',
+    'ENCODING_BATCHING', 'ENCODING_BATCH_MAX', 'ENCODING_BATCH_WAIT_MS',
+    'ENCODING_LATENCY_SLO_MS', 'ANOMALY_DETECTION', 'ANOMALY_COOLDOWN', 'METRICS_ENABLED',
+    'LOGS_DIR', 'IMAGE_POLICY', 'RETENTION_POLICIES', 'RETENTION_INTERVAL',
+    'DATA_VERSION_CHECK_INTERVAL', 'COMPRESS_MIN_SIZE', 'COMPRESS_LEVEL',
+    'JSON_CHUNK_ROWS', 'LOGIN_HASH_TIMEOUT', 'LOGIN_ATTEMPTS_BURST', 'LOGIN_ATTEMPTS_PER_MINUTE'
+])
+
+# Environment variables read without the PVS_ prefix, for compatibility
+UNPREFIXED_ENV = ('SECRET_KEY', 'DATABASE_PATH', 'STATE_BACKEND', 'STATE_BACKEND_PATH',
+                  'SOCKETIO_ASYNC_MODE')
+
+def _positive(value):
+    return value > 0
+
+def _non_negative(value):
+    return value >= 0
+
+def _fraction(value):
+    return 0 < value <= 1
+
+def _one_of(*choices):
+    return lambda value: value in choices
+
+# name -> (check, description shown when it fails)
+VALIDATORS = {
+    'FACE_RECOGNITION_TOLERANCE': (_fraction, 'between 0 and 1'),
+    'MAX_TEMPLATES_PER_PLAYER': (_positive, 'at least 1'),
+    'TEMPLATE_UPDATE_CONFIDENCE': (_fraction, 'between 0 and 1'),
+    'TEMPLATE_MIN_NOVELTY': (_non_negative, '0 or more'),
+    'GALLERY_CACHE_SIZE': (_non_negative, '0 (unbounded) or more'),
+    'FACE_DETECTOR': (_one_of('hog', 'cnn', 'cascade', 'cascade+hog', 'cascade+cnn'),
+                      'hog, cnn, cascade, cascade+hog or cascade+cnn'),
+    'CASCADE_DETECT_WIDTH': (_positive, 'positive'),
+    'VERIFICATION_INTERVAL': (_positive, 'positive'),
+    'SESSION_TTL': (_positive, 'positive'),
+    'SESSION_SWEEP_INTERVAL': (_positive, 'positive'),
+    'ENCODING_MODE': (_one_of('client', 'hybrid', 'server'), 'client, hybrid or server'),
+    'ENCODING_WORKERS': (lambda value: value is None or value >= 1, 'null or at least 1'),
+    'ENCODING_MAX_PENDING': (_positive, 'at least 1'),
+    'ENCODING_TIMEOUT': (_positive, 'positive'),
+    'ENCODING_RECYCLE_AFTER': (_positive, 'at least 1'),
+    'ENCODING_BATCH_MAX': (_positive, 'at least 1'),
+    'ENCODING_BATCH_WAIT_MS': (_non_negative, '0 or more'),
+    'ENCODING_LATENCY_SLO_MS': (_positive, 'positive'),
+    'ENCODING_BATCH_MAX_PENDING': (_positive, 'at least 1'),
+    'ANOMALY_COOLDOWN': (_non_negative, '0 or more'),
+    'STATE_BACKEND': (_one_of('memory', 'sqlite'), 'memory or sqlite'),
+    'STATE_POLL_INTERVAL': (_positive, 'positive'),
+    'IMAGE_POLICY': (_one_of('all', 'failed', 'none'), 'all, failed or none'),
+    'RETENTION_POLICIES': (lambda value: isinstance(value, dict)
+                           and set(value) == {'FAILED', 'VERIFIED'}
+                           and all(isinstance(days, int) and days >= 1 for days in value.values()),
+                           'days (at least 1) for FAILED and VERIFIED'),
+    'RETENTION_INTERVAL': (_positive, 'positive'),
+    'DATA_VERSION_CHECK_INTERVAL': (_non_negative, '0 or more'),
+    'COMPRESS_MIN_SIZE': (_non_negative, '0 or more'),
+    'COMPRESS_LEVEL': (lambda value: 1 <= value <= 9, 'between 1 and 9'),
+    'JSON_CHUNK_ROWS': (_positive, 'at least 1'),
+    'LOGIN_HASH_WORKERS': (_positive, 'at least 1'),
+    'LOGIN_MAX_PENDING': (_positive, 'at least 1'),
+    'LOGIN_HASH_TIMEOUT': (_positive, 'positive'),
+    'LOGIN_ATTEMPTS_BURST': (_positive, 'at least 1'),
+    'LOGIN_ATTEMPTS_PER_MINUTE': (_positive, 'positive'),
+    'LOGIN_THROTTLE_MAX_KEYS': (_positive, 'at least 1'),
+    'PORT': (lambda value: 0 < value < 65536, 'between 1 and 65535'),
+    'SERVER_WORKERS': (_positive, 'at least 1'),
+    'GRACEFUL_TIMEOUT': (_non_negative, '0 or more'),
+    'SOCKETIO_ASYNC_MODE': (_one_of('eventlet', 'gevent', 'threading'),
+                            'eventlet, gevent or threading')
+}
+
+class Settings:
+    """Validated configuration values, read as attributes"""
+    
+    def __init__(self, env, values):
+        self.env = env
+        self.__dict__.update(values)
+    
+    def as_dict(self):
+        """All settings except the secret key"""
+        return {name: value for name, value in vars(self).items()
+                if name.isupper() and name != 'SECRET_KEY'}
+    
+    def changes(self, other):
+        """
+        Settings whose value differs in other
+        
+        Returns:
+            dict: name -> (old value, new value)
+        """
+        return {name: (getattr(self, name, None), value)
+                for name, value in vars(other).items()
+                if name.isupper() and getattr(self, name, None) != value}
+
+def _parse(name, raw, default):
+    """Convert an environment string to the type of the default value"""
+    try:
+        if isinstance(default, bool):
+            if raw.lower() in ('1', 'true', 'yes', 'on'):
+                return True
+            if raw.lower() in ('0', 'false', 'no', 'off'):
+                return False
+            raise ValueError(raw)
+        if isinstance(default, int):
+            return int(raw)
+        if isinstance(default, float):
+            return float(raw)
+        if isinstance(default, str):
+            return raw
+        return json.loads(raw)
+    except ValueError:
+        raise ConfigError(f"{name}: cannot parse {raw!r} "
+                          f"as {type(default).__name__ if default is not None else 'JSON'}")
+
+def validate(values):
+    """
+    Check every setting against VALIDATORS and the cross-setting rules
+    
+    Raises:
+        ConfigError: Listing every invalid setting
+    """
+    errors = []
+    invalid = set()
+    for name, (check, description) in VALIDATORS.items():
+        if name not in values:
+            continue
+        try:
+            valid = check(values[name])
+        except TypeError:
+            valid = False
+        if not valid:
+            invalid.add(name)
+            errors.append(f"{name} must be {description} (got {values[name]!r})")
+    
+    # Compare the two only when both are present and individually valid
+    timing = ('SESSION_TTL', 'VERIFICATION_INTERVAL')
+    if (all(name in values and name not in invalid for name in timing)
+            and values['SESSION_TTL'] <= values['VERIFICATION_INTERVAL']):
+        errors.append("SESSION_TTL must exceed VERIFICATION_INTERVAL, "
+                      "or sessions expire between verifications")
+    
+    if errors:
+        raise ConfigError('Invalid configuration: ' + '; '.join(errors))
+
+def load_config(env=None, environ=None):
+    """
+    Build validated settings from a config class plus overrides
+    
+    Args:
+        env: Config name (default: PVS_ENV, else 'default')
+        environ: Environment mapping (default: os.environ)
+    
+    Returns:
+        Settings
+    
+    Raises:
+        ConfigError: Unknown or invalid settings
+    """
+    environ = os.environ if environ is None else environ
+    env = env or environ.get('PVS_ENV') or 'default'
+    if env not in config:
+        raise ConfigError(f"Unknown configuration: {env} (expected one of {', '.join(config)})")
+    
+    base = config[env]
+    values = {name: getattr(base, name) for name in dir(base) if name.isupper()}
+    
+    overrides_file = environ.get('PVS_CONFIG_FILE')
+    if overrides_file:
+        try:
+            with open(overrides_file) as f:
+                overrides = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ConfigError(f"Cannot read {overrides_file}: {e}")
+        
+        unknown = sorted(set(overrides) - set(values))
+        if unknown:
+            raise ConfigError(f"Unknown settings in {overrides_file}: {', '.join(unknown)}")
+        values.update(overrides)
+    
+    for name, default in list(values.items()):
+        raw = environ.get(f'PVS_{name}')
+        if raw is None and name in UNPREFIXED_ENV:
+            raw = environ.get(name)
+        if raw is not None:
+            values[name] = _parse(name, raw, default)
+    
+    validate(values)
+    return Settings(env, values)
+
+_settings = None
+_settings_lock = threading.Lock()
+
+def get_settings():
+    """Process-wide settings, loaded on first use"""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = load_config()
+    return _settings
+
+def reload_settings():
+    """
+    Re-read the overrides file and environment
+    
+    Only HOT_RELOADABLE values are swapped in; the others keep their
+    startup value until the process restarts.
+    
+    Returns:
+        tuple: (settings now in effect, names that changed, names needing a restart)
+    
+    Raises:
+        ConfigError: The new configuration is invalid (nothing changes)
+    """
+    global _settings
+    current = get_settings()
+    fresh = load_config(current.env)
+    changes = current.changes(fresh)
+    
+    applied = sorted(name for name in changes if name in HOT_RELOADABLE)
+    restart_required = sorted(name for name in changes if name not in HOT_RELOADABLE)
+    
+    values = dict(vars(current))
+    values.pop('env')
+    values.update({name: getattr(fresh, name) for name in applied})
+    
+    with _settings_lock:
+        _settings = Settings(current.env, values)
+    return _settings, applied, restart_required
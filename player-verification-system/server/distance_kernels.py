@@ -0,0 +1,130 @@
+"""
+Face Encoding Distance Kernels
+
+Pure-numpy float32 Euclidean distances for 128-d face encodings:
+1:1 (verify), 1:N (verify against a gallery, identify) and N:M (dedupe)
+via the ||a||^2 + ||b||^2 - 2ab identity so the heavy part runs in BLAS.
+"""
+import math
+import threading
+
+import numpy as np
+
+# Per-thread scratch buffers, grown on demand and reused across calls
+_scratch = threading.local()
+
+def as_float32(encodings):
+    """Return encodings as a float32 array (no copy if already float32)"""
+    return np.asarray(encodings, dtype=np.float32)
+
+def _scratch_buffer(name, shape):
+    """Get a reusable float32 (rows, cols) buffer for this thread"""
+    buffer = getattr(_scratch, name, None)
+    size = shape[0] * shape[1]
+
+    if buffer is None or buffer.size < size:
+        buffer = np.empty(size, dtype=np.float32)
+        setattr(_scratch, name, buffer)
+
+    return buffer[:size].reshape(shape)
+
+def squared_tolerance(tolerance):
+    """Square a distance tolerance for comparisons against squared distances"""
+    return tolerance * tolerance
+
+def pair_distance(a, b, squared=False):
+    """
+    Distance between two encodings
+
+    Args:
+        a, b: 1-D encodings
+        squared: Return the squared distance (skips the sqrt)
+
+    Returns:
+        float
+    """
+    diff = as_float32(a) - as_float32(b)
+    distance_sq = float(np.dot(diff, diff))
+    return distance_sq if squared else math.sqrt(distance_sq)
+
+def one_to_many(query, gallery, out=None, squared=False):
+    """
+    Distances from one encoding to every row of a gallery
+
+    Args:
+        query: 1-D encoding
+        gallery: (N, D) float32 array
+        out: Optional preallocated float32 output of shape (N,)
+        squared: Return squared distances (skips the sqrt)
+
+    Returns:
+        numpy.ndarray of shape (N,)
+    """
+    query = as_float32(query)
+    gallery = as_float32(gallery)
+
+    diff = _scratch_buffer('diff', gallery.shape)
+    np.subtract(gallery, query, out=diff)
+
+    if out is None:
+        out = np.empty(gallery.shape[0], dtype=np.float32)
+    np.einsum('ij,ij->i', diff, diff, out=out)
+
+    if not squared:
+        np.sqrt(out, out=out)
+    return out
+
+def squared_norms(encodings):
+    """Row-wise squared norms, cacheable alongside a gallery matrix"""
+    encodings = as_float32(encodings)
+    return np.einsum('ij,ij->i', encodings, encodings)
+
+def many_to_many(queries, gallery, out=None, squared=False, gallery_norms=None):
+    """
+    Pairwise distances between two sets of encodings
+
+    Args:
+        queries: (N, D) array
+        gallery: (M, D) array
+        out: Optional preallocated float32 output of shape (N, M)
+        squared: Return squared distances (skips the sqrt)
+        gallery_norms: Precomputed squared_norms(gallery)
+
+    Returns:
+        numpy.ndarray of shape (N, M)
+    """
+    queries = as_float32(queries)
+    gallery = as_float32(gallery)
+
+    if gallery_norms is None:
+        gallery_norms = squared_norms(gallery)
+
+    if out is None:
+        out = np.empty((queries.shape[0], gallery.shape[0]), dtype=np.float32)
+
+    np.matmul(queries, gallery.T, out=out)
+    out *= -2.0
+    out += squared_norms(queries)[:, None]
+    out += gallery_norms[None, :]
+
+    # Rounding can push identical pairs slightly below zero
+    np.maximum(out, 0.0, out=out)
+
+    if not squared:
+        np.sqrt(out, out=out)
+    return out
+
+def near_duplicate_pairs(encodings, threshold):
+    """
+    Find pairs of encodings closer than a threshold
+
+    Args:
+        encodings: (N, D) array
+        threshold: Distance below which two encodings are duplicates
+
+    Returns:
+        list: (i, j, distance) with i < j
+    """
+    distances_sq = many_to_many(encodings, encodings, squared=True)
+    rows, cols = np.nonzero(np.triu(distances_sq < squared_tolerance(threshold), k=1))
+    return [(int(i), int(j), math.sqrt(float(distances_sq[i, j]))) for i, j in zip(rows, cols)]
@@ -0,0 +1,404 @@
+"""
+Server-side Face Encoding Service
+
+Runs face detection and encoding in a pool of warm worker processes so the
+web tier never blocks on dlib.
+"""
+import threading
+import queue
+import time
+import os
+from io import BytesIO
+from concurrent.futures import CancelledError, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from utils.lazy_import import lazy_module
+from utils.process_pool import TerminablePool
+
+Image = lazy_module('PIL.Image')
+
+# Per-process FaceVerification instance, created by _init_worker
+_worker_verifier = None
+
+class EncodingServiceBusy(Exception):
+    """Raised when the pending-request queue is full"""
+
+class EncodingTimeout(Exception):
+    """Raised when an encoding request exceeds its deadline"""
+
+# What a job sees when another request's stuck job took its pool down
+POOL_RESET_ERRORS = (BrokenProcessPool, CancelledError)
+
+def _init_worker(detector):
+    """Load dlib models once per worker process"""
+    global _worker_verifier
+
+    # Imported here so only worker processes load cv2 / dlib
+    from verification import FaceVerification
+
+    _worker_verifier = FaceVerification(detector=detector)
+
+    # Warm-up call forces the detector and encoder models into memory
+    _worker_verifier.detect_and_encode_from_array(np.zeros((64, 64, 3), dtype=np.uint8))
+
+def _encode_job(image_bytes):
+    """
+    Decode an image and compute its face encoding (runs in a worker)
+
+    Returns:
+        numpy.ndarray or None if no face was found
+    """
+    image = Image.open(BytesIO(image_bytes)).convert('RGB')
+    return _worker_verifier.detect_and_encode_from_array(np.array(image))
+
+def _encode_batch_job(batch):
+    """
+    Decode and encode a micro-batch of images (runs in a worker)
+
+    Returns:
+        list: Encoding or None for each image
+    """
+    images = [np.array(Image.open(BytesIO(image_bytes)).convert('RGB')) for image_bytes in batch]
+    return _worker_verifier.detect_and_encode_batch(images)
+
+class EncodingService:
+    """Bounded, recycling process pool for face encoding"""
+
+    def __init__(self, max_workers=None, max_pending=32, timeout=10.0,
+                 recycle_after=500, detector='cascade+hog', sleep=None):
+        """
+        Initialize encoding service (workers start on first request)
+
+        Args:
+            max_workers: Worker processes (default: CPU count)
+            max_pending: Maximum queued + running requests
+            timeout: Per-request deadline in seconds
+            recycle_after: Replace the pool after this many tasks
+            detector: Detection tier used by the workers
+            sleep: Cooperative sleep used while waiting (e.g. socketio.sleep)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.recycle_after = recycle_after
+        self.detector = detector
+        self.sleep = sleep or time.sleep
+
+        self._pool = None
+        self._tasks_on_pool = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _new_pool(self):
+        """Create a fresh pool of warm workers"""
+        return TerminablePool(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.detector,)
+        )
+
+    def _get_pool(self):
+        """Return the current pool, recycling it when it has done enough work"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._new_pool()
+                self._tasks_on_pool = 0
+            elif self._tasks_on_pool >= self.recycle_after:
+                # Running tasks finish on the old pool; new ones go to fresh workers
+                self._pool.shutdown(wait=False)
+                self._pool = self._new_pool()
+                self._tasks_on_pool = 0
+
+            self._tasks_on_pool += 1
+            return self._pool
+
+    def _reset_pool(self, pool=None):
+        """
+        Discard a broken or stuck pool
+
+        Args:
+            pool: The pool to discard (default: the current one). If it has
+                  already been replaced, its successor is left alone.
+        """
+        with self._lock:
+            pool = pool or self._pool
+            if pool is None:
+                return
+            if self._pool is pool:
+                self._pool = None
+
+        # shutdown() alone leaves a stuck worker running forever
+        pool.terminate()
+
+    def encode(self, image_bytes, timeout=None):
+        """
+        Encode the face in an image
+
+        Args:
+            image_bytes: Encoded image (JPEG/PNG)
+            timeout: Override the per-request deadline
+
+        Returns:
+            numpy.ndarray or None if no face was found
+
+        Raises:
+            EncodingServiceBusy: Too many requests in flight, or the pool
+                                 was reset twice under this request
+            EncodingTimeout: Worker did not answer in time
+        """
+        if not self._slots.acquire(blocking=False):
+            raise EncodingServiceBusy("Encoding queue is full")
+
+        try:
+            deadline = time.monotonic() + (timeout or self.timeout)
+
+            # A reset for another request's stuck image fails this job too;
+            # it is not at fault, so it gets one more try on fresh workers
+            for _ in range(2):
+                pool, future = self._submit(_encode_job, image_bytes)
+
+                # Poll cooperatively so green threads keep running
+                while not future.done():
+                    if time.monotonic() >= deadline:
+                        if not future.cancel():
+                            # Worker is stuck on this image; move on to fresh workers
+                            self._reset_pool(pool)
+                        raise EncodingTimeout("Face encoding timed out")
+                    self.sleep(0.005)
+
+                try:
+                    return future.result()
+                except POOL_RESET_ERRORS:
+                    self._reset_pool(pool)
+
+            raise EncodingServiceBusy("Encoding workers restarted, retry shortly")
+
+        finally:
+            self._slots.release()
+
+    def _submit(self, fn, arg):
+        """
+        Submit a job, replacing the pool once if it has broken
+
+        Returns:
+            tuple: (pool, concurrent.futures.Future)
+        """
+        pool = self._get_pool()
+        try:
+            return pool, pool.submit(fn, arg)
+        except (BrokenProcessPool, RuntimeError):
+            self._reset_pool(pool)
+            pool = self._get_pool()
+            return pool, pool.submit(fn, arg)
+
+    def submit_batch(self, batch):
+        """
+        Submit a list of encoded images as a single pool task
+
+        Returns:
+            tuple: (pool, concurrent.futures.Future resolving to a list of
+                   encodings); pass the pool to _reset_pool if the task sticks
+        """
+        return self._submit(_encode_batch_job, batch)
+
+    def shutdown(self, wait=True):
+        """Stop all workers"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+
+class MicroBatchScheduler:
+    """
+    Collect encoding requests into micro-batches in front of EncodingService
+
+    A batch is dispatched when it holds batch_limit items or the oldest item
+    has waited max_wait_ms. batch_limit adapts to the latency SLO: it halves
+    when batches finish too slowly and grows by one while there is headroom.
+    """
+
+    def __init__(self, service, max_batch=16, max_wait_ms=20, latency_slo_ms=1000,
+                 max_pending=64, timeout=10.0, sleep=None):
+        """
+        Initialize micro-batch scheduler (dispatcher starts on first request)
+
+        Args:
+            service: EncodingService whose pool runs the batches
+            max_batch: Upper bound on items per batch
+            max_wait_ms: Longest time the first item waits for company
+            latency_slo_ms: Target end-to-end latency per request
+            max_pending: Maximum queued + running requests
+            timeout: Per-request deadline in seconds
+            sleep: Cooperative sleep used while waiting (e.g. socketio.sleep)
+        """
+        self.service = service
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.latency_slo = latency_slo_ms / 1000.0
+        self.timeout = timeout
+        self.sleep = sleep or time.sleep
+
+        self.batch_limit = max(1, max_batch // 4)
+        self.batch_latency = None  # EWMA of batch service time (seconds)
+
+        self._queue = queue.Queue()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._inflight = {}  # pool future -> (batch, started, deadline, pool, attempt)
+        self._dispatcher = None
+        self._lock = threading.Lock()
+
+    def submit(self, image_bytes):
+        """
+        Queue an image for the next batch
+
+        Returns:
+            concurrent.futures.Future resolving to an encoding or None
+
+        Raises:
+            EncodingServiceBusy: Too many requests in flight
+        """
+        if not self._slots.acquire(blocking=False):
+            raise EncodingServiceBusy("Encoding queue is full")
+
+        self._ensure_dispatcher()
+
+        future = Future()
+        future.add_done_callback(lambda _: self._slots.release())
+        self._queue.put((time.monotonic(), image_bytes, future))
+        return future
+
+    def encode(self, image_bytes, timeout=None):
+        """
+        Encode the face in an image via the next micro-batch
+
+        Same contract as EncodingService.encode.
+        """
+        future = self.submit(image_bytes)
+        deadline = time.monotonic() + (timeout or self.timeout)
+
+        # Poll cooperatively so green threads keep running
+        while not future.done():
+            if time.monotonic() >= deadline:
+                future.cancel()
+                raise EncodingTimeout("Face encoding timed out")
+            self.sleep(0.005)
+
+        return future.result()
+
+    def _ensure_dispatcher(self):
+        """Start the dispatcher thread once"""
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+                self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        """Gather items into batches and hand them to the pool"""
+        while True:
+            self._expire_overdue()
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = first[0] + self.max_wait
+
+            while len(batch) < self.batch_limit:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Drop requests whose callers already gave up
+            batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            started = time.monotonic()
+            self._send(batch, started, started + self.timeout)
+
+    def _send(self, batch, started, deadline, attempt=0):
+        """Hand a batch to the pool and track it until its deadline"""
+        try:
+            pool, pool_future = self.service.submit_batch([item[1] for item in batch])
+        except Exception as e:
+            for item in batch:
+                item[2].set_exception(e)
+            return
+
+        with self._lock:
+            self._inflight[pool_future] = (batch, started, deadline, pool, attempt)
+        pool_future.add_done_callback(self._complete)
+
+    def _expire_overdue(self):
+        """
+        Fail batches that outlived the timeout and replace their pool
+
+        A batch stuck in a worker would otherwise hold its callers' slots
+        forever, until every request is answered with 503. Other batches
+        caught in the reset are resubmitted by _complete.
+        """
+        now = time.monotonic()
+        with self._lock:
+            overdue = [pool_future for pool_future, entry in self._inflight.items()
+                       if now >= entry[2]]
+            entries = [self._inflight.pop(pool_future) for pool_future in overdue]
+
+        for batch, _, _, pool, _ in entries:
+            self.service._reset_pool(pool)
+            for item in batch:
+                if not item[2].done():
+                    item[2].set_exception(EncodingTimeout("Face encoding batch timed out"))
+
+    def _complete(self, pool_future):
+        """Resolve each caller's future and adapt the batch size"""
+        with self._lock:
+            entry = self._inflight.pop(pool_future, None)
+        if entry is None:
+            return  # Already failed by _expire_overdue
+
+        batch, started, deadline, pool, attempt = entry
+        service_time = time.monotonic() - started
+
+        try:
+            results = pool_future.result()
+        except POOL_RESET_ERRORS:
+            # Another batch's stuck job reset the pool: this one is innocent
+            self.service._reset_pool(pool)
+            if attempt == 0 and time.monotonic() < deadline:
+                self._send(batch, started, deadline, attempt + 1)
+                return
+            error = EncodingServiceBusy("Encoding workers restarted, retry shortly")
+            for item in batch:
+                item[2].set_exception(error)
+            return
+        except Exception as e:
+            for item in batch:
+                item[2].set_exception(e)
+            return
+
+        for item, result in zip(batch, results):
+            item[2].set_result(result)
+
+        self._adapt(service_time, batch)
+
+    def _adapt(self, service_time, batch):
+        """AIMD batch sizing against the latency SLO"""
+        with self._lock:
+            if self.batch_latency is None:
+                self.batch_latency = service_time
+            else:
+                self.batch_latency = 0.8 * self.batch_latency + 0.2 * service_time
+
+            # Worst case seen by the first item: its wait plus the batch run time
+            worst_latency = time.monotonic() - batch[0][0]
+
+            if worst_latency > self.latency_slo or self.batch_latency > self.latency_slo:
+                self.batch_limit = max(1, self.batch_limit // 2)
+            elif worst_latency < 0.5 * self.latency_slo and len(batch) >= self.batch_limit:
+                self.batch_limit = min(self.max_batch, self.batch_limit + 1)
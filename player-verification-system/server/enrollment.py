@@ -0,0 +1,184 @@
+"""
+Continuous-stream Enrollment Session
+"""
+import threading
+import queue
+import time
+import os
+
+from distance_kernels import one_to_many, squared_tolerance
+from utils.lazy_import import lazy_module
+
+cv2 = lazy_module('cv2')
+face_recognition = lazy_module('face_recognition')
+
+class EnrollmentSession:
+    """Collect several diverse face samples from a single open webcam stream"""
+
+    def __init__(self, face_verifier, count=5, camera_index=0, save_dir=None,
+                 preview_scale=0.25, min_diversity=0.06, capture_interval=0.3,
+                 timeout=90):
+        """
+        Initialize enrollment session
+
+        Args:
+            face_verifier: FaceVerification instance providing the quality gates
+            count: Number of samples to collect
+            camera_index: OpenCV camera index
+            save_dir: Directory to save accepted frames (optional)
+            preview_scale: Downscale factor used for preview detection
+            min_diversity: Minimum encoding distance to every accepted sample
+            capture_interval: Minimum seconds between auto-captures
+            timeout: Give up after this many seconds
+        """
+        self.face_verifier = face_verifier
+        self.count = count
+        self.camera_index = camera_index
+        self.save_dir = save_dir
+        self.preview_scale = preview_scale
+        self.min_diversity = min_diversity
+        self.capture_interval = capture_interval
+        self.timeout = timeout
+
+        self.samples = []
+        self._lock = threading.Lock()
+        self._frames = queue.Queue(maxsize=2)
+        self._stop = threading.Event()
+
+    def run(self):
+        """
+        Open the camera once and auto-capture until enough samples are collected
+
+        Returns:
+            list: Face encodings, or None if cancelled / timed out
+        """
+        cap = cv2.VideoCapture(self.camera_index)
+
+        if not cap.isOpened():
+            print("Error: Cannot access webcam")
+            return None
+
+        if self.save_dir:
+            os.makedirs(self.save_dir, exist_ok=True)
+
+        worker = threading.Thread(target=self._encode_worker, daemon=True)
+        worker.start()
+
+        print("Look at the camera and slowly turn your head. Press ESC to cancel")
+
+        started = time.time()
+        last_submit = 0.0
+        cancelled = False
+
+        try:
+            while not self._stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                location, hint = self._check_frame(frame)
+
+                now = time.time()
+                if location is not None and now - last_submit >= self.capture_interval:
+                    try:
+                        self._frames.put_nowait((frame.copy(), location))
+                        last_submit = now
+                    except queue.Full:
+                        pass  # Worker is still busy, skip this frame
+
+                self._draw_overlay(frame, location, hint)
+                cv2.imshow('Face Enrollment - ESC to cancel', frame)
+
+                key = cv2.waitKey(1) & 0xFF
+                if key == 27:
+                    cancelled = True
+                    break
+
+                with self._lock:
+                    if len(self.samples) >= self.count:
+                        break
+
+                if now - started > self.timeout:
+                    print("✗ Enrollment timed out")
+                    break
+        finally:
+            self._stop.set()
+            worker.join(timeout=5)
+            cap.release()
+            cv2.destroyAllWindows()
+
+        with self._lock:
+            samples = list(self.samples)
+
+        if cancelled or len(samples) < self.count:
+            return None
+
+        return samples
+
+    def _check_frame(self, frame):
+        """
+        Run the quality gates on a downscaled copy of the frame
+
+        Returns:
+            tuple: (face_location in full-frame coordinates or None, hint text)
+        """
+        small = cv2.resize(frame, (0, 0), fx=self.preview_scale, fy=self.preview_scale)
+        rgb_small = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+
+        quality = self.face_verifier.assess_frame_quality(rgb_small)
+
+        if not quality['passed']:
+            hints = self.face_verifier.QUALITY_HINTS
+            return None, hints.get(quality['reasons'][0], "Adjust your position")
+
+        top, right, bottom, left = quality['location']
+        scale = 1.0 / self.preview_scale
+        location = (int(top * scale), int(right * scale),
+                    int(bottom * scale), int(left * scale))
+        return location, "Hold still..."
+
+    def _encode_worker(self):
+        """Background worker computing encodings for gated frames"""
+        while not self._stop.is_set():
+            try:
+                frame, location = self._frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            encodings = face_recognition.face_encodings(rgb_frame, [location])
+
+            if len(encodings) == 0:
+                continue
+
+            encoding = encodings[0]
+
+            with self._lock:
+                if len(self.samples) >= self.count:
+                    continue
+
+                # Require each sample to add pose/expression variety
+                if self.samples:
+                    distances_sq = one_to_many(encoding, self.samples, squared=True)
+                    if distances_sq.min() < squared_tolerance(self.min_diversity):
+                        continue
+
+                self.samples.append(encoding)
+                index = len(self.samples)
+
+            if self.save_dir:
+                cv2.imwrite(os.path.join(self.save_dir, f"capture_{index}.jpg"), frame)
+
+            print(f"✓ Sample {index}/{self.count} captured")
+
+    def _draw_overlay(self, frame, location, hint):
+        """Draw face box, hint and progress onto the preview frame"""
+        if location is not None:
+            top, right, bottom, left = location
+            cv2.rectangle(frame, (left, top), (right, bottom), (0, 255, 0), 2)
+
+        with self._lock:
+            collected = len(self.samples)
+
+        cv2.putText(frame, f"{collected}/{self.count}  {hint}", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
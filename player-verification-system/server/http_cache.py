@@ -0,0 +1,138 @@
+"""
+HTTP Caching - ETags from data versions, gzip and fast JSON bodies
+"""
+import gzip
+import zlib
+from functools import wraps
+
+from flask import Response, make_response, request
+from flask.json.provider import DefaultJSONProvider
+
+from models import DataVersion
+from serialization import orjson
+
+def etag_for(names, path):
+    """
+    Weak ETag for a resource built from the given data versions
+
+    Args:
+        names: DataVersion names the resource is read from
+        path: Request path with query string (different queries, different tags)
+    """
+    versions = '.'.join(str(version) for version in DataVersion.get(*names))
+    return f"{versions}-{zlib.crc32(path.encode('utf-8')):08x}"
+
+def conditional(*names):
+    """
+    Decorator answering If-None-Match with 304 from in-memory versions
+
+    The version is read before the view runs, so a write racing the query
+    can only make the tag older than the body, never newer; the next
+    request then simply gets a 200.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag = etag_for(names, request.full_path)
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            # Browsers keep the body but revalidate before every use
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+def compress_response(response, min_size=1024, level=6):
+    """
+    Gzip a JSON response when the client accepts it and it is large enough
+
+    Streamed responses are compressed chunk by chunk as they are sent;
+    already-encoded ones are left alone.
+
+    Args:
+        response: Flask response
+        min_size: Smallest body (bytes) worth compressing
+        level: gzip compression level (1-9)
+    """
+    if (response.status_code != 200
+            or response.mimetype != 'application/json'
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '')):
+        return response
+
+    if response.is_streamed:
+        response.response = _gzip_stream(response.response, level)
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        return response
+
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+
+    response.set_data(gzip.compress(body, compresslevel=level, mtime=0))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+def _gzip_stream(chunks, level):
+    """Gzip an iterable of byte chunks incrementally, closing it when done"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def json_rows_response(chunks):
+    """
+    Response for a select_json() chunk generator
+
+    A result that fits in one chunk is sent whole (so it gets a
+    Content-Length and can be gzipped); a larger one is streamed as the
+    rows are fetched instead of being built in memory first.
+    """
+    head = [next(chunks)]
+    if head[0] != b'[]':
+        head.append(next(chunks))
+    if head[-1].endswith(b']'):
+        chunks.close()
+        return Response(b''.join(head), mimetype='application/json')
+
+    def stream():
+        try:
+            yield from head
+            yield from chunks
+        finally:
+            chunks.close()
+
+    return Response(stream(), mimetype='application/json')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() through orjson; anything orjson can't encode falls back to Flask's rules"""
+
+    OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.OPTIONS),
+            mimetype=self.mimetype
+        )
@@ -0,0 +1,283 @@
+"""
+Verification log export - streaming CSV / JSON Lines and compressed columnar files
+"""
+import csv
+import io
+import json
+import zipfile
+
+import numpy as np
+
+from models import VerificationLog
+from utils.lazy_import import lazy_module
+
+pa = lazy_module('pyarrow')
+pq = lazy_module('pyarrow.parquet')
+
+EXPORT_COLUMNS = (
+    'log_id', 'player_id', 'player_name', 'timestamp', 'verification_status',
+    'confidence_score', 'image_path', 'device_matched'
+)
+
+# String columns with few distinct values, stored as codes + a vocabulary
+DICTIONARY_COLUMNS = ('player_id', 'player_name', 'verification_status')
+
+STREAMING_FORMATS = ('csv', 'jsonl')
+COLUMNAR_FORMATS = ('npz', 'parquet')
+EXPORT_FORMATS = STREAMING_FORMATS + COLUMNAR_FORMATS
+
+MIMETYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'npz': 'application/octet-stream',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+def iter_csv(chunks):
+    """
+    Render log chunks as CSV text
+
+    Args:
+        chunks: Iterable of row lists, as yielded by VerificationLog.iter_logs
+
+    Yields:
+        str: Header, then one block of lines per chunk
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(tuple(row[column] for column in EXPORT_COLUMNS) for row in rows)
+        yield buffer.getvalue()
+
+def iter_jsonl(chunks):
+    """
+    Render log chunks as JSON Lines
+
+    Yields:
+        str: One block of lines per chunk
+    """
+    for rows in chunks:
+        yield ''.join(
+            json.dumps({column: row[column] for column in EXPORT_COLUMNS}) + '\n'
+            for row in rows
+        )
+
+def stream_logs(export_format, chunk_size=1000, **filters):
+    """
+    Stream the filtered log history as CSV or JSON Lines
+
+    Args:
+        export_format: 'csv' or 'jsonl'
+        chunk_size: Rows fetched per round trip
+        **filters: start, end, player_id, status (see VerificationLog.iter_logs)
+
+    Returns:
+        generator of str
+    """
+    chunks = VerificationLog.iter_logs(chunk_size=chunk_size, **filters)
+
+    if export_format == 'csv':
+        return iter_csv(chunks)
+    if export_format == 'jsonl':
+        return iter_jsonl(chunks)
+
+    raise ValueError(f"Unknown streaming format: {export_format}")
+
+def _chunk_columns(rows):
+    """Split a chunk of rows into typed numpy columns"""
+    return {
+        'log_id': np.fromiter((row['log_id'] for row in rows), dtype=np.int64, count=len(rows)),
+        'player_id': np.array([row['player_id'] for row in rows], dtype=object),
+        'player_name': np.array([row['player_name'] or '' for row in rows], dtype=object),
+        'timestamp': np.array([row['timestamp'] for row in rows], dtype='datetime64[s]'),
+        'verification_status': np.array([row['verification_status'] for row in rows], dtype=object),
+        'confidence_score': np.fromiter(
+            (np.nan if row['confidence_score'] is None else row['confidence_score'] for row in rows),
+            dtype=np.float32, count=len(rows)
+        ),
+        'image_path': np.array([row['image_path'] for row in rows], dtype=object),
+        'device_matched': np.fromiter((bool(row['device_matched']) for row in rows),
+                                      dtype=bool, count=len(rows))
+    }
+
+class _ByteSink:
+    """Write-only, unseekable buffer that is emptied after every chunk"""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+def _write_member(archive, name, values):
+    """Add one array to the archive as name.npy"""
+    with archive.open(f'{name}.npy', 'w', force_zip64=True) as member:
+        np.lib.format.write_array(member, values, allow_pickle=False)
+
+def iter_npz(chunks):
+    """
+    Render log chunks as a compressed NumPy archive, one member per column per chunk
+
+    Members are named '{column}__{chunk}' (chunks numbered from 000000).
+    Player IDs, names and statuses are dictionary-encoded: each chunk
+    stores int32 '{column}__codes__{chunk}' and the archive ends with one
+    '{column}__values' vocabulary. Only the current chunk and the
+    vocabularies are held in memory; load_npz() reassembles the columns.
+
+    Yields:
+        bytes: Archive data as each chunk is compressed
+    """
+    sink = _ByteSink()
+    vocabularies = {column: {} for column in DICTIONARY_COLUMNS}
+
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for index, rows in enumerate(chunks):
+            for column, values in _chunk_columns(rows).items():
+                if column in vocabularies:
+                    vocabulary = vocabularies[column]
+                    codes = np.fromiter((vocabulary.setdefault(value, len(vocabulary))
+                                         for value in values), dtype=np.int32, count=len(values))
+                    _write_member(archive, f'{column}__codes__{index:06d}', codes)
+                else:
+                    if values.dtype == object:
+                        values = values.astype(str)
+                    _write_member(archive, f'{column}__{index:06d}', values)
+            yield sink.drain()
+
+        for column, vocabulary in vocabularies.items():
+            _write_member(archive, f'{column}__values', np.array(list(vocabulary), dtype=str))
+
+    yield sink.drain()
+
+def write_npz(chunks, fileobj):
+    """
+    Write logs as a compressed NumPy archive (see iter_npz)
+
+    Args:
+        chunks: Iterable of row lists
+        fileobj: Path or binary file object
+
+    Returns:
+        int: Number of rows written
+    """
+    row_count = 0
+
+    def counted():
+        nonlocal row_count
+        for rows in chunks:
+            row_count += len(rows)
+            yield rows
+
+    output = open(fileobj, 'wb') if isinstance(fileobj, str) else fileobj
+    try:
+        for block in iter_npz(counted()):
+            output.write(block)
+    finally:
+        if output is not fileobj:
+            output.close()
+
+    return row_count
+
+def load_npz(path):
+    """
+    Read an exported archive back as whole columns
+
+    Returns:
+        dict: column -> numpy array
+    """
+    with np.load(path) as archive:
+        names = sorted(archive.files)
+        columns = {}
+
+        for column in EXPORT_COLUMNS:
+            if column in DICTIONARY_COLUMNS:
+                prefix = f'{column}__codes__'
+                parts = [archive[name] for name in names if name.startswith(prefix)]
+                codes = np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+                columns[column] = archive[f'{column}__values'][codes]
+            else:
+                prefix = f'{column}__'
+                parts = [archive[name] for name in names if name.startswith(prefix)]
+                columns[column] = np.concatenate(parts) if parts else np.array([])
+
+    return columns
+
+def write_parquet(chunks, fileobj):
+    """
+    Write logs as a zstd-compressed Parquet file, one row group per chunk
+
+    Requires pyarrow.
+
+    Returns:
+        int: Number of rows written
+    """
+    schema = pa.schema([
+        ('log_id', pa.int64()),
+        ('player_id', pa.dictionary(pa.int32(), pa.string())),
+        ('player_name', pa.dictionary(pa.int32(), pa.string())),
+        ('timestamp', pa.timestamp('s')),
+        ('verification_status', pa.dictionary(pa.int8(), pa.string())),
+        ('confidence_score', pa.float32()),
+        ('image_path', pa.string()),
+        ('device_matched', pa.bool_())
+    ])
+
+    row_count = 0
+    with pq.ParquetWriter(fileobj, schema, compression='zstd') as writer:
+        for rows in chunks:
+            columns = _chunk_columns(rows)
+            table = pa.table({
+                column: pa.array(columns[column].tolist() if columns[column].dtype == object
+                                 else columns[column]).cast(schema.field(column).type)
+                for column in EXPORT_COLUMNS
+            }, schema=schema)
+            writer.write_table(table)
+            row_count += len(rows)
+
+    return row_count
+
+def stream_npz(chunk_size=5000, **filters):
+    """
+    Stream the filtered log history as a compressed NumPy archive
+
+    Returns:
+        generator of bytes
+    """
+    return iter_npz(VerificationLog.iter_logs(chunk_size=chunk_size, **filters))
+
+def write_columnar(export_format, fileobj, chunk_size=5000, **filters):
+    """
+    Export the filtered log history in a compressed columnar format
+
+    Args:
+        export_format: 'npz' or 'parquet'
+        fileobj: Path or binary file object
+        chunk_size: Rows fetched per round trip
+        **filters: start, end, player_id, status
+
+    Returns:
+        int: Number of rows written
+    """
+    chunks = VerificationLog.iter_logs(chunk_size=chunk_size, **filters)
+
+    if export_format == 'npz':
+        return write_npz(chunks, fileobj)
+    if export_format == 'parquet':
+        return write_parquet(chunks, fileobj)
+
+    raise ValueError(f"Unknown columnar format: {export_format}")
@@ -0,0 +1,179 @@
+"""
+Lightweight Latency Metrics - per-stage timers and in-process histograms
+"""
+import bisect
+import threading
+import time
+
+# Histogram upper bounds in seconds: 10us doubling up to ~10s
+DEFAULT_BUCKETS = tuple(1e-5 * 2 ** i for i in range(21))
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with quantile estimates"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        """Record one duration (caller holds the registry lock)"""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """
+        Estimate a quantile by interpolating inside its bucket
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            float: Seconds, or 0.0 when empty
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count > 0:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else lower * 2
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+
+        return self.buckets[-1]
+
+class StageTimer:
+    """Records the time between successive lap() calls for one request"""
+
+    __slots__ = ('registry', 'started', 'last', 'laps')
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.started = self.last = time.perf_counter()
+        self.laps = []
+
+    def lap(self, stage):
+        """Attribute the time since the previous lap to `stage`"""
+        now = time.perf_counter()
+        self.laps.append((stage, now - self.last))
+        self.last = now
+
+    def finish(self, status='200'):
+        """
+        Record all laps plus the request total
+
+        Args:
+            status: Outcome label (e.g. the HTTP status), so failed
+                    requests do not skew the successful ones' latency
+        """
+        self.laps.append(('total', time.perf_counter() - self.started))
+        self.registry.record(self.laps, status)
+
+class _NullTimer:
+    """Stand-in used while metrics are disabled"""
+
+    __slots__ = ()
+
+    def lap(self, stage):
+        pass
+
+    def finish(self, status='200'):
+        pass
+
+NULL_TIMER = _NullTimer()
+
+class MetricsRegistry:
+    """Per-stage latency histograms for one instrumented code path"""
+
+    def __init__(self, name, help_text, enabled=True, buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+            name: Prometheus metric name (e.g. 'pvs_verify_stage_seconds')
+            help_text: HELP line for the exposition format
+            enabled: Start collecting immediately
+            buckets: Histogram upper bounds in seconds
+        """
+        self.name = name
+        self.help_text = help_text
+        self.enabled = enabled
+        self.buckets = buckets
+        self.histograms = {}  # (stage, status) -> LatencyHistogram
+        self._lock = threading.Lock()
+
+    def timer(self):
+        """Start timing a request (no-op timer when disabled)"""
+        if not self.enabled:
+            return NULL_TIMER
+        return StageTimer(self)
+
+    def record(self, laps, status='200'):
+        """Add (stage, seconds) pairs to their histograms for one outcome"""
+        with self._lock:
+            for stage, seconds in laps:
+                histogram = self.histograms.get((stage, status))
+                if histogram is None:
+                    histogram = self.histograms[(stage, status)] = LatencyHistogram(self.buckets)
+                histogram.observe(seconds)
+
+    def reset(self):
+        """Clear all histograms"""
+        with self._lock:
+            self.histograms = {}
+
+    def summary(self, status='200'):
+        """
+        Get count and p50/p95/p99 per stage
+
+        Args:
+            status: Outcome whose requests to summarize
+
+        Returns:
+            dict: stage -> {'count', 'mean', 'p50', 'p95', 'p99'} in seconds
+        """
+        with self._lock:
+            return {
+                stage: {
+                    'count': histogram.count,
+                    'mean': histogram.sum / histogram.count if histogram.count else 0.0,
+                    'p50': histogram.quantile(0.50),
+                    'p95': histogram.quantile(0.95),
+                    'p99': histogram.quantile(0.99)
+                }
+                for (stage, outcome), histogram in self.histograms.items()
+                if outcome == status
+            }
+
+    def prometheus_text(self):
+        """Render histograms and quantile estimates in Prometheus text format"""
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram"
+        ]
+        quantile_lines = [
+            f"# HELP {self.name}_quantile Estimated quantiles of {self.name}",
+            f"# TYPE {self.name}_quantile gauge"
+        ]
+
+        with self._lock:
+            for stage, status in sorted(self.histograms):
+                histogram = self.histograms[(stage, status)]
+                labels = f'stage="{stage}",status="{status}"'
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound:.6g}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'{self.name}_sum{{{labels}}} {histogram.sum:.9f}')
+                lines.append(f'{self.name}_count{{{labels}}} {histogram.count}')
+
+                for q in (0.5, 0.95, 0.99):
+                    quantile_lines.append(
+                        f'{self.name}_quantile{{{labels},quantile="{q}"}} {histogram.quantile(q):.9f}'
+                    )
+
+        return '\n'.join(lines + quantile_lines) + '\n'
@@ -3,13 +3,53 @@ Database models for Player Verification System
 """
 import sqlite3
 import pickle
-import os
-from datetime import datetime
+import time
+import numpy as np
+from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 
-# Always resolve path relative to THIS file, not the working directory
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATABASE_PATH = os.path.join(BASE_DIR, 'database', 'verification_system.db')
+from config import get_settings
+from serialization import select_json
+
+# Resolved by config.py relative to the project, not the working directory
+DATABASE_PATH = get_settings().DATABASE_PATH
+
+# Rollup granularities: name -> (bucket length, strftime format of bucket start)
+ROLLUP_GRANULARITIES = {
+    'minute': (timedelta(minutes=1), '%Y-%m-%d %H:%M:00'),
+    'hour': (timedelta(hours=1), '%Y-%m-%d %H:00:00'),
+    'day': (timedelta(days=1), '%Y-%m-%d 00:00:00')
+}
+
+# Days of minute rollups retention keeps; older ranges are read from hours
+MINUTE_ROLLUP_DAYS = 30
+
+# Adds one verification_logs row (by log_id) to every granularity's bucket
+_ROLLUP_UPSERT = '''
+    WITH granularities(granularity, fmt) AS (VALUES {values})
+    INSERT INTO verification_rollups
+    (granularity, bucket_start, verified, failed, confidence_sum, confidence_count, device_mismatches)
+    SELECT g.granularity, strftime(g.fmt, vl.timestamp),
+           vl.verification_status = 'VERIFIED',
+           vl.verification_status != 'VERIFIED',
+           COALESCE(vl.confidence_score, 0),
+           vl.confidence_score IS NOT NULL,
+           NOT vl.device_matched
+    FROM verification_logs vl, granularities g
+    WHERE vl.log_id = ?
+    ON CONFLICT (granularity, bucket_start) DO UPDATE SET
+        verified = verified + excluded.verified,
+        failed = failed + excluded.failed,
+        confidence_sum = confidence_sum + excluded.confidence_sum,
+        confidence_count = confidence_count + excluded.confidence_count,
+        device_mismatches = device_mismatches + excluded.device_mismatches
+'''.format(values=', '.join(f"('{name}', '{fmt}')" for name, (_, fmt) in ROLLUP_GRANULARITIES.items()))
+
+# Change counters kept by triggers: name -> tables whose writes bump it
+DATA_VERSION_TABLES = {
+    'players': ('players',),
+    'logs': ('verification_logs',)
+}
 
 def get_db_connection():
     """Create database connection"""
@@ -34,6 +74,23 @@ def init_db():
         )
     ''')
     
+    # Create player_templates table (several float32 encodings per player)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS player_templates (
+            template_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_id TEXT NOT NULL,
+            encoding BLOB NOT NULL,
+            source TEXT NOT NULL DEFAULT 'enrollment',
+            confidence_score REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (player_id) REFERENCES players (player_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_player_templates_player
+        ON player_templates (player_id)
+    ''')
+    
     # Create admin_users table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS admin_users (
@@ -61,32 +118,222 @@ def init_db():
             FOREIGN KEY (player_id) REFERENCES players (player_id)
         )
     ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_verification_logs_timestamp
+        ON verification_logs (timestamp)
+    ''')
+    
+    # Create verification_rollups table (per-minute / hour / day counters)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS verification_rollups (
+            granularity TEXT NOT NULL,
+            bucket_start TIMESTAMP NOT NULL,
+            verified INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            confidence_sum REAL NOT NULL DEFAULT 0,
+            confidence_count INTEGER NOT NULL DEFAULT 0,
+            device_mismatches INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, bucket_start)
+        ) WITHOUT ROWID
+    ''')
+    
+    # Create tournaments, matches and match_roster tables (who plays where)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tournaments (
+            tournament_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS matches (
+            match_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tournament_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'scheduled',
+            started_at TIMESTAMP,
+            ended_at TIMESTAMP,
+            FOREIGN KEY (tournament_id) REFERENCES tournaments (tournament_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_matches_tournament
+        ON matches (tournament_id)
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS match_roster (
+            match_id INTEGER NOT NULL,
+            seat TEXT NOT NULL,
+            player_id TEXT NOT NULL,
+            PRIMARY KEY (match_id, seat),
+            UNIQUE (match_id, player_id),
+            FOREIGN KEY (match_id) REFERENCES matches (match_id),
+            FOREIGN KEY (player_id) REFERENCES players (player_id)
+        ) WITHOUT ROWID
+    ''')
+    
+    # Create data_versions table (bumped on every write, used for ETags)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    for name, tables in DATA_VERSION_TABLES.items():
+        cursor.execute('INSERT OR IGNORE INTO data_versions (name) VALUES (?)', (name,))
+        for table in tables:
+            for operation in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_{operation.lower()}_version
+                    AFTER {operation} ON {table}
+                    BEGIN
+                        UPDATE data_versions SET version = version + 1 WHERE name = '{name}';
+                    END
+                ''')
     
     conn.commit()
+    
+    # Databases from before rollups existed get theirs built once
+    rollups_empty = cursor.execute('SELECT 1 FROM verification_rollups LIMIT 1').fetchone() is None
+    logs_exist = cursor.execute('SELECT 1 FROM verification_logs LIMIT 1').fetchone() is not None
     conn.close()
+    
+    if rollups_empty and logs_exist:
+        VerificationRollup.rebuild()
+    
     print("Database initialized successfully!")
 
+# (key, column) pairs rendered by the *_json queries, in response order
+PLAYER_FIELDS = tuple((name, name) for name in
+                      ('player_id', 'name', 'student_id', 'registered_at'))
+LOG_FIELDS = tuple((name, f'vl.{name}') for name in
+                   ('log_id', 'player_id', 'timestamp', 'verification_status',
+                    'confidence_score', 'image_path', 'device_matched'))
+
 class Player:
     """Player model"""
     
     @staticmethod
     def create(player_id, name, student_id, facial_encoding, machine_guid):
-        """Create a new player"""
+        """
+        Create a new player
+        
+        facial_encoding may be a single 128-d vector or an (N, 128) array of
+        enrollment samples. Every sample is stored as a template; the players
+        table keeps their mean for backwards compatibility.
+        """
+        templates = np.atleast_2d(np.asarray(facial_encoding, dtype=np.float32))
+        
         conn = get_db_connection()
         cursor = conn.cursor()
         
         # Serialize facial encoding
-        encoding_blob = pickle.dumps(facial_encoding)
+        encoding_blob = pickle.dumps(np.mean(templates, axis=0).astype(np.float64))
         
         cursor.execute('''
             INSERT INTO players (player_id, name, student_id, facial_encoding, machine_guid)
             VALUES (?, ?, ?, ?, ?)
         ''', (player_id, name, student_id, encoding_blob, machine_guid))
         
+        cursor.executemany('''
+            INSERT INTO player_templates (player_id, encoding, source)
+            VALUES (?, ?, 'enrollment')
+        ''', [(player_id, template.tobytes()) for template in templates])
+        
         conn.commit()
         conn.close()
+        PlayerTemplate.invalidate(player_id)
+        DataVersion.invalidate()
         return True
     
+    @staticmethod
+    def create_many(players):
+        """
+        Create several players in a single transaction
+        
+        Args:
+            players: Iterable of (player_id, name, student_id, facial_encoding,
+                     machine_guid) tuples, as for create()
+            
+        Returns:
+            int: Number of players inserted
+        """
+        player_rows = []
+        template_rows = []
+        
+        for player_id, name, student_id, facial_encoding, machine_guid in players:
+            templates = np.atleast_2d(np.asarray(facial_encoding, dtype=np.float32))
+            encoding_blob = pickle.dumps(np.mean(templates, axis=0).astype(np.float64))
+            
+            player_rows.append((player_id, name, student_id, encoding_blob, machine_guid))
+            template_rows.extend((player_id, template.tobytes()) for template in templates)
+        
+        conn = get_db_connection()
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT INTO players (player_id, name, student_id, facial_encoding, machine_guid)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', player_rows)
+                conn.executemany('''
+                    INSERT INTO player_templates (player_id, encoding, source)
+                    VALUES (?, ?, 'enrollment')
+                ''', template_rows)
+        finally:
+            conn.close()
+        
+        for row in player_rows:
+            PlayerTemplate.invalidate(row[0])
+        DataVersion.invalidate()
+        return len(player_rows)
+    
+    @staticmethod
+    def get_existing_student_ids(student_ids):
+        """
+        Get which of the given student IDs are already registered
+        
+        Returns:
+            set: Registered student IDs
+        """
+        student_ids = list(student_ids)
+        existing = set()
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Stay below SQLite's bound-parameter limit
+        for start in range(0, len(student_ids), 500):
+            chunk = student_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(
+                f'SELECT student_id FROM players WHERE student_id IN ({placeholders})',
+                chunk
+            )
+            existing.update(row['student_id'] for row in cursor.fetchall())
+        
+        conn.close()
+        return existing
+    
+    @staticmethod
+    def get_existing_ids(player_ids):
+        """
+        Get which of the given player IDs are registered (e.g. a match roster)
+        
+        Returns:
+            set: Registered player IDs
+        """
+        player_ids = list(player_ids)
+        
+        conn = get_db_connection()
+        placeholders = ','.join('?' * len(player_ids))
+        rows = conn.execute(
+            f'SELECT player_id FROM players WHERE player_id IN ({placeholders})',
+            player_ids
+        ).fetchall()
+        conn.close()
+        
+        return {row['player_id'] for row in rows}
+    
     @staticmethod
     def get_by_id(player_id):
         """Get player by ID"""
@@ -117,6 +364,204 @@ class Player:
         conn.close()
         
         return [dict(row) for row in rows]
+    
+    @staticmethod
+    def get_all_json(chunk_size=1000):
+        """Get all players as JSON byte chunks (see serialization.select_json)"""
+        return select_json(get_db_connection(), PLAYER_FIELDS, 'FROM players',
+                           chunk_size=chunk_size)
+
+class PlayerTemplate:
+    """Face template gallery model"""
+    
+    # player_id -> contiguous float32 (N, 128) array, oldest-loaded first;
+    # bounded by the GALLERY_CACHE_SIZE setting (0 = every player)
+    _gallery_cache = {}
+    
+    @staticmethod
+    def trim_cache():
+        """Evict the oldest-loaded galleries beyond GALLERY_CACHE_SIZE"""
+        capacity = get_settings().GALLERY_CACHE_SIZE
+        cache = PlayerTemplate._gallery_cache
+        while capacity and len(cache) > capacity:
+            try:
+                cache.pop(next(iter(cache)), None)
+            except (StopIteration, RuntimeError):
+                break
+    
+    @staticmethod
+    def get_gallery(player_id):
+        """
+        Get all templates for a player as one float32 matrix
+        
+        Falls back to the legacy single encoding for players registered
+        before templates existed.
+        
+        Returns:
+            numpy.ndarray of shape (N, 128) or None
+        """
+        gallery = PlayerTemplate._gallery_cache.get(player_id)
+        if gallery is not None:
+            return gallery
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT encoding FROM player_templates
+            WHERE player_id = ?
+            ORDER BY template_id
+        ''', (player_id,))
+        rows = cursor.fetchall()
+        
+        if rows:
+            gallery = np.frombuffer(b''.join(row['encoding'] for row in rows), dtype=np.float32)
+            gallery = gallery.reshape(len(rows), -1)
+        else:
+            cursor.execute('SELECT facial_encoding FROM players WHERE player_id = ?', (player_id,))
+            row = cursor.fetchone()
+            if row is not None:
+                legacy = pickle.loads(row['facial_encoding'])
+                gallery = np.atleast_2d(np.asarray(legacy, dtype=np.float32))
+        conn.close()
+        
+        if gallery is not None:
+            gallery = np.ascontiguousarray(gallery)
+            gallery.setflags(write=False)
+            PlayerTemplate._gallery_cache[player_id] = gallery
+            PlayerTemplate.trim_cache()
+        
+        return gallery
+    
+    @staticmethod
+    def load_all():
+        """
+        Load every player's templates as one matrix
+        
+        Players registered before templates existed contribute their
+        legacy single encoding.
+        
+        Returns:
+            tuple: (list of player_id per row, float32 matrix of shape (N, 128))
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT player_id, encoding FROM player_templates
+            ORDER BY player_id, template_id
+        ''')
+        rows = cursor.fetchall()
+        labels = [row['player_id'] for row in rows]
+        blobs = [row['encoding'] for row in rows]
+        
+        cursor.execute('''
+            SELECT player_id, facial_encoding FROM players
+            WHERE player_id NOT IN (SELECT DISTINCT player_id FROM player_templates)
+        ''')
+        for row in cursor.fetchall():
+            legacy = np.asarray(pickle.loads(row['facial_encoding']), dtype=np.float32)
+            labels.append(row['player_id'])
+            blobs.append(legacy.tobytes())
+        
+        conn.close()
+        
+        if not blobs:
+            return [], np.empty((0, 128), dtype=np.float32)
+        
+        matrix = np.frombuffer(b''.join(blobs), dtype=np.float32).reshape(len(blobs), -1)
+        return labels, matrix
+    
+    @staticmethod
+    def preload(labels, matrix):
+        """
+        Fill the gallery cache from one load_all() result
+        
+        Each player's gallery is a read-only view into the shared matrix,
+        so a server that preloads before forking workers keeps a single
+        copy of every template in memory.
+        
+        Args:
+            labels: Player ID per row, grouped by player (as load_all returns them)
+            matrix: float32 matrix of shape (N, 128)
+        
+        Returns:
+            int: Players loaded (GALLERY_CACHE_SIZE may keep fewer)
+        """
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        matrix.setflags(write=False)
+        
+        cache = {}
+        start = 0
+        for end in range(1, len(labels) + 1):
+            if end == len(labels) or labels[end] != labels[start]:
+                cache[labels[start]] = matrix[start:end]
+                start = end
+        
+        PlayerTemplate._gallery_cache.update(cache)
+        PlayerTemplate.trim_cache()
+        return len(cache)
+    
+    @staticmethod
+    def add_verified(player_id, encoding, confidence_score):
+        """
+        Add a template from a high-confidence VERIFIED capture
+        
+        Enrollment templates are never evicted; once the player exceeds
+        the MAX_TEMPLATES_PER_PLAYER setting the oldest verified templates
+        are dropped.
+        """
+        encoding = np.asarray(encoding, dtype=np.float32)
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Seed legacy players with their original encoding first
+        cursor.execute('''
+            SELECT COUNT(*) FROM player_templates WHERE player_id = ?
+        ''', (player_id,))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute('SELECT facial_encoding FROM players WHERE player_id = ?', (player_id,))
+            row = cursor.fetchone()
+            if row is not None:
+                legacy = np.asarray(pickle.loads(row['facial_encoding']), dtype=np.float32)
+                cursor.execute('''
+                    INSERT INTO player_templates (player_id, encoding, source)
+                    VALUES (?, ?, 'enrollment')
+                ''', (player_id, legacy.tobytes()))
+        
+        cursor.execute('''
+            INSERT INTO player_templates (player_id, encoding, source, confidence_score)
+            VALUES (?, ?, 'verified', ?)
+        ''', (player_id, encoding.tobytes(), confidence_score))
+        
+        cursor.execute('''
+            SELECT COUNT(*) FROM player_templates WHERE player_id = ?
+        ''', (player_id,))
+        excess = cursor.fetchone()[0] - get_settings().MAX_TEMPLATES_PER_PLAYER
+        
+        if excess > 0:
+            cursor.execute('''
+                DELETE FROM player_templates
+                WHERE template_id IN (
+                    SELECT template_id FROM player_templates
+                    WHERE player_id = ? AND source = 'verified'
+                    ORDER BY template_id
+                    LIMIT ?
+                )
+            ''', (player_id, excess))
+        
+        conn.commit()
+        conn.close()
+        PlayerTemplate.invalidate(player_id)
+        return True
+    
+    @staticmethod
+    def invalidate(player_id=None):
+        """Drop cached gallery for one player (or all players)"""
+        if player_id is None:
+            PlayerTemplate._gallery_cache.clear()
+        else:
+            PlayerTemplate._gallery_cache.pop(player_id, None)
 
 class AdminUser:
     """Admin user model"""
@@ -156,10 +601,17 @@ class AdminUser:
         return None
     
     @staticmethod
-    def verify_password(username, password):
-        """Verify admin password"""
+    def verify_password(username, password, check=check_password_hash):
+        """
+        Verify admin password
+        
+        Args:
+            username: Admin username
+            password: Password to check
+            check: check_password_hash or a drop-in (e.g. PasswordHasher.check)
+        """
         user = AdminUser.get_by_username(username)
-        if user and check_password_hash(user['password_hash'], password):
+        if user and check(user['password_hash'], password):
             return user
         return None
     
@@ -176,12 +628,216 @@ class AdminUser:
         conn.commit()
         conn.close()
 
+class Tournament:
+    """Tournament model"""
+    
+    @staticmethod
+    def create(name):
+        """Create a new tournament"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('INSERT INTO tournaments (name) VALUES (?)', (name,))
+        conn.commit()
+        tournament_id = cursor.lastrowid
+        conn.close()
+        return tournament_id
+    
+    @staticmethod
+    def get_all():
+        """Get all tournaments with their match counts"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT t.tournament_id, t.name, t.created_at, COUNT(m.match_id) AS matches
+            FROM tournaments t
+            LEFT JOIN matches m ON m.tournament_id = t.tournament_id
+            GROUP BY t.tournament_id
+            ORDER BY t.tournament_id
+        ''')
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [dict(row) for row in rows]
+    
+    @staticmethod
+    def get(tournament_id):
+        """Get tournament by ID"""
+        conn = get_db_connection()
+        row = conn.execute('SELECT * FROM tournaments WHERE tournament_id = ?',
+                           (tournament_id,)).fetchone()
+        conn.close()
+        
+        return dict(row) if row else None
+
+class Match:
+    """Match model (a scheduled, live or finished game with a seat roster)"""
+    
+    # New status -> (status it must come from, timestamp column stamped)
+    TRANSITIONS = {
+        'live': ('scheduled', 'started_at'),
+        'finished': ('live', 'ended_at')
+    }
+    
+    @staticmethod
+    def create(tournament_id, name, roster):
+        """
+        Create a match and its roster
+        
+        Args:
+            tournament_id: Tournament the match belongs to
+            name: Display name (e.g. 'Quarter-final 1')
+            roster: dict of seat -> player_id
+        
+        Returns:
+            int: match_id, or None if a player holds two seats
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                INSERT INTO matches (tournament_id, name) VALUES (?, ?)
+            ''', (tournament_id, name))
+            match_id = cursor.lastrowid
+            cursor.executemany('''
+                INSERT INTO match_roster (match_id, seat, player_id) VALUES (?, ?, ?)
+            ''', [(match_id, seat, player_id) for seat, player_id in roster.items()])
+            conn.commit()
+            return match_id
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get(match_id):
+        """Get a match with its roster (seat, player_id, name, machine_guid)"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM matches WHERE match_id = ?', (match_id,))
+        row = cursor.fetchone()
+        
+        if row is None:
+            conn.close()
+            return None
+        
+        cursor.execute('''
+            SELECT r.seat, r.player_id, p.name, p.machine_guid
+            FROM match_roster r
+            JOIN players p ON p.player_id = r.player_id
+            WHERE r.match_id = ?
+            ORDER BY r.seat
+        ''', (match_id,))
+        match = dict(row)
+        match['roster'] = [dict(seat) for seat in cursor.fetchall()]
+        conn.close()
+        
+        return match
+    
+    @staticmethod
+    def get_by_tournament(tournament_id):
+        """Get a tournament's matches (without rosters)"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT * FROM matches WHERE tournament_id = ? ORDER BY match_id
+        ''', (tournament_id,))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [dict(row) for row in rows]
+    
+    @staticmethod
+    def get_live_ids():
+        """IDs of matches currently in progress"""
+        conn = get_db_connection()
+        rows = conn.execute("SELECT match_id FROM matches WHERE status = 'live'").fetchall()
+        conn.close()
+        
+        return [row['match_id'] for row in rows]
+    
+    @staticmethod
+    def set_status(match_id, status):
+        """
+        Move a match to 'live' or 'finished' (stamping started_at / ended_at)
+        
+        Only scheduled matches can go live and only live ones can finish,
+        so a repeated start cannot restamp started_at or revive a match.
+        
+        Returns:
+            bool: Whether the match moved, or None if it does not exist
+        """
+        previous, column = Match.TRANSITIONS[status]
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            UPDATE matches SET status = ?, {column} = CURRENT_TIMESTAMP
+            WHERE match_id = ? AND status = ?
+        ''', (status, match_id, previous))
+        conn.commit()
+        updated = cursor.rowcount > 0
+        
+        if not updated:
+            cursor.execute('SELECT 1 FROM matches WHERE match_id = ?', (match_id,))
+            if cursor.fetchone() is None:
+                updated = None
+        conn.close()
+        
+        return updated
+
+class DataVersion:
+    """
+    Change counters for conditional GETs
+    
+    Triggers bump a counter on every write to its tables, whichever
+    process makes it. Reads come from memory and are refreshed from the
+    database after invalidate() or once DATA_VERSION_CHECK_INTERVAL has
+    passed, so an unchanged resource is answered without a query.
+    """
+    
+    _versions = {}
+    _checked_at = None
+    
+    @staticmethod
+    def get(*names):
+        """
+        Current counters
+        
+        Returns:
+            tuple: One version per name
+        """
+        checked_at = DataVersion._checked_at
+        if (checked_at is None or
+                time.monotonic() - checked_at >= get_settings().DATA_VERSION_CHECK_INTERVAL):
+            DataVersion.refresh()
+        
+        versions = DataVersion._versions
+        return tuple(versions.get(name, 0) for name in names)
+    
+    @staticmethod
+    def refresh():
+        """Re-read every counter from the database"""
+        checked_at = time.monotonic()
+        conn = get_db_connection()
+        rows = conn.execute('SELECT name, version FROM data_versions').fetchall()
+        conn.close()
+        
+        DataVersion._versions = {row['name']: row['version'] for row in rows}
+        DataVersion._checked_at = checked_at
+    
+    @staticmethod
+    def invalidate():
+        """Re-read the counters on next use (after a write)"""
+        DataVersion._checked_at = None
+
 class VerificationLog:
     """Verification log model"""
     
     @staticmethod
     def create(player_id, verification_status, confidence_score, image_path, device_matched):
-        """Create a new verification log"""
+        """Create a new verification log (and count it in the rollups)"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
@@ -192,8 +848,10 @@ class VerificationLog:
         ''', (player_id, verification_status, confidence_score, image_path, device_matched))
         
         log_id = cursor.lastrowid
+        cursor.execute(_ROLLUP_UPSERT, (log_id,))
         conn.commit()
         conn.close()
+        DataVersion.invalidate()
         return log_id
     
     @staticmethod
@@ -228,6 +886,283 @@ class VerificationLog:
         conn.close()
         
         return [dict(row) for row in rows]
+    
+    @staticmethod
+    def get_by_player_json(player_id, limit=50, chunk_size=1000):
+        """Verification logs for a player as JSON byte chunks"""
+        return select_json(get_db_connection(), LOG_FIELDS, '''
+            FROM verification_logs vl
+            WHERE vl.player_id = ?
+            ORDER BY vl.timestamp DESC
+            LIMIT ?
+        ''', (player_id, limit), chunk_size)
+    
+    @staticmethod
+    def get_recent_json(limit=100, chunk_size=1000):
+        """Recent verification logs (with player_name) as JSON byte chunks"""
+        return select_json(get_db_connection(), LOG_FIELDS + (('player_name', 'p.name'),), '''
+            FROM verification_logs vl
+            JOIN players p ON vl.player_id = p.player_id
+            ORDER BY vl.timestamp DESC
+            LIMIT ?
+        ''', (limit,), chunk_size)
+    
+    @staticmethod
+    def iter_logs(start=None, end=None, player_id=None, status=None, chunk_size=1000):
+        """
+        Stream verification logs in chunks, oldest first
+        
+        Only one chunk is held in memory at a time, so this is safe for the
+        full history. The connection stays open until the generator is
+        exhausted or closed.
+        
+        Args:
+            start: Earliest timestamp (inclusive), e.g. '2024-05-01'
+            end: Latest timestamp (exclusive)
+            player_id: Only this player's logs
+            status: Only this verification_status
+            chunk_size: Rows fetched per round trip
+            
+        Yields:
+            list: Up to chunk_size sqlite3.Row objects
+        """
+        conditions = []
+        params = []
+        
+        if start:
+            conditions.append('vl.timestamp >= ?')
+            params.append(start)
+        if end:
+            conditions.append('vl.timestamp < ?')
+            params.append(end)
+        if player_id:
+            conditions.append('vl.player_id = ?')
+            params.append(player_id)
+        if status:
+            conditions.append('vl.verification_status = ?')
+            params.append(status)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT vl.*, p.name as player_name
+                FROM verification_logs vl
+                LEFT JOIN players p ON vl.player_id = p.player_id
+                {where}
+                ORDER BY vl.log_id
+            ''', params)
+            
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+class VerificationRollup:
+    """Pre-aggregated verification counts per minute, hour and day"""
+    
+    @staticmethod
+    def rebuild():
+        """
+        Recompute every rollup from verification_logs
+        
+        Only needed for databases that had logs before rollups existed;
+        VerificationLog.create keeps them current afterwards. Archived logs
+        are no longer in the table, so run this before the first retention
+        pass, not after.
+        """
+        conn = get_db_connection()
+        with conn:
+            conn.execute('DELETE FROM verification_rollups')
+            for name, (_, fmt) in ROLLUP_GRANULARITIES.items():
+                conn.execute('''
+                    INSERT INTO verification_rollups
+                    (granularity, bucket_start, verified, failed, confidence_sum,
+                     confidence_count, device_mismatches)
+                    SELECT ?, strftime(?, timestamp),
+                           SUM(verification_status = 'VERIFIED'),
+                           SUM(verification_status != 'VERIFIED'),
+                           COALESCE(SUM(confidence_score), 0),
+                           COUNT(confidence_score),
+                           SUM(NOT device_matched)
+                    FROM verification_logs
+                    GROUP BY strftime(?, timestamp)
+                ''', (name, fmt, fmt))
+        conn.close()
+    
+    @staticmethod
+    def minute_horizon(now=None):
+        """Start of the oldest minute bucket retention keeps"""
+        return (now or datetime.utcnow()) - timedelta(days=MINUTE_ROLLUP_DAYS)
+    
+    @staticmethod
+    def align(start, end, now=None):
+        """
+        Round range edges past the minute horizon down to whole hours
+        
+        Minute buckets older than MINUTE_ROLLUP_DAYS are pruned, so a
+        partial hour there can no longer be counted exactly.
+        
+        Returns:
+            tuple: (start, end, whether an edge was rounded)
+        """
+        horizon = VerificationRollup.minute_horizon(now)
+        aligned_start, aligned_end = start, end
+        if start < horizon:
+            aligned_start = VerificationRollup._floor(start, 'hour')
+        if end < horizon + timedelta(hours=1):
+            aligned_end = VerificationRollup._floor(end, 'hour')
+        return aligned_start, aligned_end, (aligned_start, aligned_end) != (start, end)
+    
+    @staticmethod
+    def choose_granularity(start, end, max_points=500, now=None):
+        """
+        Pick the finest granularity that covers [start, end) in at most max_points buckets
+        
+        Minute buckets are only chosen while start is within the minute horizon.
+        
+        Args:
+            start, end: datetime range
+            max_points: Upper bound on returned buckets
+            
+        Returns:
+            str: Granularity name
+        """
+        span = end - start
+        for name, (length, _) in ROLLUP_GRANULARITIES.items():
+            if name == 'minute' and start < VerificationRollup.minute_horizon(now):
+                continue
+            if span / length <= max_points:
+                return name
+        return 'day'
+    
+    @staticmethod
+    def _row_to_dict(row):
+        """Add derived rates to a rollup row"""
+        total = row['verified'] + row['failed']
+        result = dict(row)
+        result['total'] = total
+        result['pass_rate'] = row['verified'] / total if total else None
+        result['avg_confidence'] = (row['confidence_sum'] / row['confidence_count']
+                                    if row['confidence_count'] else None)
+        del result['confidence_sum'], result['confidence_count']
+        return result
+    
+    @staticmethod
+    def get_series(start, end, granularity=None, max_points=500):
+        """
+        Get verification counts per bucket
+        
+        Args:
+            start, end: datetime range (UTC, like the log timestamps)
+            granularity: 'minute', 'hour' or 'day' (default: chosen from the range;
+                         'minute' becomes 'hour' past the minute horizon)
+            max_points: Used when choosing the granularity
+            
+        Returns:
+            tuple: (granularity, list of bucket dicts with verified, failed,
+                   total, pass_rate, avg_confidence, device_mismatches)
+        """
+        if granularity == 'minute' and start < VerificationRollup.minute_horizon():
+            granularity = 'hour'
+        granularity = granularity or VerificationRollup.choose_granularity(start, end, max_points)
+        _, fmt = ROLLUP_GRANULARITIES[granularity]
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT bucket_start, verified, failed, confidence_sum, confidence_count, device_mismatches
+            FROM verification_rollups
+            WHERE granularity = ? AND bucket_start >= ? AND bucket_start < ?
+            ORDER BY bucket_start
+        ''', (granularity, start.strftime(fmt), end.strftime('%Y-%m-%d %H:%M:%S')))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return granularity, [VerificationRollup._row_to_dict(row) for row in rows]
+    
+    @staticmethod
+    def _floor(moment, granularity):
+        """Start of the bucket containing moment"""
+        _, fmt = ROLLUP_GRANULARITIES[granularity]
+        return datetime.strptime(moment.strftime(fmt), '%Y-%m-%d %H:%M:%S')
+    
+    @staticmethod
+    def _segments(start, end, levels=('day', 'hour', 'minute')):
+        """
+        Cover [start, end) with as few buckets as possible
+        
+        Whole days are read from day buckets, the partial days at either
+        end from hour buckets and the remaining edges from minute buckets.
+        Align edges past the minute horizon first (see align), or their
+        partial hours read pruned minute buckets.
+        
+        Returns:
+            list: (granularity, segment start, segment end)
+        """
+        granularity, finer = levels[0], levels[1:]
+        
+        if not finer:
+            return [(granularity, start, end)] if start < end else []
+        
+        length, _ = ROLLUP_GRANULARITIES[granularity]
+        first = VerificationRollup._floor(start, granularity)
+        if first < start:
+            first += length
+        last = VerificationRollup._floor(end, granularity)
+        
+        if first >= last:
+            return VerificationRollup._segments(start, end, finer)
+        
+        return (VerificationRollup._segments(start, first, finer) +
+                [(granularity, first, last)] +
+                VerificationRollup._segments(last, end, finer))
+    
+    @staticmethod
+    def get_totals(start, end):
+        """
+        Get verification totals for [start, end)
+        
+        Sums whole days from day buckets and only the edges from finer
+        ones, so a season-long total reads a few hundred rows. Edges past
+        the minute horizon are rounded down to the hour (see align).
+        
+        Returns:
+            dict: verified, failed, total, pass_rate, avg_confidence, device_mismatches
+        """
+        start, end, _ = VerificationRollup.align(start, end)
+        segments = VerificationRollup._segments(start, end)
+        if not segments:
+            segments = [('minute', start, start)]
+        
+        conditions = ' OR '.join(
+            '(granularity = ? AND bucket_start >= ? AND bucket_start < ?)' for _ in segments
+        )
+        params = []
+        for granularity, low, high in segments:
+            params.extend((granularity, low.strftime('%Y-%m-%d %H:%M:%S'),
+                           high.strftime('%Y-%m-%d %H:%M:%S')))
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT COALESCE(SUM(verified), 0) AS verified,
+                   COALESCE(SUM(failed), 0) AS failed,
+                   COALESCE(SUM(confidence_sum), 0) AS confidence_sum,
+                   COALESCE(SUM(confidence_count), 0) AS confidence_count,
+                   COALESCE(SUM(device_mismatches), 0) AS device_mismatches
+            FROM verification_rollups
+            WHERE {conditions}
+        ''', params)
+        row = cursor.fetchone()
+        conn.close()
+        
+        return VerificationRollup._row_to_dict(row)
 
 if __name__ == '__main__':
     init_db()
\ No newline at end of file
@@ -0,0 +1,274 @@
+"""
+Log Retention - archives expired verification logs, prunes images and compacts the database
+"""
+import glob
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import models
+
+# Days each verification_status is kept in the live database
+DEFAULT_POLICIES = {
+    'FAILED': 365,  # Evidence for appeals
+    'VERIFIED': 7
+}
+
+ARCHIVE_COLUMNS = (
+    'log_id', 'player_id', 'timestamp', 'verification_status',
+    'confidence_score', 'image_path', 'device_matched'
+)
+
+def _connect(busy_timeout_ms=5000):
+    """Live database connection that waits for, rather than fails on, verify writes"""
+    conn = models.get_db_connection()
+    conn.execute(f'PRAGMA busy_timeout = {int(busy_timeout_ms)}')
+    return conn
+
+def _archive_path(archive_dir, month):
+    """Archive database for one month ('YYYY-MM')"""
+    return os.path.join(archive_dir, f'verification_logs_{month}.db')
+
+def _open_archive(archive_dir, month):
+    """Open (creating if needed) the archive database for a month"""
+    path = _archive_path(archive_dir, month)
+
+    # Late rows (e.g. after a policy was lengthened) reopen a closed month;
+    # compress_closed_archives packs it again on the next pass
+    if os.path.exists(path + '.gz'):
+        with gzip.open(path + '.gz', 'rb') as source, open(path, 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.remove(path + '.gz')
+
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS verification_logs (
+            log_id INTEGER PRIMARY KEY,
+            player_id TEXT NOT NULL,
+            timestamp TIMESTAMP,
+            verification_status TEXT NOT NULL,
+            confidence_score REAL,
+            image_path TEXT NOT NULL,
+            device_matched BOOLEAN NOT NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    return conn
+
+def _prune_images(image_paths):
+    """Delete image files; returns how many were removed"""
+    removed = 0
+    for path in image_paths:
+        if not path or path == 'no_image.jpg':
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+def archive_expired(archive_dir, policies=None, batch_size=500, pause=0.05,
+                    now=None, max_batches=None, should_stop=None, sleep=time.sleep):
+    """
+    Move expired verification logs into per-month archive databases
+
+    Each batch is copied to its archive and committed there before it is
+    deleted from the live database in a short transaction, so a crash can
+    at worst leave a row in both places (the archive insert is idempotent).
+    The pause between batches lets queued /api/verify writes through.
+
+    Args:
+        archive_dir: Directory for verification_logs_YYYY-MM.db files
+        policies: verification_status -> days to keep (default: DEFAULT_POLICIES)
+        batch_size: Rows moved per transaction
+        pause: Seconds to sleep between batches
+        now: Reference time (default: now, UTC like CURRENT_TIMESTAMP)
+        max_batches: Stop after this many batches (None = until done)
+        should_stop: Callable checked between batches; stops early when True
+        sleep: Sleep function (pass socketio.sleep inside the server)
+
+    Returns:
+        dict: rows archived and images removed per status
+    """
+    policies = policies or DEFAULT_POLICIES
+    now = now or datetime.utcnow()
+    os.makedirs(archive_dir, exist_ok=True)
+
+    stats = {}
+    batches = 0
+    conn = _connect()
+
+    try:
+        for status, days in policies.items():
+            cutoff = (now - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+            status_stats = stats.setdefault(status, {'archived': 0, 'images_removed': 0})
+
+            while max_batches is None or batches < max_batches:
+                if should_stop and should_stop():
+                    return stats
+
+                rows = conn.execute(f'''
+                    SELECT {', '.join(ARCHIVE_COLUMNS)} FROM verification_logs
+                    WHERE verification_status = ? AND timestamp < ?
+                    ORDER BY log_id
+                    LIMIT ?
+                ''', (status, cutoff, batch_size)).fetchall()
+
+                if not rows:
+                    break
+
+                by_month = {}
+                for row in rows:
+                    by_month.setdefault(row['timestamp'][:7], []).append(tuple(row))
+
+                for month, month_rows in by_month.items():
+                    archive = _open_archive(archive_dir, month)
+                    with archive:
+                        archive.executemany(f'''
+                            INSERT OR IGNORE INTO verification_logs ({', '.join(ARCHIVE_COLUMNS)})
+                            VALUES ({', '.join('?' * len(ARCHIVE_COLUMNS))})
+                        ''', month_rows)
+                    archive.close()
+
+                log_ids = [row['log_id'] for row in rows]
+                with conn:
+                    conn.execute(f'''
+                        DELETE FROM verification_logs
+                        WHERE log_id IN ({','.join('?' * len(log_ids))})
+                    ''', log_ids)
+
+                status_stats['archived'] += len(rows)
+                status_stats['images_removed'] += _prune_images(row['image_path'] for row in rows)
+                batches += 1
+
+                if pause:
+                    sleep(pause)
+    finally:
+        conn.close()
+
+    return stats
+
+def compress_closed_archives(archive_dir, policies=None, now=None):
+    """
+    Gzip month archives that can no longer receive rows
+
+    A month is closed once even the longest retention period has passed
+    its end.
+
+    Returns:
+        list: Paths of the compressed archives
+    """
+    policies = policies or DEFAULT_POLICIES
+    now = now or datetime.utcnow()
+    oldest_open = (now - timedelta(days=max(policies.values()))).strftime('%Y-%m')
+
+    compressed = []
+    for path in sorted(glob.glob(os.path.join(archive_dir, 'verification_logs_*.db'))):
+        month = os.path.basename(path)[len('verification_logs_'):-len('.db')]
+        if month >= oldest_open:
+            continue
+
+        with open(path, 'rb') as source, gzip.open(path + '.gz', 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.remove(path)
+        compressed.append(path + '.gz')
+
+    return compressed
+
+def prune_minute_rollups(keep_days=models.MINUTE_ROLLUP_DAYS, now=None):
+    """
+    Drop per-minute rollups older than keep_days
+
+    Rollup reads round ranges past models.MINUTE_ROLLUP_DAYS to whole
+    hours, so keep at least that many days.
+
+    Hour and day rollups are kept for good; they are what season-long
+    charts read.
+
+    Returns:
+        int: Buckets deleted
+    """
+    now = now or datetime.utcnow()
+    cutoff = (now - timedelta(days=keep_days)).strftime('%Y-%m-%d %H:%M:%S')
+
+    conn = _connect()
+    try:
+        with conn:
+            cursor = conn.execute('''
+                DELETE FROM verification_rollups
+                WHERE granularity = 'minute' AND bucket_start < ?
+            ''', (cutoff,))
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+def vacuum(pages=1000, allow_full=True):
+    """
+    Return free pages to the filesystem
+
+    Uses incremental vacuum when the database has auto_vacuum=INCREMENTAL,
+    so each call only holds the write lock for a bounded number of pages.
+    Otherwise the database is switched to incremental mode, which needs
+    one full VACUUM (run this during an idle window).
+
+    Args:
+        pages: Free pages released per call (incremental mode)
+        allow_full: Run the full VACUUM if needed; without it, a database
+                    not yet in incremental mode is left alone ('skipped')
+
+    Returns:
+        dict: mode used and free pages before / after
+    """
+    conn = _connect()
+    try:
+        free_before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+            conn.execute(f'PRAGMA incremental_vacuum({int(pages)})').fetchall()
+            mode = 'incremental'
+        elif not allow_full:
+            mode = 'skipped'
+        else:
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+            mode = 'full'
+
+        free_after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    finally:
+        conn.close()
+
+    return {'mode': mode, 'free_pages_before': free_before, 'free_pages_after': free_after}
+
+def run_maintenance(archive_dir, policies=None, batch_size=500, pause=0.05,
+                    vacuum_pages=1000, should_stop=None, sleep=time.sleep):
+    """
+    One retention pass: archive, compress closed months, prune minute rollups, then vacuum
+
+    Only incremental vacuums run here. The one-off full VACUUM that
+    switches a database to incremental mode rewrites the whole file in a
+    single blocking call, which would stall every green thread under
+    eventlet; scripts/run_retention.py does it instead.
+
+    Args:
+        should_stop: Callable; the pass stops early (and skips vacuuming)
+                     as soon as it returns True, e.g. when players connect
+
+    Returns:
+        dict: archive, compressed and vacuum results
+    """
+    result = {
+        'archived': archive_expired(archive_dir, policies, batch_size=batch_size,
+                                    pause=pause, should_stop=should_stop, sleep=sleep),
+        'compressed': compress_closed_archives(archive_dir, policies),
+        'minute_rollups_pruned': prune_minute_rollups(),
+        'vacuum': None
+    }
+
+    if not (should_stop and should_stop()):
+        result['vacuum'] = vacuum(vacuum_pages, allow_full=False)
+
+    return result
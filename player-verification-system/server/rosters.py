@@ -0,0 +1,147 @@
+"""
+Match Rosters - live matches' players pinned in memory for verification
+"""
+import threading
+
+class MatchRosters:
+    """
+    Players of every live match, with their galleries and machine GUIDs
+
+    A match is pinned when it starts: each rostered player's name, seat,
+    machine GUID and face gallery are loaded once, so verifying an
+    in-match player reads nothing from the database. The machine GUIDs of
+    a match are indexed too, which shows when a player sits at a machine
+    registered to another seat of the same match.
+
+    Lookups take no lock. Writers build new dicts and swap them in, so a
+    reader always sees one consistent generation.
+    """
+
+    def __init__(self, roster_loader, gallery_loader):
+        """
+        Args:
+            roster_loader: match_id -> match dict with 'tournament_id' and
+                           'roster' (seat, player_id, name, machine_guid rows),
+                           or None (e.g. Match.get)
+            gallery_loader: player_id -> (N, 128) gallery (e.g. PlayerTemplate.get_gallery)
+        """
+        self.roster_loader = roster_loader
+        self.gallery_loader = gallery_loader
+
+        self._players = {}   # player_id -> pinned seat entry
+        self._matches = {}   # match_id -> {'tournament_id', 'seats', 'devices'}
+        self._lock = threading.Lock()
+
+    def pin(self, match_id):
+        """
+        Load a match's roster into memory
+
+        Returns:
+            int: Seats pinned (0 if the match does not exist)
+        """
+        match = self.roster_loader(match_id)
+        if match is None:
+            return 0
+
+        seats = {}
+        for row in match['roster']:
+            gallery = self.gallery_loader(row['player_id'])
+            if gallery is None:
+                continue
+            seats[row['seat']] = {
+                'match_id': match_id,
+                'tournament_id': match['tournament_id'],
+                'seat': row['seat'],
+                'player_id': row['player_id'],
+                'name': row['name'],
+                'machine_guid': row['machine_guid'],
+                'gallery': gallery
+            }
+
+        pinned = {
+            'tournament_id': match['tournament_id'],
+            'seats': seats,
+            'devices': {entry['machine_guid']: entry for entry in seats.values()}
+        }
+
+        with self._lock:
+            matches = dict(self._matches)
+            matches.pop(match_id, None)
+            matches[match_id] = pinned
+            self._swap(matches)
+
+        return len(seats)
+
+    def unpin(self, match_id):
+        """Drop a finished match from memory"""
+        with self._lock:
+            if match_id in self._matches:
+                matches = dict(self._matches)
+                del matches[match_id]
+                self._swap(matches)
+
+    def _swap(self, matches):
+        """Install a new generation (caller holds the lock)"""
+        players = {}
+        for match in matches.values():
+            for entry in match['seats'].values():
+                players[entry['player_id']] = entry
+
+        self._matches = matches
+        self._players = players
+
+    def get(self, player_id):
+        """Pinned seat entry for a player in a live match, or None"""
+        return self._players.get(player_id)
+
+    def seat_conflict(self, entry, machine_guid):
+        """
+        Seat of the same match that machine_guid is registered to
+
+        Args:
+            entry: The verifying player's pinned entry
+            machine_guid: Machine GUID the player is verifying from
+
+        Returns:
+            dict: The other seat's entry, or None
+        """
+        match = self._matches.get(entry['match_id'])
+        other = match['devices'].get(machine_guid) if match else None
+        if other is None or other['player_id'] == entry['player_id']:
+            return None
+        return other
+
+    def refresh(self, player_id):
+        """Reload a pinned player's gallery (after a template update)"""
+        entry = self._players.get(player_id)
+        if entry is None:
+            return
+
+        gallery = self.gallery_loader(player_id)
+        if gallery is None:
+            return
+
+        with self._lock:
+            matches = dict(self._matches)
+            match = matches.get(entry['match_id'])
+            if match is None or entry['seat'] not in match['seats']:
+                return
+
+            updated = dict(entry, gallery=gallery)
+            seats = dict(match['seats'], **{entry['seat']: updated})
+            matches[entry['match_id']] = dict(
+                match,
+                seats=seats,
+                devices={seat['machine_guid']: seat for seat in seats.values()}
+            )
+            self._swap(matches)
+
+    def summary(self):
+        """Live matches and their pinned seats"""
+        return {
+            str(match_id): {
+                'tournament_id': match['tournament_id'],
+                'seats': {seat: entry['player_id'] for seat, entry in sorted(match['seats'].items())}
+            }
+            for match_id, match in self._matches.items()
+        }
@@ -0,0 +1,79 @@
+"""
+JSON Serialization - query results straight from the SQLite cursor to JSON bytes
+"""
+import json
+import sqlite3
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = json.JSONEncoder(separators=(',', ':'))
+
+def _probe_sqlite_json():
+    """True if this SQLite build has the JSON functions"""
+    try:
+        sqlite3.connect(':memory:').execute("SELECT json_object('a', 1)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+# Render rows inside SQLite with json_object() when available
+SQLITE_JSON = _probe_sqlite_json()
+
+def dumps(value):
+    """
+    Encode a value as compact JSON
+
+    Uses orjson when it is installed.
+
+    Returns:
+        bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return _encoder.encode(value).encode('utf-8')
+
+def select_json(conn, fields, from_sql, params=(), chunk_size=1000):
+    """
+    Run a query and render its rows as one JSON array of objects
+
+    With SQLite's JSON functions every row leaves the cursor as finished
+    JSON text (REAL values with 15 significant digits), so no dict or
+    Python object is built per row; otherwise rows are fetched as tuples
+    and encoded a chunk at a time.
+
+    Args:
+        conn: Open connection; closed when the generator finishes
+        fields: Sequence of (key, SQL expression) pairs, in output order
+        from_sql: Everything after the select list (FROM, WHERE, ORDER BY, LIMIT)
+        params: Query parameters
+        chunk_size: Rows fetched per round trip (one yielded chunk each)
+
+    Yields:
+        bytes: '[' + rows, then ',' + rows per further chunk, then ']'
+    """
+    try:
+        if SQLITE_JSON:
+            pairs = ', '.join(f"'{key}', {expression}" for key, expression in fields)
+            cursor = conn.execute(f'SELECT json_object({pairs}) {from_sql}', params)
+            render = lambda rows: ','.join([row[0] for row in rows]).encode('utf-8')
+        else:
+            keys = [key for key, _ in fields]
+            cursor = conn.execute(
+                f"SELECT {', '.join(expression for _, expression in fields)} {from_sql}", params
+            )
+            render = lambda rows: dumps([dict(zip(keys, row)) for row in rows])[1:-1]
+
+        separator = b'['
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield separator + render(rows)
+            separator = b','
+
+        yield b']' if separator == b',' else b'[]'
+    finally:
+        conn.close()
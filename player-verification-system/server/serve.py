@@ -0,0 +1,340 @@
+"""
+Production Server - pre-fork launcher for the Player Verification System
+
+Usage:
+    python serve.py --env production --workers 4
+
+The master process imports the app, preloads every face template into one
+shared matrix and binds the listening socket, then forks the workers. The
+gallery pages are inherited copy-on-write, so N workers hold one copy of
+the templates instead of N.
+
+Signals (master):
+    SIGTERM / SIGINT - drain every worker and exit
+    SIGHUP           - reload hot-swappable settings and the gallery, start
+                       a new generation of workers, then drain the old one
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from config import ConfigError, load_config
+
+ASYNC_MODES = ('eventlet', 'threading')
+
+def parse_args():
+    """Command-line options (defaults come from config.py)"""
+    parser = argparse.ArgumentParser(
+        description='Run the verification server with pre-forked workers'
+    )
+
+    parser.add_argument('--env', default=os.environ.get('PVS_ENV', 'production'),
+                        help='Configuration name from config.py (default: production)')
+    parser.add_argument('--workers', type=int,
+                        help='Worker processes (default: SERVER_WORKERS from config)')
+    parser.add_argument('--async-mode', choices=ASYNC_MODES,
+                        help='Socket.IO async mode (default: SOCKETIO_ASYNC_MODE from config)')
+    parser.add_argument('--host', help='Bind address (default: HOST from config)')
+    parser.add_argument('--port', type=int, help='Bind port (default: PORT from config)')
+    parser.add_argument('--graceful-timeout', type=float,
+                        help='Seconds a worker may spend draining requests '
+                             '(default: GRACEFUL_TIMEOUT from config)')
+
+    return parser.parse_args()
+
+class InFlightCounter:
+    """WSGI middleware counting requests that have not finished yet"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def _done(self):
+        with self._lock:
+            self.active -= 1
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.active += 1
+        try:
+            response = self.wsgi_app(environ, start_response)
+        except BaseException:
+            self._done()
+            raise
+        return _ClosingIterator(response, self._done)
+
+class _ClosingIterator:
+    """Response iterable that reports when the server closes it"""
+
+    def __init__(self, response, on_close):
+        self._response = response
+        self._on_close = on_close
+
+    def __iter__(self):
+        return iter(self._response)
+
+    def close(self):
+        try:
+            if hasattr(self._response, 'close'):
+                self._response.close()
+        finally:
+            self._on_close()
+
+def bind_listener(host, port, backlog=2048):
+    """Open the listening socket shared by every worker"""
+    listener = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(backlog)
+    listener.set_inheritable(True)
+    return listener
+
+def preload(server):
+    """
+    Load shared read-only state in the master, before forking
+
+    Args:
+        server: The imported app module
+
+    Returns:
+        int: Template rows loaded
+    """
+    server.init_db()
+
+    # Drop galleries from a previous generation before reloading
+    server.PlayerTemplate.invalidate()
+    labels, matrix = server.PlayerTemplate.load_all()
+    server.PlayerTemplate.preload(labels, matrix)
+    server.anomaly_detector.index.load(labels, matrix)
+
+    # Keep the garbage collector from writing to inherited objects, which
+    # would copy their pages into every worker
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+
+    return len(labels)
+
+def start_server(async_mode, listener, wsgi_app, host, port):
+    """
+    Serve wsgi_app on the inherited listener
+
+    Returns:
+        callable: Stops accepting new connections
+    """
+    if async_mode == 'eventlet':
+        import eventlet
+        import eventlet.wsgi
+
+        thread = eventlet.spawn(eventlet.wsgi.server, listener, wsgi_app, log_output=False)
+        return thread.kill
+
+    from werkzeug.serving import make_server
+
+    server = make_server(host, port, wsgi_app, threaded=True, fd=listener.fileno())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.shutdown
+
+def run_worker(server, index, listener, args):
+    """
+    Worker process body: serve until SIGTERM, then drain
+
+    Returns:
+        int: Exit code
+    """
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    # Only one worker runs retention; all of them sweep their own sessions
+    server.start_background_tasks(retention=index == 0 and server.settings.RETENTION_ENABLED)
+
+    counter = InFlightCounter(server.app)
+    stop_accepting = start_server(args.async_mode, listener, counter, args.host, args.port)
+    print(f"Worker {index} (pid {os.getpid()}) serving")
+
+    while not stop.wait(0.5):
+        pass
+
+    stop_accepting()
+    deadline = time.monotonic() + args.graceful_timeout
+    while counter.active > 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    if counter.active:
+        print(f"Worker {index} (pid {os.getpid()}) exiting with {counter.active} open connections")
+    server.state_backend.close()
+    return 0
+
+class Master:
+    """Forks, supervises and reloads worker processes"""
+
+    def __init__(self, server, listener, args):
+        self.server = server
+        self.listener = listener
+        self.args = args
+        self.workers = {}     # pid -> worker index (current generation)
+        self.retiring = {}    # pid -> drain deadline (previous generations)
+        self.stopping = False
+        self.reload_requested = False
+
+    def spawn(self, index):
+        """Fork one worker"""
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = run_worker(self.server, index, self.listener, self.args)
+            except Exception as e:
+                print(f"Worker {index} failed: {e}")
+            finally:
+                sys.stdout.flush()
+                os._exit(code)
+
+        self.workers[pid] = index
+        return pid
+
+    def retire(self, pids):
+        """Ask workers to drain and exit"""
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        for pid in pids:
+            self.workers.pop(pid, None)
+            self.retiring[pid] = deadline
+            self._signal(pid, signal.SIGTERM)
+
+    def _signal(self, pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def reap(self):
+        """Collect exited workers; respawn current ones that died"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            self.retiring.pop(pid, None)
+            index = self.workers.pop(pid, None)
+            if index is not None and not self.stopping:
+                print(f"Worker {index} (pid {pid}) exited with status {status}; restarting")
+                self.spawn(index)
+
+    def kill_overdue(self):
+        """SIGKILL retiring workers that outlived the grace period"""
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now > deadline:
+                self._signal(pid, signal.SIGKILL)
+
+    def reload(self):
+        """Reload shared state, start fresh workers, drain the old ones"""
+        self.reload_requested = False
+        old = list(self.workers)
+
+        self.server.reload_config()
+        count = preload(self.server)
+        print(f"Reloaded {count} templates; starting a new worker generation")
+        for index in range(self.args.workers):
+            self.spawn(index)
+        self.retire(old)
+
+    def run(self):
+        """Supervise workers until SIGTERM/SIGINT"""
+        def request_stop(signum, frame):
+            self.stopping = True
+
+        def request_reload(signum, frame):
+            self.reload_requested = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGHUP, request_reload)
+
+        for index in range(self.args.workers):
+            self.spawn(index)
+
+        while not self.stopping:
+            time.sleep(0.5)
+            self.reap()
+            self.kill_overdue()
+            if self.reload_requested:
+                self.reload()
+
+        print("Draining workers...")
+        self.retire(list(self.workers))
+        while self.retiring:
+            time.sleep(0.1)
+            self.reap()
+            self.kill_overdue()
+
+        self.listener.close()
+
+def main():
+    args = parse_args()
+    os.environ['PVS_ENV'] = args.env
+    try:
+        config = load_config(args.env)
+    except ConfigError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    args.workers = args.workers or config.SERVER_WORKERS
+    args.async_mode = args.async_mode or config.SOCKETIO_ASYNC_MODE
+    if args.async_mode not in ASYNC_MODES:
+        # app.py's development server can run gevent; this launcher cannot
+        print(f"✗ serve.py does not support SOCKETIO_ASYNC_MODE={args.async_mode} "
+              f"(expected one of {', '.join(ASYNC_MODES)})")
+        sys.exit(1)
+    args.host = args.host or config.HOST
+    args.port = args.port or config.PORT
+    if args.graceful_timeout is None:
+        args.graceful_timeout = config.GRACEFUL_TIMEOUT
+
+    if args.workers > 1 and not hasattr(os, 'fork'):
+        print("✗ This platform cannot fork; running a single worker")
+        args.workers = 1
+
+    # Command-line choices override config.py when app.py loads its settings
+    os.environ['PVS_SERVER_WORKERS'] = str(args.workers)
+    os.environ['PVS_SOCKETIO_ASYNC_MODE'] = args.async_mode
+    if args.workers > 1 and config.STATE_BACKEND == 'memory':
+        # Workers share broadcasts, sessions and cache invalidations
+        os.environ['PVS_STATE_BACKEND'] = 'sqlite'
+
+    if args.async_mode == 'eventlet':
+        import eventlet
+        eventlet.monkey_patch()
+
+    import app as server
+
+    listener = bind_listener(args.host, args.port)
+    count = preload(server)
+
+    print("=" * 60)
+    print("Player Verification System - Production Server")
+    print("=" * 60)
+    print(f"Listening on {args.host}:{args.port}")
+    print(f"Workers: {args.workers} ({args.async_mode}), state backend: {server.settings.STATE_BACKEND}")
+    print(f"Preloaded {count} templates")
+    print("=" * 60)
+
+    if args.workers == 1:
+        sys.exit(run_worker(server, 0, listener, args))
+
+    Master(server, listener, args).run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""
+Active Session Registry - heartbeats, expiry and live counts
+"""
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime
+
+class SessionRegistry:
+    """
+    Active verification sessions keyed by player
+
+    Every heartbeat pushes the session's new deadline onto a min-heap;
+    sweep() pops only deadlines that have passed and drops entries made
+    stale by a later heartbeat, so expiry costs O(log n) per heartbeat and
+    nothing per idle session. Counts (overall and per tournament) are
+    kept alongside, so reading them is O(1).
+    """
+
+    def __init__(self, ttl=150.0, clock=time.monotonic):
+        """
+        Args:
+            ttl: Seconds without a heartbeat before a session expires
+            clock: Time source (monotonic seconds)
+        """
+        self.ttl = ttl
+        self.clock = clock
+
+        self._sessions = {}       # player_id -> session dict
+        self._deadlines = {}      # player_id -> monotonic expiry time
+        self._by_tournament = {}  # tournament_id -> set of player_ids
+        self._heap = []           # (deadline, sequence, player_id)
+        self._sequence = itertools.count()
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """
+        Call callback(event, session) on 'started', 'ended' and 'expired'
+
+        Callbacks run outside the registry lock, in the thread that caused
+        the change.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, events):
+        for event, session in events:
+            for callback in self._listeners:
+                callback(event, session)
+
+    @staticmethod
+    def _tournament_key(tournament_id):
+        """Tournament IDs arrive as ints (rosters) and strings (clients, query args)"""
+        return None if tournament_id is None else str(tournament_id)
+
+    def _push_deadline(self, player_id, now):
+        deadline = now + self.ttl
+        self._deadlines[player_id] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._sequence), player_id))
+
+    def _remove(self, player_id):
+        """Drop a session and its index entries (lock held)"""
+        session = self._sessions.pop(player_id)
+        del self._deadlines[player_id]
+
+        members = self._by_tournament.get(session['tournament_id'])
+        if members is not None:
+            members.discard(player_id)
+            if not members:
+                del self._by_tournament[session['tournament_id']]
+        return session
+
+    def start(self, player_id, tournament_id=None, sid=None):
+        """
+        Start (or restart) a player's session
+
+        Args:
+            player_id: Player ID
+            tournament_id: Optional tournament the session belongs to
+            sid: Socket.IO session ID, if started over a socket
+
+        Returns:
+            dict: The session
+        """
+        tournament_id = self._tournament_key(tournament_id)
+        events = []
+        with self._lock:
+            if player_id in self._sessions:
+                events.append(('ended', self._remove(player_id)))
+
+            session = {
+                'player_id': player_id,
+                'tournament_id': tournament_id,
+                'sid': sid,
+                'start_time': datetime.now().isoformat(),
+                'last_seen': datetime.now().isoformat(),
+                'status': 'ACTIVE'
+            }
+            self._sessions[player_id] = session
+            self._by_tournament.setdefault(tournament_id, set()).add(player_id)
+            self._push_deadline(player_id, self.clock())
+            events.append(('started', dict(session)))
+
+        self._notify(events)
+        return session
+
+    def heartbeat(self, player_id, tournament_id=None, start=True):
+        """
+        Extend a session's deadline
+
+        Args:
+            player_id: Player ID
+            tournament_id: Used when the heartbeat starts a new session
+            start: Start a session if the player has none
+
+        Returns:
+            bool: True if the player now has an active session
+        """
+        with self._lock:
+            session = self._sessions.get(player_id)
+            if session is not None:
+                session['last_seen'] = datetime.now().isoformat()
+                self._push_deadline(player_id, self.clock())
+                return True
+
+        if start:
+            self.start(player_id, tournament_id)
+            return True
+        return False
+
+    def end(self, player_id):
+        """
+        End a player's session
+
+        Returns:
+            dict: The ended session, or None if there was none
+        """
+        with self._lock:
+            if player_id not in self._sessions:
+                return None
+            session = self._remove(player_id)
+
+        self._notify([('ended', session)])
+        return session
+
+    def players_for_sid(self, sid):
+        """Players whose session was started over a Socket.IO connection"""
+        with self._lock:
+            return [player_id for player_id, session in self._sessions.items()
+                    if session['sid'] == sid]
+
+    def sweep(self):
+        """
+        Expire sessions whose deadline has passed
+
+        Returns:
+            list: Expired sessions
+        """
+        now = self.clock()
+        expired = []
+
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                deadline, _, player_id = heapq.heappop(heap)
+
+                # Stale entry: the session ended or a later heartbeat moved its deadline
+                if self._deadlines.get(player_id) != deadline:
+                    continue
+
+                session = self._remove(player_id)
+                session['status'] = 'EXPIRED'
+                expired.append(session)
+
+        self._notify(('expired', session) for session in expired)
+        return expired
+
+    def count(self, tournament_id=None):
+        """Active sessions overall, or in one tournament"""
+        if tournament_id is None:
+            return len(self._sessions)
+        return len(self._by_tournament.get(self._tournament_key(tournament_id), ()))
+
+    def counts(self):
+        """
+        Returns:
+            dict: total and per-tournament active session counts
+        """
+        with self._lock:
+            return {
+                'total': len(self._sessions),
+                'by_tournament': {
+                    tournament_id: len(members)
+                    for tournament_id, members in self._by_tournament.items()
+                    if tournament_id is not None
+                }
+            }
+
+    def list(self, tournament_id=None):
+        """Snapshot of active sessions, optionally for one tournament"""
+        with self._lock:
+            if tournament_id is None:
+                return [dict(session) for session in self._sessions.values()]
+            return [dict(self._sessions[player_id])
+                    for player_id in self._by_tournament.get(self._tournament_key(tournament_id), ())]
+
+    def get(self, player_id):
+        """A player's session, or None"""
+        session = self._sessions.get(player_id)
+        return dict(session) if session else None
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __bool__(self):
+        return bool(self._sessions)
+
+    def __contains__(self, player_id):
+        return player_id in self._sessions
@@ -0,0 +1,210 @@
+"""
+Shared State Backends - pub/sub for one or many server processes
+"""
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+
+class InProcessBackend:
+    """
+    Single-process backend: publish() calls subscribers directly
+
+    This is the default and behaves exactly like calling the handlers
+    inline.
+    """
+
+    def __init__(self, **kwargs):
+        self._subscribers = {}
+
+    def publish(self, channel, message):
+        """
+        Deliver a JSON-serializable message to every subscriber of a channel
+
+        Returns:
+            int: Number of callbacks invoked
+        """
+        callbacks = self._subscribers.get(channel, ())
+        for callback in callbacks:
+            callback(message)
+        return len(callbacks)
+
+    def subscribe(self, channel, callback):
+        """Call callback(message) for every message published on channel"""
+        self._subscribers.setdefault(channel, []).append(callback)
+
+    def start(self):
+        """Nothing to start; messages are delivered inline"""
+
+    def close(self):
+        pass
+
+class SQLiteBackend:
+    """
+    Multi-process backend on a shared SQLite file (WAL mode)
+
+    Messages are appended to an events table; each process polls it from
+    the last event_id it has seen and dispatches to its own subscribers,
+    so every worker behind the load balancer sees every message in the
+    same order. Needs no broker process and works wherever the server
+    runs, including Windows.
+
+    Subscriptions can be registered at import time; delivery begins with
+    start(), which must run in the serving process (after any fork).
+    """
+
+    def __init__(self, path, poll_interval=0.02, retention=60.0, batch=500,
+                 sleep=time.sleep, start_task=None, **kwargs):
+        """
+        Args:
+            path: SQLite file shared by all workers
+            poll_interval: Seconds between polls when the queue is idle
+            retention: Seconds events are kept for slow readers before pruning
+            batch: Events read per poll
+            sleep: Sleep function (pass socketio.sleep inside the server)
+            start_task: Function starting the poll loop, e.g.
+                        socketio.start_background_task (default: a daemon thread)
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.batch = batch
+        self.sleep = sleep
+        self.start_task = start_task
+
+        self._local = threading.local()
+        self._subscribers = {}
+        self._poller_started = False
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._publishes = itertools.count(1)
+
+        # SQLite connections must not cross a fork
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode = WAL')
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS events (
+                    event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    channel TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+
+    def _after_fork(self):
+        self._local = threading.local()
+        self._poller_started = False
+
+    def _connection(self):
+        """One connection per thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA synchronous = NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def publish(self, channel, message):
+        """
+        Append a JSON-serializable message for every process
+
+        Returns:
+            int: The event ID
+        """
+        conn = self._connection()
+        cursor = conn.execute(
+            'INSERT INTO events (channel, payload, created_at) VALUES (?, ?, ?)',
+            (channel, json.dumps(message), time.time())
+        )
+
+        # Prune now and then rather than on every write
+        if next(self._publishes) % 1000 == 0:
+            conn.execute('DELETE FROM events WHERE created_at < ?', (time.time() - self.retention,))
+
+        return cursor.lastrowid
+
+    def subscribe(self, channel, callback):
+        """Call callback(message) in this process for every message on channel"""
+        self._subscribers.setdefault(channel, []).append(callback)
+
+    def start(self):
+        """Start polling for new events in this process (idempotent)"""
+        with self._lock:
+            if self._poller_started:
+                return
+            self._poller_started = True
+
+        # Start from the current end of the queue; history is not replayed
+        row = self._connection().execute('SELECT MAX(event_id) FROM events').fetchone()
+        last_id = row[0] or 0
+
+        if self.start_task:
+            self.start_task(self._poll_loop, last_id)
+        else:
+            threading.Thread(target=self._poll_loop, args=(last_id,), daemon=True).start()
+
+    def _poll_loop(self, last_id):
+        """Read new events and dispatch them to local subscribers"""
+        conn = self._connection()
+
+        while not self._stopped:
+            rows = conn.execute('''
+                SELECT event_id, channel, payload FROM events
+                WHERE event_id > ?
+                ORDER BY event_id
+                LIMIT ?
+            ''', (last_id, self.batch)).fetchall()
+
+            for event_id, channel, payload in rows:
+                last_id = event_id
+                callbacks = self._subscribers.get(channel)
+                if not callbacks:
+                    continue
+
+                message = json.loads(payload)
+                for callback in callbacks:
+                    try:
+                        callback(message)
+                    except Exception as e:
+                        print(f"State backend subscriber error on {channel}: {e}")
+
+            # Only sleep when caught up
+            if len(rows) < self.batch:
+                self.sleep(self.poll_interval)
+
+        conn.close()
+        self._local.conn = None
+
+    def close(self):
+        """Stop polling and close this thread's connection"""
+        self._stopped = True
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+BACKENDS = {
+    'memory': InProcessBackend,
+    'sqlite': SQLiteBackend
+}
+
+def create_backend(kind='memory', **kwargs):
+    """
+    Build a state backend
+
+    Args:
+        kind: 'memory' (single process) or 'sqlite' (shared by several processes)
+        **kwargs: Passed to the backend (e.g. path, sleep, start_task)
+    """
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown state backend: {kind} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[kind](**kwargs)
@@ -7,9 +7,13 @@ from .device_fingerprint import (
     get_device_info,
     verify_device
 )
+from .lazy_import import lazy_module
+from .process_pool import TerminablePool
 
 __all__ = [
     'get_machine_guid',
     'get_device_info',
-    'verify_device'
+    'verify_device',
+    'lazy_module',
+    'TerminablePool'
 ]
@@ -0,0 +1,50 @@
+"""
+Lazy Module Loading - defer heavy imports (cv2, dlib) until first use
+"""
+import importlib
+import threading
+
+class LazyModule:
+    """Module stand-in that imports the real module on first attribute access"""
+    
+    def __init__(self, name):
+        """
+        Args:
+            name: Fully qualified module name (e.g. 'cv2', 'PIL.Image')
+        """
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+    
+    def _load(self):
+        """Import the wrapped module once"""
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    self.__dict__['_module'] = module
+        return module
+    
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+    
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+    
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_module(name):
+    """
+    Get a lazily imported module
+    
+    Args:
+        name: Fully qualified module name
+        
+    Returns:
+        LazyModule proxy
+    """
+    return LazyModule(name)
@@ -0,0 +1,61 @@
+"""
+Terminable Process Pool - a ProcessPoolExecutor whose workers can be killed
+"""
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+
+def _report_and_init(pids, initializer, initargs):
+    """Report this worker's PID to the parent, then run the real initializer"""
+    pids.put(os.getpid())
+    if initializer is not None:
+        initializer(*initargs)
+
+class TerminablePool(ProcessPoolExecutor):
+    """
+    ProcessPoolExecutor that can stop workers stuck in a job
+
+    shutdown() never interrupts a running job, so a worker stuck on one
+    input (a pathological image, a runaway hash) would otherwise run
+    forever. Every worker reports its PID as it starts, so terminate()
+    can kill them without reaching into the executor's internals.
+    """
+
+    def __init__(self, max_workers=None, initializer=None, initargs=()):
+        """
+        Args:
+            max_workers: Worker processes
+            initializer: Called once in every worker, as in ProcessPoolExecutor
+            initargs: Arguments for initializer
+        """
+        self._pids = multiprocessing.SimpleQueue()
+        self._known_pids = set()
+        self._terminated = False
+        super().__init__(max_workers=max_workers, initializer=_report_and_init,
+                         initargs=(self._pids, initializer, initargs))
+
+    def worker_pids(self):
+        """PIDs of every worker started so far"""
+        while not self._pids.empty():
+            self._known_pids.add(self._pids.get())
+        return set(self._known_pids)
+
+    def terminate(self):
+        """
+        Kill every worker and fail all pending jobs
+
+        Jobs still running end with BrokenProcessPool and queued ones are
+        cancelled; callers that did not time out should resubmit them.
+        Calling it again does nothing, so a reused PID is never hit.
+        """
+        if self._terminated:
+            return
+        self._terminated = True
+
+        for pid in self.worker_pids():
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        self.shutdown(wait=False, cancel_futures=True)
@@ -1,26 +1,155 @@
 """
 Facial Recognition Verification Engine
 """
-import cv2
-import face_recognition
 import numpy as np
 from datetime import datetime
 import os
 
+from enrollment import EnrollmentSession
+from distance_kernels import as_float32, one_to_many, near_duplicate_pairs
+from utils.lazy_import import lazy_module
+
+# Heavy dependencies load on first use so the web tier starts without them
+cv2 = lazy_module('cv2')
+dlib = lazy_module('dlib')
+face_recognition = lazy_module('face_recognition')
+
 class FaceVerification:
     """Face verification system using face_recognition library"""
     
-    def __init__(self, tolerance=0.6):
+    # Default frame quality gates (see assess_frame_quality)
+    QUALITY_THRESHOLDS = {
+        'min_sharpness': 60.0,   # Laplacian variance of the face crop
+        'min_brightness': 60.0,  # Mean gray level of the face crop
+        'max_brightness': 200.0,
+        'max_clipped': 0.25,     # Fraction of under/over-exposed face pixels
+        'min_face_ratio': 0.15,  # Face width relative to frame width
+        'max_yaw': 0.35,         # Nose offset / eye distance (0 = frontal)
+    }
+    
+    # User-facing hints for quality rejection reasons
+    QUALITY_HINTS = {
+        'no_face': "No face detected",
+        'multiple_faces': "Only one person in view please",
+        'blurry': "Hold still",
+        'too_dark': "Find more light",
+        'too_bright': "Too much light on your face",
+        'clipped': "Uneven lighting on your face",
+        'too_small': "Move closer to the camera",
+        'pose': "Look straight at the camera",
+    }
+    
+    # Detection tiers selectable via the detector argument
+    DETECTORS = ('hog', 'cnn', 'cascade', 'cascade+hog', 'cascade+cnn')
+    
+    def __init__(self, tolerance=0.6, fusion='min', fusion_k=2, quality_thresholds=None,
+                 detector='cascade+hog', cascade_width=320, roi_margin=0.3):
         """
         Initialize face verification
         
         Args:
             tolerance: Lower is more strict (default: 0.6)
+            fusion: How to combine distances to several templates
+                    ('min' or 'topk' = mean of the fusion_k closest)
+            fusion_k: Number of templates averaged by 'topk' fusion
+            quality_thresholds: Overrides for QUALITY_THRESHOLDS
+            detector: Detection tier, one of DETECTORS
+            cascade_width: Frame width the Haar cascade runs at
+            roi_margin: ROI padding around a cascade hit (fraction of box size)
         """
+        if detector not in self.DETECTORS:
+            raise ValueError(f"Unknown detector '{detector}', expected one of {self.DETECTORS}")
+        
         self.tolerance = tolerance
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        self.fusion = fusion
+        self.fusion_k = fusion_k
+        self.quality_thresholds = dict(self.QUALITY_THRESHOLDS, **(quality_thresholds or {}))
+        self.detector = detector
+        self.cascade_width = cascade_width
+        self.roi_margin = roi_margin
+        self._face_cascade = None
+    
+    @property
+    def face_cascade(self):
+        """Haar cascade classifier, loaded on first use"""
+        if self._face_cascade is None:
+            self._face_cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+            )
+        return self._face_cascade
+    
+    def detect_faces(self, rgb_frame, detector=None):
+        """
+        Detect faces using the configured detection tier
+        
+        With a 'cascade+...' tier the Haar cascade runs first on a small
+        grayscale frame; frames without a hit stop there, and the HOG/CNN
+        detector only runs on a padded region around each hit.
+        
+        Args:
+            rgb_frame: Image as numpy array (RGB)
+            detector: Override the configured tier for this call
+            
+        Returns:
+            list: Face locations as (top, right, bottom, left)
+        """
+        detector = detector or self.detector
+        
+        if not detector.startswith('cascade'):
+            return face_recognition.face_locations(rgb_frame, model=detector)
+        
+        candidates = self._cascade_candidates(rgb_frame)
+        
+        if detector == 'cascade' or len(candidates) == 0:
+            return candidates
+        
+        model = detector.split('+')[1]
+        height, width = rgb_frame.shape[:2]
+        
+        # Pad each hit, then merge overlapping regions so every face is
+        # searched (and returned) once
+        regions = []
+        for top, right, bottom, left in candidates:
+            pad_y = int((bottom - top) * self.roi_margin)
+            pad_x = int((right - left) * self.roi_margin)
+            regions.append([max(top - pad_y, 0), min(right + pad_x, width),
+                            min(bottom + pad_y, height), max(left - pad_x, 0), right - left])
+        regions = _merge_regions(regions)
+        
+        face_locations = []
+        for roi_top, roi_right, roi_bottom, roi_left, face_width in regions:
+            roi = np.ascontiguousarray(rgb_frame[roi_top:roi_bottom, roi_left:roi_right])
+            
+            # Small faces need one upsample for HOG to find them
+            upsample = 0 if face_width >= 80 else 1
+            
+            for r_top, r_right, r_bottom, r_left in face_recognition.face_locations(
+                    roi, number_of_times_to_upsample=upsample, model=model):
+                face_locations.append((r_top + roi_top, r_right + roi_left,
+                                       r_bottom + roi_top, r_left + roi_left))
+        
+        return face_locations
+    
+    def _cascade_candidates(self, rgb_frame):
+        """Run the Haar cascade on a downscaled grayscale frame"""
+        height, width = rgb_frame.shape[:2]
+        scale = min(1.0, self.cascade_width / float(width))
+        
+        gray = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY)
+        if scale < 1.0:
+            gray = cv2.resize(gray, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        boxes = self.face_cascade.detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(24, 24)
         )
+        
+        return [
+            (int(y / scale), int((x + w) / scale), int((y + h) / scale), int(x / scale))
+            for (x, y, w, h) in boxes
+        ]
     
     def capture_face_from_webcam(self, save_path=None):
         """
@@ -49,7 +178,7 @@ class FaceVerification:
             rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             
             # Detect faces
-            face_locations = face_recognition.face_locations(rgb_frame)
+            face_locations = self.detect_faces(rgb_frame)
             
             # Draw rectangles around faces
             for (top, right, bottom, left) in face_locations:
@@ -86,37 +215,22 @@ class FaceVerification:
         """
         Capture multiple face images for registration
         
+        Keeps a single webcam stream open and auto-captures frames that pass
+        the pose and size gates (see EnrollmentSession).
+        
         Args:
             count: Number of images to capture
             save_dir: Directory to save images
             
         Returns:
-            list: List of face encodings
+            numpy.ndarray of shape (count, 128) or None
         """
-        encodings = []
-        
-        for i in range(count):
-            print(f"\nCapturing image {i+1}/{count}")
-            print("Please adjust your face angle slightly...")
-            
-            save_path = None
-            if save_dir:
-                os.makedirs(save_dir, exist_ok=True)
-                save_path = os.path.join(save_dir, f"capture_{i+1}.jpg")
-            
-            _, encoding = self.capture_face_from_webcam(save_path)
-            
-            if encoding is not None:
-                encodings.append(encoding)
-                print(f"✓ Image {i+1} captured successfully!")
-            else:
-                print(f"✗ Failed to capture image {i+1}")
-                return None
+        session = EnrollmentSession(self, count=count, save_dir=save_dir)
+        encodings = session.run()
         
-        # Return average encoding
-        if len(encodings) == count:
-            avg_encoding = np.mean(encodings, axis=0)
-            return avg_encoding
+        # Keep every sample as a separate template
+        if encodings is not None and len(encodings) == count:
+            return np.array(encodings, dtype=np.float32)
         
         return None
     
@@ -126,13 +240,17 @@ class FaceVerification:
         
         Args:
             captured_encoding: Face encoding from current capture
-            registered_encoding: Stored face encoding
+            registered_encoding: Stored face encoding, or (N, 128) gallery
+                                 of templates
             
         Returns:
-            tuple: (is_match, distance)
+            tuple: (is_match, confidence)
         """
-        # Calculate face distance
-        distance = face_recognition.face_distance([registered_encoding], captured_encoding)[0]
+        gallery = as_float32(np.atleast_2d(registered_encoding))
+        
+        # Squared distance to every template; sqrt only for the fused value
+        distances_sq = one_to_many(captured_encoding, gallery, squared=True)
+        distance = self.fuse_distances(distances_sq, squared=True)
         
         # Check if match
         is_match = distance <= self.tolerance
@@ -142,6 +260,234 @@ class FaceVerification:
         
         return is_match, confidence
     
+    def fuse_distances(self, distances, squared=False):
+        """
+        Combine per-template distances into a single score
+        
+        Args:
+            distances: 1-D array of distances to each template
+            squared: distances are squared distances
+            
+        Returns:
+            float: Fused distance
+        """
+        if self.fusion == 'topk' and len(distances) > 1:
+            k = min(self.fusion_k, len(distances))
+            closest = np.partition(distances, k - 1)[:k]
+            if squared:
+                closest = np.sqrt(closest)
+            return float(np.mean(closest))
+        
+        distance = float(np.min(distances))
+        return float(np.sqrt(distance)) if squared else distance
+    
+    def identify_face(self, captured_encoding, gallery, labels):
+        """
+        Find which gallery entry a captured face belongs to
+        
+        Args:
+            captured_encoding: Face encoding from current capture
+            gallery: (N, 128) matrix of encodings
+            labels: N labels (e.g. player IDs), one per gallery row
+            
+        Returns:
+            tuple: (label or None if nothing is within tolerance, distance)
+        """
+        if len(labels) == 0:
+            return None, None
+        
+        distances_sq = one_to_many(captured_encoding, gallery, squared=True)
+        best = int(np.argmin(distances_sq))
+        distance = float(np.sqrt(distances_sq[best]))
+        
+        if distance <= self.tolerance:
+            return labels[best], distance
+        
+        return None, distance
+    
+    def find_duplicates(self, encodings, threshold=None):
+        """
+        Find pairs of encodings that likely belong to the same person
+        
+        Args:
+            encodings: (N, 128) matrix of encodings
+            threshold: Duplicate distance (default: tolerance)
+            
+        Returns:
+            list: (i, j, distance) with i < j
+        """
+        return near_duplicate_pairs(encodings, threshold or self.tolerance)
+    
+    def assess_frame_quality(self, rgb_frame, face_locations=None):
+        """
+        Score a frame with cheap checks before paying for face_encodings
+        
+        Args:
+            rgb_frame: Image as numpy array (RGB)
+            face_locations: Pre-computed face locations (detected if None)
+            
+        Returns:
+            dict: passed, score (0-1), reasons, location and raw metrics
+        """
+        thresholds = self.quality_thresholds
+        result = {'passed': False, 'score': 0.0, 'reasons': [], 'location': None}
+        
+        if face_locations is None:
+            face_locations = self.detect_faces(rgb_frame)
+        
+        if len(face_locations) != 1:
+            result['reasons'].append('no_face' if len(face_locations) == 0 else 'multiple_faces')
+            return result
+        
+        location = face_locations[0]
+        top, right, bottom, left = location
+        result['location'] = location
+        
+        gray = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY)
+        face = gray[max(top, 0):bottom, max(left, 0):right]
+        
+        if face.size == 0:
+            result['reasons'].append('no_face')
+            return result
+        
+        # Blur: variance of the Laplacian
+        sharpness = float(cv2.Laplacian(face, cv2.CV_64F).var())
+        
+        # Exposure: brightness histogram of the face crop
+        hist = cv2.calcHist([face], [0], None, [256], [0, 256]).ravel()
+        brightness = float(np.dot(hist, np.arange(256)) / face.size)
+        clipped = float((hist[:16].sum() + hist[240:].sum()) / face.size)
+        
+        # Size: face width relative to frame
+        face_ratio = (right - left) / rgb_frame.shape[1]
+        
+        # Pose: yaw from the 5-point landmark model
+        landmarks = face_recognition.face_landmarks(rgb_frame, [location], model='small')
+        yaw = self.estimate_yaw(landmarks[0]) if landmarks else 0.0
+        
+        result.update({
+            'sharpness': sharpness,
+            'brightness': brightness,
+            'clipped': clipped,
+            'face_ratio': face_ratio,
+            'yaw': yaw
+        })
+        
+        if sharpness < thresholds['min_sharpness']:
+            result['reasons'].append('blurry')
+        if brightness < thresholds['min_brightness']:
+            result['reasons'].append('too_dark')
+        if brightness > thresholds['max_brightness']:
+            result['reasons'].append('too_bright')
+        if clipped > thresholds['max_clipped']:
+            result['reasons'].append('clipped')
+        if face_ratio < thresholds['min_face_ratio']:
+            result['reasons'].append('too_small')
+        if abs(yaw) > thresholds['max_yaw']:
+            result['reasons'].append('pose')
+        
+        # Each factor contributes 0-1; used to rank frames within a burst
+        mid_brightness = (thresholds['min_brightness'] + thresholds['max_brightness']) / 2
+        factors = [
+            min(sharpness / (2 * thresholds['min_sharpness']), 1.0),
+            max(0.0, 1 - abs(brightness - mid_brightness) / mid_brightness),
+            min(face_ratio / (2 * thresholds['min_face_ratio']), 1.0),
+            max(0.0, 1 - abs(yaw) / thresholds['max_yaw'])
+        ]
+        result['score'] = float(np.mean(factors))
+        result['passed'] = len(result['reasons']) == 0
+        
+        return result
+    
+    @staticmethod
+    def estimate_yaw(landmarks):
+        """Estimate head yaw from 5-point landmarks (0 = frontal)"""
+        left_eye = np.mean(landmarks['left_eye'], axis=0)
+        right_eye = np.mean(landmarks['right_eye'], axis=0)
+        nose = np.mean(landmarks['nose_tip'], axis=0)
+        
+        eye_distance = np.linalg.norm(right_eye - left_eye)
+        if eye_distance == 0:
+            return 0.0
+        
+        eye_center = (left_eye + right_eye) / 2
+        return float((nose[0] - eye_center[0]) / eye_distance)
+    
+    def quick_frame_score(self, rgb_frame):
+        """
+        Rank a frame by whole-frame sharpness and brightness (no detection)
+        
+        Args:
+            rgb_frame: Image as numpy array (RGB)
+            
+        Returns:
+            float: Score (0-1) on the same scale as assess_frame_quality's factors
+        """
+        thresholds = self.quality_thresholds
+        gray = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY)
+        
+        sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+        brightness = float(gray.mean())
+        
+        mid_brightness = (thresholds['min_brightness'] + thresholds['max_brightness']) / 2
+        return float(np.mean([
+            min(sharpness / (2 * thresholds['min_sharpness']), 1.0),
+            max(0.0, 1 - abs(brightness - mid_brightness) / mid_brightness)
+        ]))
+    
+    def select_best_frame(self, rgb_frames):
+        """
+        Pick a good frame from a short burst
+        
+        Frames are ranked by quick_frame_score, and only then detected and
+        landmarked best-first; the next frame is tried only if one fails
+        the full quality check.
+        
+        Args:
+            rgb_frames: List of images as numpy arrays (RGB)
+            
+        Returns:
+            tuple: (index, quality) of the first passing frame, or
+                   (None, quality of the best rejected frame)
+        """
+        ranked = sorted(range(len(rgb_frames)),
+                        key=lambda index: self.quick_frame_score(rgb_frames[index]),
+                        reverse=True)
+        rejected = None
+        
+        for index in ranked:
+            quality = self.assess_frame_quality(rgb_frames[index])
+            
+            if quality['passed']:
+                return index, quality
+            if rejected is None or quality['score'] > rejected['score']:
+                rejected = quality
+        
+        return None, rejected
+    
+    def encode_best_frame(self, rgb_frames):
+        """
+        Quality-gate a burst and encode only its best frame
+        
+        Args:
+            rgb_frames: List of images as numpy arrays (RGB)
+            
+        Returns:
+            tuple: (index, encoding, quality); index and encoding are None
+                   when every frame was rejected
+        """
+        index, quality = self.select_best_frame(rgb_frames)
+        
+        if index is None:
+            return None, None, quality
+        
+        face_encodings = face_recognition.face_encodings(rgb_frames[index], [quality['location']])
+        
+        if len(face_encodings) == 0:
+            return None, None, quality
+        
+        return index, face_encodings[0], quality
+    
     def detect_and_encode_from_image(self, image_path):
         """
         Detect face and generate encoding from image file
@@ -156,7 +502,8 @@ class FaceVerification:
         image = face_recognition.load_image_file(image_path)
         
         # Get face encodings
-        face_encodings = face_recognition.face_encodings(image)
+        face_locations = self.detect_faces(image)
+        face_encodings = face_recognition.face_encodings(image, face_locations)
         
         if len(face_encodings) > 0:
             return face_encodings[0]
@@ -173,13 +520,83 @@ class FaceVerification:
         Returns:
             Face encoding or None
         """
-        face_encodings = face_recognition.face_encodings(image_array)
+        face_locations = self.detect_faces(image_array)
+        face_encodings = face_recognition.face_encodings(image_array, face_locations)
         
         if len(face_encodings) > 0:
             return face_encodings[0]
         
         return None
     
+    def detect_and_encode_batch(self, image_arrays):
+        """
+        Detect face and generate encoding for a batch of numpy arrays
+        
+        Landmarks and descriptors for the whole batch go through dlib in a
+        single call instead of one face_encodings call per image.
+        
+        Args:
+            image_arrays: List of images as numpy arrays (RGB)
+            
+        Returns:
+            list: Face encoding or None for each image
+        """
+        if self.detector == 'cnn':
+            locations_per_image = self._batch_cnn_locations(image_arrays)
+        else:
+            locations_per_image = [self.detect_faces(image) for image in image_arrays]
+        
+        indices, images, shapes = [], [], []
+        for index, (image, locations) in enumerate(zip(image_arrays, locations_per_image)):
+            if len(locations) == 0:
+                continue
+            
+            # Same 5-point landmarks as face_recognition.face_encodings (its
+            # default 'small' model), so batched encodings match the templates
+            top, right, bottom, left = locations[0]
+            shape = face_recognition.api.pose_predictor_5_point(
+                image, dlib.rectangle(left, top, right, bottom)
+            )
+            detections = dlib.full_object_detections()
+            detections.append(shape)
+            
+            indices.append(index)
+            images.append(image)
+            shapes.append(detections)
+        
+        results = [None] * len(image_arrays)
+        if not images:
+            return results
+        
+        encoder = face_recognition.api.face_encoder
+        try:
+            # One descriptor list per image, one face per list
+            descriptors = [faces[0] for faces in encoder.compute_face_descriptor(images, shapes)]
+        except TypeError:
+            # Older dlib builds have no batched overload
+            descriptors = [encoder.compute_face_descriptor(image, detections[0])
+                           for image, detections in zip(images, shapes)]
+        
+        for index, descriptor in zip(indices, descriptors):
+            results[index] = np.array(descriptor)
+        
+        return results
+    
+    def _batch_cnn_locations(self, image_arrays):
+        """Run the CNN detector once per group of equally sized images"""
+        groups = {}
+        for index, image in enumerate(image_arrays):
+            groups.setdefault(image.shape, []).append(index)
+        
+        locations_per_image = [[] for _ in image_arrays]
+        for indices in groups.values():
+            batch = [image_arrays[index] for index in indices]
+            batch_locations = face_recognition.batch_face_locations(batch, batch_size=len(batch))
+            for index, locations in zip(indices, batch_locations):
+                locations_per_image[index] = locations
+        
+        return locations_per_image
+    
     def save_verification_image(self, image_array, player_id, logs_dir='logs/images'):
         """
         Save verification image with timestamp
@@ -204,6 +621,31 @@ class FaceVerification:
         
         return filepath
 
+def _merge_regions(regions):
+    """
+    Merge overlapping (top, right, bottom, left, face_width) regions
+
+    Merged regions cover the union's bounding box and keep the smallest
+    face width, which decides the upsampling.
+    """
+    merged = []
+    for region in regions:
+        region = list(region)
+        overlapping = True
+        while overlapping:
+            overlapping = False
+            for other in merged:
+                if (region[0] < other[2] and other[0] < region[2]
+                        and region[3] < other[1] and other[3] < region[1]):
+                    merged.remove(other)
+                    region = [min(region[0], other[0]), max(region[1], other[1]),
+                              max(region[2], other[2]), min(region[3], other[3]),
+                              min(region[4], other[4])]
+                    overlapping = True
+                    break
+        merged.append(region)
+    return merged
+
 def test_camera():
     """Test if camera is accessible"""
     cap = cv2.VideoCapture(0)